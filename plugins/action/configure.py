@@ -15,11 +15,6 @@ from ansible.module_utils._text import to_bytes, to_text
 from ansible.module_utils import basic
 from ansible.errors import AnsibleActionFail
 
-try:
-    from lxml.etree import tostring, fromstring, XMLParser
-except ImportError:
-    from xml.etree.ElementTree import tostring, fromstring
-
 from ansible.module_utils.connection import (
     ConnectionError as AnsibleConnectionError,
 )
@@ -32,9 +27,11 @@ from ansible_collections.community.yang.plugins.modules.configure import (
 from ansible_collections.community.yang.plugins.module_utils.translator import (
     Translator,
 )
+from ansible_collections.community.yang.plugins.module_utils.worker import (
+    WorkerTranslator,
+)
 from ansible_collections.community.yang.plugins.common.base import (
-    create_tmp_dir,
-    JSON2XML_DIR_PATH,
+    YANG_CACHE_DIR_PATH,
 )
 
 VALID_CONNECTION_TYPES = ["ansible.netcommon.netconf"]
@@ -148,9 +145,21 @@ class ActionModule(ActionBase):
             )
 
         try:
-            tmp_dir_path = create_tmp_dir(JSON2XML_DIR_PATH)
-            tl = Translator(yang_files, search_path, debug=self._debug)
-            xml_data = tl.json_to_xml(json_config, tmp_dir_path)
+            translator_cls = (
+                WorkerTranslator
+                if self._task.args.get("use_worker")
+                else Translator
+            )
+            tl = translator_cls(
+                yang_files,
+                search_path,
+                debug=self._debug,
+                cache_dir=YANG_CACHE_DIR_PATH,
+                engine=self._task.args.get("engine") or "pyang",
+            )
+            xml_data = tl.json_to_xml_in_memory(json_config, output="bytes")
+            cache_hit = tl.cache_hits.get("jtox", False)
+            timings = tl.timings.as_dict()
         except ValueError as exc:
             raise AnsibleActionFail(
                 to_text(exc, errors="surrogate_then_replace")
@@ -162,9 +171,7 @@ class ActionModule(ActionBase):
                 )
             )
 
-        parser = XMLParser(ns_clean=True, recover=True, encoding="utf-8")
-        xml_data = fromstring(xml_data, parser=parser)
-        xml_data = to_text(tostring(xml_data))
+        xml_data = to_text(xml_data, errors="surrogate_then_replace")
         module = "ansible.netcommon.netconf_config"
 
         if not self._shared_loader_obj.module_loader.has_plugin(module):
@@ -179,7 +186,15 @@ class ActionModule(ActionBase):
                 )
             new_module_args["content"] = xml_data
 
-            for item in ["file", "search_path", "config", "netconf_options"]:
+            for item in [
+                "file",
+                "search_path",
+                "config",
+                "netconf_options",
+                "engine",
+                "use_worker",
+                "timings",
+            ]:
                 new_module_args.pop(item, None)
 
             self._display.vvvv(
@@ -194,4 +209,7 @@ class ActionModule(ActionBase):
                 )
             )
         result.pop("server_capabilities", None)
+        result["cache_hit"] = cache_hit
+        if self._task.args.get("timings"):
+            result["timings"] = timings
         return result
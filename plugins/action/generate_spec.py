@@ -19,13 +19,17 @@ from ansible.errors import AnsibleActionFail
 
 from ansible_collections.community.yang.plugins.module_utils.spec import (
     GenerateSpec,
+    SCHEMA_FORMATS,
+)
+from ansible_collections.community.yang.plugins.module_utils.worker import (
+    WorkerGenerateSpec,
 )
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.utils import (
     convert_doc_to_ansible_module_kwargs,
     dict_merge,
 )
 from ansible_collections.community.yang.plugins.common.base import (
-    create_tmp_dir,
+    YANG_CACHE_DIR_PATH,
     YANG_SPEC_DIR_PATH,
 )
 from ansible_collections.community.yang.plugins.modules.generate_spec import (
@@ -133,49 +137,35 @@ class ActionModule(ActionBase):
         xml_schema = self._task.args.get("xml_schema") or {}
         tree_schema = self._task.args.get("tree_schema") or {}
         json_schema = self._task.args.get("json_schema") or {}
+        formats = self._task.args.get("formats") or SCHEMA_FORMATS
 
         try:
-            tmp_dir_path = create_tmp_dir(YANG_SPEC_DIR_PATH)
-
-            genspec_obj = GenerateSpec(
+            genspec_cls = (
+                WorkerGenerateSpec
+                if self._task.args.get("use_worker")
+                else GenerateSpec
+            )
+            genspec_obj = genspec_cls(
                 yang_content=yang_content,
                 yang_file_path=yang_files,
                 search_path=search_path,
                 doctype=doctype,
-                tmp_dir_path=tmp_dir_path,
+                tmp_dir_path=YANG_SPEC_DIR_PATH,
+                cache_dir=YANG_CACHE_DIR_PATH,
             )
-            defaults = False
-            schema_out_path = None
-            if json_schema:
-                if "defaults" in json_schema:
-                    defaults = json_schema["defaults"]
-                if "path" in json_schema:
-                    schema_out_path = json_schema["path"]
-            result["json_schema"] = genspec_obj.generate_json_schema(
-                schema_out_path=schema_out_path, defaults=defaults
-            )
-            defaults = False
-            schema_out_path = None
-            annotations = False
-
-            if xml_schema:
-                if "defaults" in xml_schema:
-                    defaults = xml_schema["defaults"]
-                if "path" in xml_schema:
-                    schema_out_path = xml_schema["path"]
-                if "annotations" in xml_schema:
-                    annotations = xml_schema["annotations"]
-            result["xml_schema"] = genspec_obj.generate_xml_schema(
-                schema_out_path=schema_out_path,
-                defaults=defaults,
-                annotations=annotations,
-            )
-            schema_out_path = None
-            if tree_schema and "path" in tree_schema:
-                schema_out_path = tree_schema["path"]
-            result["tree_schema"] = genspec_obj.generate_tree_schema(
-                schema_out_path=schema_out_path
+            # the modules are parsed and validated once for all the schemas
+            result.update(
+                genspec_obj.generate_schemas(
+                    json_schema=json_schema,
+                    xml_schema=xml_schema,
+                    tree_schema=tree_schema,
+                    formats=formats,
+                )
             )
+            # True only when none of the schemas had to be generated
+            result["cache_hit"] = all(genspec_obj.cache_hits.values())
+            if self._task.args.get("timings"):
+                result["timings"] = genspec_obj.timings.as_dict()
         except ValueError as exc:
             raise AnsibleActionFail(
                 to_text(exc, errors="surrogate_then_replace")
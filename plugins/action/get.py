@@ -21,6 +21,9 @@ from ansible.errors import AnsibleActionFail
 from ansible_collections.community.yang.plugins.module_utils.translator import (
     Translator,
 )
+from ansible_collections.community.yang.plugins.module_utils.worker import (
+    WorkerTranslator,
+)
 
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.utils import (
     convert_doc_to_ansible_module_kwargs,
@@ -31,6 +34,7 @@ from ansible_collections.community.yang.plugins.modules.get import (
 from ansible_collections.community.yang.plugins.common.base import (
     create_tmp_dir,
     XM2JSON_DIR_PATH,
+    YANG_CACHE_DIR_PATH,
 )
 
 VALID_CONNECTION_TYPES = ["ansible.netcommon.netconf"]
@@ -85,6 +89,15 @@ class ActionModule(ActionBase):
                 if path != "" and not os.path.isdir(path):
                     msg = "%s is invalid search_path directory" % path
                     errors.append(msg)
+        engine = self._task.args.get("engine")
+        if self._task.args.get("output_file") and engine not in (
+            None,
+            "native",
+        ):
+            errors.append(
+                "the json data is streamed to 'output_file' with the native "
+                "engine, engine '%s' is not supported" % engine
+            )
         if errors:
             self._result["failed"] = True
             self._result["msg"] = " ".join(errors)
@@ -126,7 +139,14 @@ class ActionModule(ActionBase):
             )
         else:
             new_module_args = self._task.args.copy()
-            for item in ["file", "search_path"]:
+            for item in [
+                "file",
+                "search_path",
+                "output_file",
+                "engine",
+                "use_worker",
+                "timings",
+            ]:
                 new_module_args.pop(item, None)
 
             self._display.vvvv(
@@ -145,15 +165,32 @@ class ActionModule(ActionBase):
             return result
 
         try:
-            tmp_dir_path = create_tmp_dir(XM2JSON_DIR_PATH)
-
             # convert XML data to JSON data as per RFC 7951 format
-            tl = Translator(
-                yang_files, search_path=search_path, debug=self._debug
+            translator_cls = (
+                WorkerTranslator
+                if self._task.args.get("use_worker")
+                else Translator
             )
-            result["json_data"] = tl.xml_to_json(
-                result["stdout"], tmp_dir_path
+            tl = translator_cls(
+                yang_files,
+                search_path=search_path,
+                debug=self._debug,
+                cache_dir=YANG_CACHE_DIR_PATH,
+                engine=self._task.args.get("engine") or "pyang",
             )
+            output_file = self._task.args.get("output_file")
+            if output_file:
+                result["json_file"] = tl.xml_to_json_file(
+                    result["stdout"], output_file
+                )
+            else:
+                tmp_dir_path = create_tmp_dir(XM2JSON_DIR_PATH)
+                result["json_data"] = tl.xml_to_json(
+                    result["stdout"], tmp_dir_path
+                )
+            result["cache_hit"] = tl.cache_hits.get("jsonxsl", False)
+            if self._task.args.get("timings"):
+                result["timings"] = tl.timings.as_dict()
         except ValueError as exc:
             raise AnsibleActionFail(
                 to_text(exc, errors="surrogate_then_replace")
@@ -15,6 +15,7 @@ from ansible.utils.path import unfrackpath, makedirs_safe
 JSON2XML_DIR_PATH = "~/.ansible/tmp/yang/json2xml"
 XM2JSON_DIR_PATH = "~/.ansible/tmp/xml2json"
 YANG_SPEC_DIR_PATH = "~/.ansible/tmp/yang/spec"
+YANG_CACHE_DIR_PATH = "~/.ansible/tmp/yang/cache"
 
 
 def create_tmp_dir(dir_path):
@@ -19,6 +19,8 @@ options:
   _terms:
     description:
       - Input json configuration file path that adheres to a particular yang model.
+      - If several file paths are given all of them are translated against the same yang model and the
+        list of xml strings is returned in the same order.
     required: True
     type: path
   doctype:
@@ -46,6 +48,27 @@ options:
         option is mainly used for debugging purpose.
     default: False
     type: bool
+  engine:
+    description:
+      - The engine used to translate the json configuration to xml. With C(pyang) the configuration is
+        translated with the driver generated by the pyang jtox plugin. With C(native) the xml tree is built
+        directly walking the compiled yang schema tree.
+    default: pyang
+    choices: ['pyang', 'native']
+    type: str
+  use_worker:
+    description:
+      - Run the translation in a worker process on the control node. The worker is started on demand, listens
+        on C(~/.ansible/tmp/yang/worker.sock) and keeps the compiled yang schemas in memory across lookups
+        and tasks. The worker exits after 10 minutes without requests.
+    default: False
+    type: bool
+  timings:
+    description:
+      - Return the wall clock and CPU time spent in each stage of the translation along with the result.
+        If set the lookup returns a single dict with the translated data list in C(data) and the timings in C(timings).
+    default: False
+    type: bool
 """
 
 EXAMPLES = """
@@ -57,7 +80,8 @@ EXAMPLES = """
 
 RETURN = """
 _raw:
-   description: The translated xml string from json
+   description: The translated xml string from json. If C(timings) is set a dict with the list of results
+                in C(data) and the time spent in each stage in C(timings).
 """
 
 import os
@@ -71,6 +95,9 @@ from ansible.errors import AnsibleLookupError
 from ansible_collections.community.yang.plugins.module_utils.translator import (
     Translator,
 )
+from ansible_collections.community.yang.plugins.module_utils.worker import (
+    WorkerTranslator,
+)
 
 try:
     import pyang  # noqa
@@ -85,6 +112,7 @@ from ansible.utils.display import Display
 from ansible_collections.community.yang.plugins.common.base import (
     create_tmp_dir,
     JSON2XML_DIR_PATH,
+    YANG_CACHE_DIR_PATH,
 )
 
 display = Display()
@@ -109,10 +137,7 @@ class LookupModule(LookupBase):
                 PYANG_IMPORT_ERROR,
             )
 
-        res = []
-        try:
-            json_config = terms[0]
-        except IndexError:
+        if not terms:
             raise AnsibleLookupError("path to json file must be specified")
 
         try:
@@ -122,31 +147,50 @@ class LookupModule(LookupBase):
 
         search_path = kwargs.pop("search_path", "")
         keep_tmp_files = kwargs.pop("keep_tmp_files", False)
-
-        json_config = os.path.realpath(os.path.expanduser(json_config))
-        try:
-            # validate json
-            with open(json_config) as fp:
-                json.load(fp)
-        except Exception as exc:
-            raise AnsibleLookupError(
-                "Failed to load json configuration: %s"
-                % (to_text(exc, errors="surrogate_or_strict"))
-            )
+        engine = kwargs.pop("engine", "pyang")
+        use_worker = kwargs.pop("use_worker", False)
+        timings = kwargs.pop("timings", False)
+
+        json_configs = []
+        json_data = []
+        for json_config in terms:
+            json_config = os.path.realpath(os.path.expanduser(json_config))
+            try:
+                # validate json
+                with open(json_config) as fp:
+                    json_data.append(json.load(fp))
+            except Exception as exc:
+                raise AnsibleLookupError(
+                    "Failed to load json configuration: %s"
+                    % (to_text(exc, errors="surrogate_or_strict"))
+                )
+            json_configs.append(json_config)
 
         try:
-            tmp_dir_path = create_tmp_dir(JSON2XML_DIR_PATH)
             doctype = kwargs.get("doctype", "config")
 
-            tl = Translator(
+            translator_cls = WorkerTranslator if use_worker else Translator
+            tl = translator_cls(
                 yang_file,
                 search_path,
                 doctype,
                 keep_tmp_files,
                 debug=self._debug,
+                cache_dir=YANG_CACHE_DIR_PATH,
+                engine=engine,
             )
 
-            xml_data = tl.json_to_xml(json_config, tmp_dir_path)
+            if len(json_configs) == 1:
+                tmp_dir_path = create_tmp_dir(JSON2XML_DIR_PATH)
+                res = [tl.json_to_xml(json_configs[0], tmp_dir_path)]
+            else:
+                # translate all the terms with a single jtox driver, in
+                # memory without a temporary directory
+                res = tl.json_to_xml_many(json_data)
+            self._debug(
+                "jtox cache %s"
+                % ("hit" if tl.cache_hits.get("jtox") else "miss")
+            )
         except ValueError as exc:
             raise AnsibleLookupError(
                 to_text(exc, errors="surrogate_then_replace")
@@ -158,6 +202,6 @@ class LookupModule(LookupBase):
                 )
             )
 
-        res.append(xml_data)
-
+        if timings:
+            return [{"data": res, "timings": tl.timings.as_dict()}]
         return res
@@ -56,6 +56,27 @@ DOCUMENTATION = """
             option is mainly used for debugging purpose.
         default: False
         type: bool
+      formats:
+        description:
+          - The list of the outputs to generate, the outputs that are not listed are neither generated nor
+            returned in the result.
+        type: list
+        elements: str
+        choices: ['json_skeleton', 'xml_skeleton', 'tree']
+        default: ['json_skeleton', 'xml_skeleton', 'tree']
+      use_worker:
+        description:
+          - Run the spec generation in a worker process on the control node. The worker is started on demand, listens
+            on C(~/.ansible/tmp/yang/worker.sock) and keeps the compiled yang schemas in memory across lookups
+            and tasks. The worker exits after 10 minutes without requests.
+        default: False
+        type: bool
+      timings:
+        description:
+          - Return the wall clock and CPU time spent in each stage of the spec generation along with the result.
+            The timings are returned in the C(timings) key of the result.
+        default: False
+        type: bool
 """
 
 EXAMPLES = """
@@ -70,6 +91,12 @@ EXAMPLES = """
     interfaces_spec: "{{ lookup('community.yang.spec', 'openconfig/public/release/models/interfaces/openconfig-interfaces.yang',
                             search_path='openconfig/public/release/models:pyang/modules/', defaults=True,
                             doctype='data') }}"
+
+- name: Get only the interface yang tree
+  set_fact:
+    interfaces_tree: "{{ lookup('community.yang.spec', 'openconfig/public/release/models/interfaces/openconfig-interfaces.yang',
+                            search_path='openconfig/public/release/models:pyang/modules/',
+                            formats=['tree']) }}"
 """
 
 RETURN = """
@@ -81,7 +108,7 @@ RETURN = """
     contains:
       tree:
         description: The tree representation of yang scehma as per RFC 8340
-        returned: success
+        returned: when C(tree) is in C(formats)
         type: dict
         sample: |
             module: openconfig-interfaces
@@ -108,7 +135,7 @@ RETURN = """
                     |  +--ro last-change?     oc-types:timeticks64
       json_skeleton:
         description: The json configuration skeleton generated from yang document
-        returned: success
+        returned: when C(json_skeleton) is in C(formats)
         type: dict
         sample: |
             {
@@ -147,7 +174,7 @@ RETURN = """
                 }
       xml_skeleton:
         description: The xml configuration skeleton generated from yang document
-        returned: success
+        returned: when C(xml_skeleton) is in C(formats)
         type: dict
         sample: |
             <config xmlns="urn:ietf:params:xml:ns:netconf:base:1.0">
@@ -181,16 +208,38 @@ RETURN = """
                 </interface>
               </interfaces>
             </config>
+      cache_hit:
+        description: Whether all the skeletons were loaded from the controller side cache.
+        returned: success
+        type: bool
+        sample: true
+      timings:
+        description: The wall clock and CPU time in seconds spent in each stage of the spec generation and
+                     the number of times the stage was run.
+        returned: when C(timings) is set
+        type: dict
+        sample:
+          resolve: {"wall": 0.0001, "cpu": 0.0001, "calls": 1}
+          compile: {"wall": 0.14, "cpu": 0.13, "calls": 1}
+          tree: {"wall": 0.001, "cpu": 0.001, "calls": 1}
 """
 import os
+from collections import OrderedDict
+
 from ansible.plugins.lookup import LookupBase
 from ansible.errors import AnsibleLookupError
 from ansible.module_utils._text import to_text
+from ansible_collections.community.yang.plugins.module_utils.common import (
+    to_list,
+)
 from ansible_collections.community.yang.plugins.module_utils.spec import (
     GenerateSpec,
 )
+from ansible_collections.community.yang.plugins.module_utils.worker import (
+    WorkerGenerateSpec,
+)
 from ansible_collections.community.yang.plugins.common.base import (
-    create_tmp_dir,
+    YANG_CACHE_DIR_PATH,
     YANG_SPEC_DIR_PATH,
 )
 
@@ -198,6 +247,15 @@ from ansible.utils.display import Display
 
 display = Display()
 
+# output key of the lookup result of each schema format of GenerateSpec
+OUTPUT_FORMATS = OrderedDict(
+    (
+        ("json_skeleton", "json_schema"),
+        ("xml_skeleton", "xml_schema"),
+        ("tree", "tree_schema"),
+    )
+)
+
 
 class LookupModule(LookupBase):
     def run(self, terms, variables, **kwargs):
@@ -224,6 +282,9 @@ class LookupModule(LookupBase):
         defaults = kwargs.pop("defaults", False)
         annotations = kwargs.pop("annotations", False)
         doctype = kwargs.pop("doctype", "config")
+        use_worker = kwargs.pop("use_worker", False)
+        timings = kwargs.pop("timings", False)
+        formats = to_list(kwargs.pop("formats", list(OUTPUT_FORMATS)))
 
         valid_doctype = ["config", "data"]
         if doctype not in valid_doctype:
@@ -232,25 +293,35 @@ class LookupModule(LookupBase):
                 % (path, ", ".join(valid_doctype))
             )
 
-        try:
-            tmp_dir_path = create_tmp_dir(YANG_SPEC_DIR_PATH)
+        invalid_formats = [fmt for fmt in formats if fmt not in OUTPUT_FORMATS]
+        if invalid_formats:
+            raise AnsibleLookupError(
+                "formats value %s is invalid, valid values are %s"
+                % (", ".join(invalid_formats), ", ".join(OUTPUT_FORMATS))
+            )
 
-            genspec_obj = GenerateSpec(
+        try:
+            genspec_cls = WorkerGenerateSpec if use_worker else GenerateSpec
+            genspec_obj = genspec_cls(
                 yang_file_path=yang_file,
                 search_path=search_path,
                 doctype=doctype,
                 keep_tmp_files=keep_tmp_files,
-                tmp_dir_path=tmp_dir_path,
-            )
-            output["json_skeleton"] = genspec_obj.generate_json_schema(
-                defaults=defaults
+                tmp_dir_path=YANG_SPEC_DIR_PATH,
+                cache_dir=YANG_CACHE_DIR_PATH,
             )
-            defaults = False
-
-            output["xml_skeleton"] = genspec_obj.generate_xml_schema(
-                defaults=defaults, annotations=annotations
+            # the xml skeleton is generated without default values
+            schemas = genspec_obj.generate_schemas(
+                json_schema={"defaults": defaults},
+                xml_schema={"annotations": annotations},
+                formats=[OUTPUT_FORMATS[fmt] for fmt in formats],
             )
-            output["tree"] = genspec_obj.generate_tree_schema()
+            for fmt in formats:
+                output[fmt] = schemas[OUTPUT_FORMATS[fmt]]
+            # True only when none of the schemas had to be generated
+            output["cache_hit"] = all(genspec_obj.cache_hits.values())
+            if timings:
+                output["timings"] = genspec_obj.timings.as_dict()
 
             res.append(output)
         except ValueError as exc:
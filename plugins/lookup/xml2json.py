@@ -19,13 +19,16 @@ options:
     description:
       - Input xml file path that adheres to a given yang model. This can be a Netconf/Restconf xml rpc response
         that contains operational and configuration data received from remote host.
+      - If several file paths are given all of them are translated against the same yang model and the
+        list of json structures is returned in the same order.
     required: True
     type: path
   yang_file:
     description:
       - Path to yang model file against which the xml file is validated and converted to json as per json encoding
         of data modeled with YANG.
-    required: True
+      - If not given the yang modules are selected from the namespaces of the xml data, the modules of
+        C(search_path) defining them are compiled along with their imports only.
     type: path
   search_path:
     description:
@@ -42,6 +45,36 @@ options:
         option is mainly used for debugging purpose.
     default: False
     type: bool
+  engine:
+    description:
+      - The engine used to translate the xml data to json. With C(pyang) the data is translated with the
+        stylesheet generated by the pyang jsonxsl plugin. With C(native) the data is converted in a single
+        pass walking the compiled yang schema tree, which scales linearly with the number of list entries.
+        With C(output_dir) the data is always translated with the C(native) engine.
+    default: pyang
+    choices: ['pyang', 'native']
+    type: str
+  output_dir:
+    description:
+      - Path of a directory the translated json data is streamed to instead of being returned inline.
+        Each input file is translated in a single pass and written incrementally to a file named after
+        it with a C(.json) extension, so the memory used does not grow with the size of the input.
+        The lookup returns the paths of the written json files, the xml files must have distinct names.
+        The data is always translated with the C(native) engine, C(engine=pyang) is rejected.
+    type: path
+  use_worker:
+    description:
+      - Run the translation in a worker process on the control node. The worker is started on demand, listens
+        on C(~/.ansible/tmp/yang/worker.sock) and keeps the compiled yang schemas in memory across lookups
+        and tasks. The worker exits after 10 minutes without requests.
+    default: False
+    type: bool
+  timings:
+    description:
+      - Return the wall clock and CPU time spent in each stage of the translation along with the result.
+        If set the lookup returns a single dict with the translated data list in C(data) and the timings in C(timings).
+    default: False
+    type: bool
 """
 
 EXAMPLES = """
@@ -49,13 +82,21 @@ EXAMPLES = """
   debug: msg="{{ lookup('community.yang.xml2json', interfaces_config.xml,
                          yang_file='openconfig/public/release/models/interfaces/openconfig-interfaces.yang',
                          search_path='openconfig/public/release/models:pyang/modules/') }}"
+
+- name: translate xml to json with the modules of the search path defining the xml namespaces
+  debug: msg="{{ lookup('community.yang.xml2json', interfaces_config.xml,
+                         search_path='openconfig/public/release/models:pyang/modules/') }}"
 """
 
 RETURN = """
 _raw:
-   description: The translated json structure from xml
+   description: The translated json structure from xml, or the path of the json file if C(output_dir) is set.
+                If C(timings) is set a dict with the list of results in C(data) and the time spent in each stage
+                in C(timings).
 """
 
+import os
+
 from ansible.plugins.lookup import LookupBase
 from ansible.errors import AnsibleLookupError
 from ansible.module_utils.six import raise_from
@@ -64,10 +105,14 @@ from ansible.module_utils._text import to_text
 from ansible_collections.community.yang.plugins.module_utils.translator import (
     Translator,
 )
+from ansible_collections.community.yang.plugins.module_utils.worker import (
+    WorkerTranslator,
+)
 
 from ansible_collections.community.yang.plugins.common.base import (
     create_tmp_dir,
     XM2JSON_DIR_PATH,
+    YANG_CACHE_DIR_PATH,
 )
 
 try:
@@ -101,31 +146,68 @@ class LookupModule(LookupBase):
                 PYANG_IMPORT_ERROR,
             )
 
-        res = []
-        try:
-            xml_file = terms[0]
-        except IndexError:
+        if not terms:
             raise AnsibleLookupError("path to xml file must be specified")
 
-        try:
-            yang_file = kwargs["yang_file"]
-        except KeyError:
-            raise AnsibleLookupError("value of 'yang_file' must be specified")
-
+        yang_file = kwargs.get("yang_file")
         search_path = kwargs.pop("search_path", "")
+        if not yang_file and not search_path:
+            raise AnsibleLookupError(
+                "value of 'yang_file' or 'search_path' must be specified"
+            )
+
         keep_tmp_files = kwargs.pop("keep_tmp_files", False)
+        output_dir = kwargs.pop("output_dir", None)
+        if output_dir and kwargs.get("engine", "native") != "native":
+            raise AnsibleLookupError(
+                "the json data is streamed to 'output_dir' with the native "
+                "engine, engine '%s' is not supported" % kwargs["engine"]
+            )
+        engine = kwargs.pop("engine", "pyang")
+        use_worker = kwargs.pop("use_worker", False)
+        timings = kwargs.pop("timings", False)
+
+        json_files = []
+        if output_dir:
+            output_dir = os.path.realpath(os.path.expanduser(output_dir))
+            for xml_file in terms:
+                json_file = os.path.join(
+                    output_dir,
+                    "%s.json"
+                    % os.path.splitext(os.path.basename(xml_file))[0],
+                )
+                if json_file in json_files:
+                    raise AnsibleLookupError(
+                        "xml files with the same name would be written to %s"
+                        % json_file
+                    )
+                json_files.append(json_file)
 
         try:
-            tmp_dir_path = create_tmp_dir(XM2JSON_DIR_PATH)
-
-            tl = Translator(
+            translator_cls = WorkerTranslator if use_worker else Translator
+            tl = translator_cls(
                 yang_file,
                 search_path=search_path,
                 keep_tmp_files=keep_tmp_files,
                 debug=self._debug,
+                cache_dir=YANG_CACHE_DIR_PATH,
+                engine=engine,
             )
 
-            json_data = tl.xml_to_json(xml_file, tmp_dir_path)
+            if output_dir:
+                res = [
+                    tl.xml_to_json_file(xml_file, json_file)
+                    for xml_file, json_file in zip(terms, json_files)
+                ]
+            else:
+                # all the terms are translated with a single compiled
+                # stylesheet
+                tmp_dir_path = create_tmp_dir(XM2JSON_DIR_PATH)
+                res = tl.xml_to_json_many(terms, tmp_dir_path)
+            self._debug(
+                "jsonxsl cache %s"
+                % ("hit" if tl.cache_hits.get("jsonxsl") else "miss")
+            )
         except ValueError as exc:
             raise AnsibleLookupError(
                 to_text(exc, errors="surrogate_then_replace")
@@ -137,6 +219,6 @@ class LookupModule(LookupBase):
                 )
             )
 
-        res.append(json_data)
-
+        if timings:
+            return [{"data": res, "timings": tl.timings.as_dict()}]
         return res
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import errno
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+from ansible.module_utils._text import to_bytes
+
+try:
+    import pyang
+
+    PYANG_VERSION = pyang.__version__
+except ImportError:
+    PYANG_VERSION = None
+
+# upper bound of the total size of all cached artifacts in bytes
+YANG_CACHE_MAX_SIZE = 512 * 1024 * 1024
+# entries not used for that many seconds are evicted
+YANG_CACHE_MAX_AGE = 30 * 24 * 60 * 60
+
+
+def fingerprint(file_paths, *extra):
+    """
+    Compute a content based fingerprint for a set of files
+    :param file_paths: List of file paths, the order of the files and their
+                       location on disk does not change the fingerprint.
+    :param extra: Additional values (search path, doctype, ...) that the
+                  cached artifact depends on.
+    :return: Hex digest string.
+    """
+    file_digests = []
+    for path in file_paths:
+        with open(path, "rb") as fp:
+            file_digests.append(hashlib.sha256(fp.read()).hexdigest())
+
+    digest = hashlib.sha256()
+    for file_digest in sorted(file_digests):
+        digest.update(to_bytes(file_digest))
+    digest.update(to_bytes(PYANG_VERSION or ""))
+    for item in extra:
+        digest.update(b"\0")
+        digest.update(to_bytes("" if item is None else item))
+    return digest.hexdigest()
+
+
+class ArtifactCache(object):
+    """
+    Controller side on-disk cache of generated artifacts. Entries are stored
+    in one sub directory per artifact kind (jsonxsl, jtox, ...) and named by
+    their fingerprint, so different processes computing the same artifact
+    share the entry. The modification time of an entry is refreshed on every
+    hit and the least recently used entries are evicted once the total size
+    of the cache grows beyond max_size, or once they have not been used for
+    max_age seconds. The cache is an optimization, entries that can not be
+    read are misses and write errors are ignored.
+    """
+
+    def __init__(
+        self,
+        cache_dir,
+        max_size=YANG_CACHE_MAX_SIZE,
+        max_age=YANG_CACHE_MAX_AGE,
+        debug=None,
+    ):
+        self._cache_dir = os.path.realpath(os.path.expanduser(cache_dir))
+        self._max_size = max_size
+        self._max_age = max_age
+        self._debug = debug
+
+    def _entry_path(self, kind, key):
+        return os.path.join(self._cache_dir, kind, "%s.%s" % (key, kind))
+
+    def get(self, kind, key):
+        """
+        Lookup a cached artifact
+        :param kind: The artifact kind, also used as the file extension.
+        :param key: The artifact fingerprint.
+        :return: The path of the cached artifact or None on a cache miss.
+        """
+        path = self._entry_path(kind, key)
+        try:
+            os.utime(path, None)
+        except OSError:
+            return None
+        return path
+
+    def get_data(self, kind, key):
+        """
+        Read a cached artifact
+        :param kind: The artifact kind, also used as the file extension.
+        :param key: The artifact fingerprint.
+        :return: The artifact content as bytes or None on a cache miss,
+                 including an entry removed by a concurrent eviction.
+        """
+        path = self.get(kind, key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as fp:
+                return fp.read()
+        except (IOError, OSError) as e:
+            if self._debug:
+                self._debug("Failed to read cache entry '%s': %s" % (path, e))
+            return None
+
+    def put(self, kind, key, src_path):
+        """
+        Store an artifact in the cache. The file is copied next to its final
+        location and renamed in place so readers never see a partial entry.
+        :param kind: The artifact kind, also used as the file extension.
+        :param key: The artifact fingerprint.
+        :param src_path: Path of the generated artifact.
+        :return: The path of the cached artifact, None if it could not be
+                 stored.
+        """
+        return self._store(kind, key, lambda fp: shutil.copyfile(src_path, fp))
+
+    def put_data(self, kind, key, data):
+        """
+        Store an artifact generated in memory in the cache.
+        :param kind: The artifact kind, also used as the file extension.
+        :param key: The artifact fingerprint.
+        :param data: The artifact content.
+        :return: The path of the cached artifact, None if it could not be
+                 stored.
+        """
+
+        def write(tmp_path):
+            with open(tmp_path, "wb") as fp:
+                fp.write(to_bytes(data, errors="surrogate_or_strict"))
+
+        return self._store(kind, key, write)
+
+    def _store(self, kind, key, write):
+        path = self._entry_path(kind, key)
+        kind_dir = os.path.dirname(path)
+        tmp_path = None
+        try:
+            try:
+                os.makedirs(kind_dir)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+
+            fd, tmp_path = tempfile.mkstemp(dir=kind_dir, prefix=".tmp")
+            os.close(fd)
+            write(tmp_path)
+            os.rename(tmp_path, path)
+            self.evict()
+        except (IOError, OSError) as e:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            if self._debug:
+                self._debug("Failed to store cache entry '%s': %s" % (path, e))
+            return None
+        return path
+
+    def _entries(self):
+        entries = []
+        for dirpath, dirnames, filenames in os.walk(self._cache_dir):
+            for filename in filenames:
+                if filename.startswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # removed by a concurrent eviction
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """
+        Remove the entries not used for max_age seconds, then the least
+        recently used entries until the total size of the cache is within
+        max_size.
+        :return: List of the removed entry paths.
+        """
+        removed = []
+        if self._max_size is None and self._max_age is None:
+            return removed
+
+        entries = self._entries()
+        total_size = sum(entry[1] for entry in entries)
+        oldest = None
+        if self._max_age is not None:
+            oldest = time.time() - self._max_age
+        for mtime, size, path in sorted(entries):
+            if (oldest is None or mtime >= oldest) and (
+                self._max_size is None or total_size <= self._max_size
+            ):
+                break
+            try:
+                os.remove(path)
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    raise
+            total_size -= size
+            removed.append(path)
+        return removed
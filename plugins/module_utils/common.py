@@ -29,6 +29,10 @@ def to_list(val):
 
 
 def find_file_in_path(filename):
+    """
+    Deprecated, the collection does not use it anymore. It will be removed
+    in a future major release.
+    """
     # Check $PATH first, followed by same directory as sys.argv[0]
     paths = os.environ["PATH"].split(os.pathsep) + [
         os.path.dirname(sys.argv[0])
@@ -52,6 +56,10 @@ def find_share_path(filename):
 
 
 def load_from_source(path, name):
+    """
+    Deprecated, the collection does not use it anymore. It will be removed
+    in a future major release.
+    """
     if imp is None:
         loader = importlib.machinery.SourceFileLoader(name, path)
         module = loader.load_module()
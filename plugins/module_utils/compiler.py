@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import copy
+import io
+import optparse
+import os
+import sys
+import threading
+
+from collections import OrderedDict
+
+from ansible.module_utils.basic import missing_required_lib
+from ansible.module_utils.six import StringIO
+
+from ansible_collections.community.yang.plugins.module_utils.index import (
+    MODULE_INDEX,
+)
+
+try:
+    from pyang import context, error, plugin, repository, syntax
+
+    HAS_PYANG = True
+except ImportError:
+    HAS_PYANG = False
+
+_PLUGINS = None
+_FORMATS = None
+_DEFAULT_OPTS = None
+# pristine module level state of the output plugins, see _reset_plugin_state
+_PLUGIN_STATE = {}
+# pyang plugins keep state in the plugin registry, on the plugin instances
+# and at module level, only one thread at a time initializes or runs them
+_LOCK = threading.RLock()
+
+# output plugins of the collection registered along with the pyang ones
+_EXTRA_PLUGINS = []
+
+# maximum number of validated contexts kept by the process
+CONTEXT_CACHE_SIZE = 8
+_CONTEXTS = OrderedDict()
+
+
+def _load_plugins():
+    """
+    Initialize the pyang plugins, the output formats they provide and the
+    default values of their options. pyang keeps registered plugins in a
+    module level list which its command line front-end clears and refills,
+    work on a private copy instead.
+    """
+    global _PLUGINS, _FORMATS, _DEFAULT_OPTS
+    with _LOCK:
+        if _PLUGINS is None:
+            saved_plugins = plugin.plugins[:]
+            del plugin.plugins[:]
+            try:
+                plugin.init([])
+                plugins = plugin.plugins[:] + _EXTRA_PLUGINS
+
+                formats = {}
+                optparser = optparse.OptionParser(add_help_option=False)
+                for p in plugins:
+                    p.add_output_format(formats)
+                    # some plugins only add options if others are registered
+                    p.add_opts(optparser)
+                default_opts, args = optparser.parse_args([])
+            finally:
+                plugin.plugins[:] = saved_plugins
+
+            for p in plugins:
+                module = sys.modules.get(type(p).__module__)
+                # the jsonxsl plugin builds the stylesheet on a module level
+                # element which grows with every run
+                if (
+                    module is not None
+                    and hasattr(module, "ss")
+                    and module not in _PLUGIN_STATE
+                ):
+                    _PLUGIN_STATE[module] = copy.deepcopy(module.ss)
+
+            default_opts.verbose = False
+            default_opts.features = []
+            default_opts.exclude_features = []
+            default_opts.deviations = []
+            _PLUGINS, _FORMATS, _DEFAULT_OPTS = plugins, formats, default_opts
+    return _PLUGINS, _FORMATS
+
+
+def register_plugin(plugin_cls):
+    """
+    Register an output plugin of the collection, the output formats it adds
+    are then available to emit() along with the pyang ones.
+    :param plugin_cls: The pyang.plugin.PyangPlugin subclass
+    """
+    global _PLUGINS
+    with _LOCK:
+        if any(type(p) is plugin_cls for p in _EXTRA_PLUGINS):
+            return
+        _EXTRA_PLUGINS.append(plugin_cls())
+        # the formats and the default options are collected again
+        _PLUGINS = None
+
+
+def _reset_plugin_state():
+    for module, stylesheet in _PLUGIN_STATE.items():
+        module.ss = copy.deepcopy(stylesheet)
+
+
+def _build_opts(options):
+    """
+    Build the option values pyang plugins read from ctx.opts with their
+    defaults, updated with the given options.
+    """
+    opts = copy.copy(_DEFAULT_OPTS)
+    for key, value in options.items():
+        setattr(opts, key, value)
+    return opts
+
+
+def _format_errors(ctx, filenames, modulenames):
+    """
+    Collect the errors reported while validating the modules given on the
+    command line, errors in implicitly imported modules are skipped the same
+    way the pyang front-end does.
+    """
+    errors = []
+    for epos, etag, eargs in ctx.errors:
+        if (
+            ctx.implicit_errors is False
+            and epos.top is not None
+            and epos.top.arg not in modulenames
+            and getattr(epos.top, "i_modulename", None) not in modulenames
+            and epos.ref not in filenames
+        ):
+            continue
+        if error.is_warning(error.err_level(etag)):
+            continue
+        errors.append(
+            "%s: error: %s" % (epos.label(), error.err_to_str(etag, eargs))
+        )
+    return errors
+
+
+def load_modules(yang_files, search_path, **options):
+    """
+    Parse and validate the yang files in the current process. Validated
+    contexts are cached by the process and shared with emit(), the returned
+    context and modules must not be modified.
+    :param yang_files: List of yang file paths to load
+    :param search_path: Colon separated list of directories to search for
+                        imported yang modules
+    :param options: Options set on ctx.opts
+    :return: Tuple of the pyang context and the list of loaded modules
+    """
+    return _get_context(yang_files, search_path, options)
+
+
+def emit(fmt, yang_files, search_path, **options):
+    """
+    Validate the yang files and render them with a pyang output format in
+    the current process, without touching sys.argv, the standard streams or
+    the environment. Errors are collected from the pyang context of the
+    call, emit may be called from several threads. The yang files are
+    validated once per process for all the formats that do not hook into
+    the validation.
+    :param fmt: The pyang output format (jtox, jsonxsl, tree, ...)
+    :param yang_files: List of yang file paths to render
+    :param search_path: Colon separated list of directories to search for
+                        imported yang modules
+    :param options: Output format specific options set on ctx.opts
+    :return: The rendered output as string
+    """
+    if not HAS_PYANG:
+        raise ValueError(missing_required_lib("pyang"))
+
+    plugins, formats = _load_plugins()
+    if fmt not in formats:
+        raise ValueError("unsupported pyang output format '%s'" % fmt)
+    emit_obj = formats[fmt]
+
+    fd = StringIO()
+    with _LOCK:
+        if _shares_context(emit_obj):
+            ctx, modules = _get_context(yang_files, search_path, {})
+            ctx.opts = _build_opts(options)
+            emit_obj.setup_fmt(ctx)
+        else:
+            ctx, modules = _load(emit_obj, yang_files, search_path, options)
+        # output plugins may drop statements they have processed
+        children = [(m, m.i_children[:]) for m in ctx.modules.values()]
+        _reset_plugin_state()
+        try:
+            emit_obj.emit(ctx, modules, fd)
+        except error.EmitError as exc:
+            raise ValueError(exc.msg)
+        finally:
+            for m, i_children in children:
+                m.i_children[:] = i_children
+    return fd.getvalue()
+
+
+def _shares_context(emit_obj):
+    # formats hooking into the validation need a context of their own
+    cls = type(emit_obj)
+    return all(
+        getattr(cls, name) == getattr(plugin.PyangPlugin, name)
+        for name in ("pre_validate", "post_validate")
+    )
+
+
+def _get_context(yang_files, search_path, options):
+    """
+    Return the validated context of the yang files from the process cache,
+    load it on a miss. Entries are keyed by the yang files, with their
+    modification time and size, the search path, the content of the modules
+    they depend on and the options. The order of the yang files is not part
+    of the key, the modules are returned in the order of yang_files.
+    """
+    key = (
+        tuple(sorted(_file_key(f) for f in yang_files)),
+        search_path,
+        dependency_digest(yang_files, search_path),
+        tuple(sorted((k, repr(v)) for k, v in options.items())),
+    )
+    with _LOCK:
+        entry = _CONTEXTS.pop(key, None)
+        if entry is None:
+            entry = _load(None, yang_files, search_path, options)
+        _CONTEXTS[key] = entry
+        while len(_CONTEXTS) > CONTEXT_CACHE_SIZE:
+            _CONTEXTS.popitem(last=False)
+    # the entry is shared by all the orders of the yang files, the modules
+    # are returned in the order of the yang files of the call
+    ctx, modules = entry
+    positions = dict(
+        (os.path.realpath(path), index)
+        for index, path in enumerate(yang_files)
+    )
+    return (
+        ctx,
+        sorted(
+            modules,
+            key=lambda m: positions.get(
+                os.path.realpath(m.pos.ref), len(positions)
+            ),
+        ),
+    )
+
+
+def _file_key(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        # reported while loading
+        return (path, None, None)
+    return (os.path.realpath(path), stat.st_mtime, stat.st_size)
+
+
+def clear_cache():
+    """
+    Drop the validated contexts cached by the process.
+    """
+    with _LOCK:
+        _CONTEXTS.clear()
+
+
+def _search_path_repository(search_path):
+    # pyang searches the current directory and its installed modules too
+    path = "%s%s." % (search_path, os.pathsep) if search_path else "."
+    return repository.FileRepository(path)
+
+
+def index_search_path(search_path):
+    """
+    Index the modules of the search path ahead of time. Processes forked
+    afterwards inherit the index of this process, the other ones read the
+    index stored on disk instead of scanning the search path again.
+    :param search_path: Colon separated list of directories to search for
+                        imported yang modules
+    :return: Number of the indexed yang files.
+    """
+    if not HAS_PYANG:
+        return 0
+    return len(MODULE_INDEX.modules(_search_path_repository(search_path).dirs))
+
+
+def dependency_digest(yang_files, search_path):
+    """
+    Return a digest of the content of the modules the yang files import or
+    include from the search path, directly or not, so artifacts generated
+    from the yang files are invalidated only when one of their dependencies
+    changes.
+    :param yang_files: List of yang file paths
+    :param search_path: Colon separated list of directories to search for
+                        imported yang modules
+    :return: Hex digest string, None when the module index can not resolve
+             the dependencies.
+    """
+    if not HAS_PYANG:
+        return None
+    return MODULE_INDEX.dependency_digest(
+        yang_files, _search_path_repository(search_path).dirs
+    )
+
+
+def _repository(search_path, yang_files):
+    """
+    Return the pyang repository of the search path, limited to the modules
+    the yang files depend on as found in the module index. pyang scans the
+    whole search path itself when the index can not resolve a dependency.
+    """
+    repo = _search_path_repository(search_path)
+    entries = MODULE_INDEX.dependencies(yang_files, repo.dirs)
+    if entries is not None:
+        repo.modules = [
+            (
+                entry["name"],
+                entry["revision"],
+                (entry["format"], entry["path"]),
+            )
+            for entry in entries
+        ]
+    return repo
+
+
+def _load(emit_obj, yang_files, search_path, options):
+    if not HAS_PYANG:
+        raise ValueError(missing_required_lib("pyang"))
+
+    plugins, formats = _load_plugins()
+
+    ctx = context.Context(_repository(search_path, yang_files))
+    ctx.opts = _build_opts(options)
+    ctx.lax_quote_checks = True
+
+    for p in plugins:
+        p.setup_ctx(ctx)
+    if emit_obj is not None:
+        emit_obj.setup_fmt(ctx)
+    else:
+        # only report errors of the given modules, as the output plugins do
+        ctx.implicit_errors = False
+    for p in plugins:
+        p.pre_load_modules(ctx)
+
+    modules = []
+    for filename in yang_files:
+        try:
+            with io.open(filename, "r", encoding="utf-8") as fp:
+                text = fp.read()
+        except (IOError, UnicodeDecodeError) as exc:
+            raise ValueError("error %s: %s" % (filename, exc))
+
+        match = syntax.re_filename.search(os.path.basename(filename))
+        if match is not None:
+            name, rev, in_format = match.groups()
+            module = ctx.add_module(
+                filename,
+                text,
+                in_format,
+                name,
+                rev,
+                expect_failure_error=False,
+                primary_module=True,
+            )
+        else:
+            module = ctx.add_module(filename, text, primary_module=True)
+        if module is not None:
+            modules.append(module)
+
+    modulenames = []
+    for m in modules:
+        modulenames.append(m.arg)
+        for s in m.search("include"):
+            modulenames.append(s.arg)
+
+    for p in plugins:
+        p.pre_validate_ctx(ctx, modules)
+    if emit_obj is not None and modules:
+        emit_obj.pre_validate(ctx, modules)
+    ctx.validate()
+    for m in modules:
+        m.prune()
+    if emit_obj is not None and modules:
+        emit_obj.post_validate(ctx, modules)
+    for p in plugins:
+        p.post_validate_ctx(ctx, modules)
+
+    errors = _format_errors(ctx, yang_files, modulenames)
+    if errors or len(modules) != len(yang_files):
+        raise ValueError("\n".join(errors) or "failed to load yang files")
+    return ctx, modules
@@ -0,0 +1,933 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import numbers
+import re
+
+from ansible.module_utils._text import to_text
+from ansible.module_utils.six import string_types
+
+try:
+    from pyang.util import unique_prefixes
+
+    HAS_PYANG = True
+except ImportError:
+    HAS_PYANG = False
+
+try:
+    from lxml import etree
+
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+NETCONF_BASE_NS = "urn:ietf:params:xml:ns:netconf:base:1.0"
+DATA_ROOT_TAGS = (
+    "{%s}data" % NETCONF_BASE_NS,
+    "{%s}config" % NETCONF_BASE_NS,
+)
+
+# value classes of leaf types, same as the pyang jsonxsl plugin
+UNQUOTED_TYPES = (
+    "boolean",
+    "int8",
+    "int16",
+    "int32",
+    "uint8",
+    "uint16",
+    "uint32",
+)
+TYPE_CLASS = dict((t, "unquoted") for t in UNQUOTED_TYPES)
+TYPE_CLASS.update(
+    (t, t) for t in ("empty", "instance-identifier", "identityref", "string")
+)
+UNION_CLASS = dict((t, "integer") for t in UNQUOTED_TYPES if t != "boolean")
+UNION_CLASS["boolean"] = "boolean"
+STRING_TYPES = (
+    "string",
+    "enumeration",
+    "bits",
+    "binary",
+    "identityref",
+    "instance-identifier",
+)
+
+XML_SPACE_RE = re.compile(r"[ \t\r\n]+")
+DIGITS_RE = re.compile(r"^[0-9]+$")
+
+# tokens of instance-identifier values, same as the pyang json2xml script
+IDENTIFIER = "[a-zA-Z_][-_.a-zA-Z0-9]*"
+QNAME_RE = re.compile(r"^\s*(%s(?::%s)?)\s*(.*)$" % (IDENTIFIER, IDENTIFIER))
+POSITION_RE = re.compile(r"^\s*([0-9]+)\s*\]\s*(.*)$")
+PREDICATE_RE = re.compile(
+    r"""^=\s*([^"'\]\s]+|"[^"]*"|'[^']*')\s*\]\s*(.*)$"""
+)
+
+
+class SchemaNode(object):
+    """
+    Data node of the schema tree used by the encoders, built from the
+    compiled pyang statements.
+    """
+
+    __slots__ = (
+        "keyword",
+        "name",
+        "module",
+        "namespace",
+        "member",
+        "children",
+        "members",
+        "keys",
+        "type",
+        "base_type",
+    )
+
+    def __init__(self, keyword, name, module, namespace, member=None):
+        self.keyword = keyword
+        self.name = name
+        self.module = module
+        self.namespace = namespace
+        # JSON member name, qualified if the parent is in another module
+        self.member = member
+        self.children = {}
+        # children keyed by their JSON member name
+        self.members = {}
+        # (module, name) tuples of the list keys, in order
+        self.keys = None
+        # value class used to encode XML values to JSON
+        self.type = None
+        # base type used to encode JSON values to XML, as jtox reports it
+        self.base_type = None
+
+
+class Schema(object):
+    """
+    Schema tree of the data nodes defined by a set of yang modules. Child
+    nodes are keyed by their (namespace, name) tuple, the way they are
+    identified in a XML document, and by their JSON member name.
+    """
+
+    def __init__(self, ctx, modules):
+        """
+        :param ctx: The pyang context the modules were validated with
+        :param modules: List of the compiled pyang modules
+        """
+        self.root = SchemaNode(None, None, None, None)
+        self.ns_to_module = {}
+        # module name to (prefix, namespace), prefixes are made unique
+        self.prefixes = {}
+        for module, prefix in unique_prefixes(ctx).items():
+            namespace = module.search_one("namespace")
+            if namespace is not None:
+                self.ns_to_module[namespace.arg] = module.arg
+                self.prefixes[module.arg] = (prefix, namespace.arg)
+        # metadata annotations ("module:name") to their base type
+        self.annotations = {}
+        for module in modules:
+            for ann in module.search(("ietf-yang-metadata", "annotation")):
+                typ = ann.search_one("type")
+                self.annotations["%s:%s" % (module.arg, ann.arg)] = (
+                    "string" if typ is None else _base_type(ann, typ)
+                )
+        for module in modules:
+            self._add_children(module, self.root)
+
+    def _add_children(self, stmt, parent):
+        for ch in stmt.i_children:
+            if ch.keyword in ("rpc", "action", "notification"):
+                continue
+            if ch.keyword in ("choice", "case"):
+                self._add_children(ch, parent)
+                continue
+            main_module = ch.main_module()
+            if parent.module == main_module.arg:
+                member = ch.arg
+            else:
+                member = "%s:%s" % (main_module.arg, ch.arg)
+            node = SchemaNode(
+                ch.keyword,
+                ch.arg,
+                main_module.arg,
+                main_module.search_one("namespace").arg,
+                member,
+            )
+            parent.children[(node.namespace, node.name)] = node
+            parent.members[member] = node
+            if ch.keyword in ("leaf", "leaf-list"):
+                node.type = _type_param(ch)
+                node.base_type = _base_type(ch, ch.search_one("type"))
+            elif ch.keyword in ("container", "list"):
+                self._add_children(ch, node)
+                if ch.keyword == "list":
+                    node.keys = [
+                        (k.main_module().arg, k.arg) for k in ch.i_key
+                    ]
+
+
+def _base_type(node, typ):
+    """
+    Resolve the built-in type of a leaf, leaf-list or annotation the way
+    the pyang jtox plugin does.
+    :return: The type name, ["decimal64", fraction digits] or
+             ["union", [member types]]
+    """
+    while True:
+        if typ.arg == "leafref":
+            if typ.i_module.i_version == "1":
+                target = typ.i_type_spec.i_target_node
+            else:
+                target = node.i_leafref.i_target_node
+        elif typ.i_typedef is None:
+            break
+        else:
+            target = typ.i_typedef
+        typ = target.search_one("type")
+    if typ.arg == "decimal64":
+        return [typ.arg, int(typ.search_one("fraction-digits").arg)]
+    if typ.arg == "union":
+        return [
+            typ.arg,
+            [_base_type(node, member) for member in typ.i_type_spec.types],
+        ]
+    return typ.arg
+
+
+def _get_types(node):
+    types = []
+
+    def resolve(typ):
+        if typ.arg == "union":
+            for member in typ.i_type_spec.types:
+                resolve(member)
+        elif typ.arg == "decimal64":
+            types.append("decimal@" + typ.search_one("fraction-digits").arg)
+        elif typ.i_typedef is not None:
+            resolve(typ.i_typedef.search_one("type"))
+        else:
+            types.append(typ.arg)
+
+    typ = node.search_one("type")
+    if typ.arg == "leafref" and getattr(node, "i_leafref_ptr", None):
+        resolve(node.i_leafref_ptr[0].search_one("type"))
+    else:
+        resolve(typ)
+    return types
+
+
+def _type_param(node):
+    """
+    Classify the type of a leaf or leaf-list for the JSON encoding.
+    :return: Tuple of the value class and the union member options
+    """
+    types = _get_types(node)
+    first = types[0]
+    if len(types) == 1:
+        return TYPE_CLASS.get(first, "other"), None
+    if first in STRING_TYPES:
+        return "string", None
+
+    options = []
+    for typ in types:
+        if typ in UNION_CLASS:
+            option = UNION_CLASS[typ]
+        elif typ in ("int64", "uint64") or typ.startswith("decimal@"):
+            option = typ
+        else:
+            option = "other"
+        if option not in options:
+            options.append(option)
+            if option == "other":
+                break
+    return "union", options
+
+
+def _normalize_space(text):
+    return XML_SPACE_RE.sub(" ", text or "").strip(" ")
+
+
+def _value_type(text):
+    if text in ("true", "false"):
+        return "boolean"
+    unsigned = text[1:] if text[:1] in ("+", "-") else text
+    if "." in unsigned:
+        whole, sep, fract = unsigned.partition(".")
+        if DIGITS_RE.match(whole) and DIGITS_RE.match(fract):
+            return "decimal@%d" % len(fract)
+        return "other"
+    if DIGITS_RE.match(unsigned):
+        return "integer"
+    return "other"
+
+
+def _resolve_union(text, options):
+    value_type = _value_type(text)
+    for option in options:
+        if (
+            option in ("int64", "uint64")
+            and value_type == "integer"
+            or option.startswith("decimal@")
+            and (
+                value_type == "integer"
+                or value_type.startswith("decimal@")
+                and int(value_type[8:]) <= int(option[8:])
+            )
+        ):
+            return "string"
+        if value_type == option:
+            return "string" if option == "other" else "unquoted"
+    return "string"
+
+
+class XmlToJsonEncoder(object):
+    """
+    Single pass XML to JSON encoder as per RFC 7951 driven by the schema
+    tree, the encoding rules follow the pyang jsonxsl stylesheet. A parsed
+    document is converted to a dict with encode_tree(), while encode()
+    reads the document with iterparse and releases every element once it
+    is encoded, so the memory used does not depend on the size of the
+    document. When streaming, entries of a list or leaf-list are expected
+    to be siblings, as sent by NETCONF servers.
+    """
+
+    def __init__(self, schema):
+        """
+        :param schema: The Schema of the yang modules the data adheres to
+        """
+        self._schema = schema
+
+    def encode_tree(self, root):
+        """
+        Encode a parsed XML document to JSON data
+        :param root: The lxml Element or ElementTree of the XML document
+        :return: data in JSON format.
+        """
+        if isinstance(root, etree._ElementTree):
+            root = root.getroot()
+        if root.tag == "{%s}rpc-reply" % NETCONF_BASE_NS:
+            for child in root:
+                if child.tag in DATA_ROOT_TAGS:
+                    root = child
+                    break
+            else:
+                return {}
+        elif root.tag not in DATA_ROOT_TAGS:
+            raise ValueError("Unsupported xml root element: %s" % root.tag)
+        return self._object(root, self._schema.root)
+
+    def _object(self, elem, node):
+        obj = {}
+        for ch in elem:
+            if not isinstance(ch.tag, str):
+                continue
+            child = node.children.get(_split_tag(ch.tag))
+            if child is None:
+                raise ValueError("Aborting, bad element: %s" % _qname(ch))
+            keyword = child.keyword
+            if keyword == "leaf":
+                obj[child.member] = self._value(ch, child.type)
+            elif keyword == "container":
+                obj[child.member] = self._object(ch, child)
+            elif keyword == "list":
+                # entries are grouped even if they are not siblings
+                entries = obj.get(child.member)
+                if entries is None:
+                    entries = obj[child.member] = []
+                entries.append(self._object(ch, child))
+            elif keyword == "leaf-list":
+                entries = obj.get(child.member)
+                if entries is None:
+                    entries = obj[child.member] = []
+                entries.append(self._value(ch, child.type))
+            else:
+                obj[child.member] = self._anyxml_value(ch)
+        return obj
+
+    def encode(self, source):
+        """
+        Encode a XML document to JSON text
+        :param source: File path or file-like object of the XML document, or
+                       an already parsed lxml Element or ElementTree which is
+                       walked without being modified
+        :return: Generator of JSON text fragments
+        """
+        if isinstance(source, etree._ElementTree):
+            source = source.getroot()
+        if isinstance(source, etree._Element):
+            events = etree.iterwalk(source, events=("start", "end"))
+            return self._encode(events, release=False)
+        return self._encode_source(source)
+
+    def _encode_source(self, source):
+        events = etree.iterparse(
+            source, events=("start", "end"), remove_blank_text=True
+        )
+        try:
+            for chunk in self._encode(events, release=True):
+                yield chunk
+        except etree.XMLSyntaxError as exc:
+            raise ValueError(
+                "Failed to load xml data: %s"
+                % to_text(exc, errors="surrogate_or_strict")
+            )
+
+    def _encode(self, events, release):
+        # one frame per open element: [schema node, first member flag,
+        # open array key, closed array keys]
+        stack = []
+        skip = 0
+        data_root = None
+        reply = None
+        # depth of the elements of the reply other than the data, like ok
+        reply_depth = 0
+        for event, elem in events:
+            if not isinstance(elem.tag, str):
+                # comments and processing instructions
+                continue
+            if skip:
+                # anyxml content is encoded as a whole once it is parsed
+                skip += 1 if event == "start" else -1
+                if skip == 0:
+                    stack.pop()
+                    yield self._encode_anyxml(elem)
+                    if release:
+                        _release(elem)
+                continue
+
+            if data_root is None:
+                if event == "end":
+                    if elem is reply or reply is None:
+                        break
+                    reply_depth -= 1
+                    if release:
+                        _release(elem)
+                elif reply_depth == 0 and elem.tag in DATA_ROOT_TAGS:
+                    data_root = elem
+                    stack.append([self._schema.root, True, None, set()])
+                    yield "{"
+                elif reply is not None:
+                    reply_depth += 1
+                elif elem.tag == "{%s}rpc-reply" % NETCONF_BASE_NS:
+                    reply = elem
+                else:
+                    raise ValueError(
+                        "Unsupported xml root element: %s" % elem.tag
+                    )
+                continue
+
+            if event == "start":
+                frame = stack[-1]
+                node = frame[0]
+                if node.keyword in ("leaf", "leaf-list"):
+                    raise ValueError(
+                        "Aborting, bad element: %s" % _qname(elem)
+                    )
+                child = node.children.get(_split_tag(elem.tag))
+                if child is None:
+                    raise ValueError(
+                        "Aborting, bad element: %s" % _qname(elem)
+                    )
+                for chunk in self._start_member(frame, child):
+                    yield chunk
+                stack.append([child, True, None, set()])
+                if child.keyword in ("anyxml", "anydata"):
+                    skip = 1
+            else:
+                frame = stack.pop()
+                if elem is data_root:
+                    if frame[2] is not None:
+                        yield "]"
+                    yield "}"
+                    break
+                node = frame[0]
+                if node.keyword in ("leaf", "leaf-list"):
+                    yield self._encode_value(elem, node.type)
+                else:
+                    if frame[2] is not None:
+                        yield "]"
+                    yield "}"
+                if release:
+                    _release(elem)
+
+        if data_root is None:
+            yield "{}"
+
+    def _start_member(self, frame, node):
+        first, open_key, closed_keys = frame[1:]
+        key = (node.namespace, node.name)
+        if open_key is not None and open_key != key:
+            yield "]"
+            closed_keys.add(open_key)
+            frame[2] = open_key = None
+
+        if node.keyword in ("list", "leaf-list"):
+            if open_key == key:
+                yield ","
+            else:
+                if key in closed_keys:
+                    raise ValueError(
+                        "entries of %s:%s are not siblings, unable to "
+                        "stream the document" % (node.module, node.name)
+                    )
+                yield "%s%s: [" % (
+                    "" if first else ",",
+                    json.dumps(node.member),
+                )
+                frame[2] = key
+            if node.keyword == "list":
+                yield "{"
+        else:
+            yield "%s%s: %s" % (
+                "" if first else ",",
+                json.dumps(node.member),
+                "{" if node.keyword == "container" else "",
+            )
+        frame[1] = False
+
+    def _encode_value(self, elem, type_param):
+        value_class, options = type_param
+        if value_class == "union":
+            value_class = _resolve_union(elem.text or "", options)
+        if value_class == "unquoted":
+            return _normalize_space(elem.text)
+        return json.dumps(self._value(elem, (value_class, None)))
+
+    def _value(self, elem, type_param):
+        value_class, options = type_param
+        text = elem.text or ""
+        if value_class == "union":
+            value_class = _resolve_union(text, options)
+
+        if value_class == "unquoted":
+            value = _normalize_space(text)
+            if value == "true":
+                return True
+            if value == "false":
+                return False
+            try:
+                return int(value)
+            except ValueError:
+                pass
+            try:
+                return json.loads(value)
+            except ValueError:
+                raise ValueError(
+                    "Invalid value '%s' of %s" % (value, _qname(elem))
+                )
+        if value_class == "empty":
+            return [None]
+        if value_class == "identityref":
+            value = _normalize_space(text)
+            prefix, sep, name = value.partition(":")
+            if sep:
+                value = "%s:%s" % (self._translate_prefix(elem, prefix), name)
+            return value
+        if value_class == "instance-identifier":
+            value = _normalize_space(text)
+            if not value.startswith("/"):
+                raise ValueError("Wrong instance identifier: %s" % value)
+            return self._translate_path(elem, value)
+        if value_class == "string":
+            return text
+        return _normalize_space(text)
+
+    def _translate_prefix(self, elem, prefix):
+        module = self._schema.ns_to_module.get(
+            elem.nsmap.get(_normalize_space(prefix) or None)
+        )
+        if module is None:
+            raise ValueError("Undefined namespace prefix: %s" % prefix)
+        return module
+
+    def _translate_path(self, elem, text):
+        result = []
+        old_prefix = None
+        while text:
+            first = text[0]
+            result.append(first)
+            if first == "/" or (
+                first == "["
+                and len(_substring_before(text, ":"))
+                < len(_substring_before(text, "]"))
+            ):
+                prefix = _substring_before(text[1:], ":")
+                if prefix != old_prefix:
+                    result.append(self._translate_prefix(elem, prefix) + ":")
+                    old_prefix = prefix
+                text = _substring_after(text, ":")
+            elif first in ("'", '"'):
+                rest = text[1:]
+                result.append(_substring_before(rest, first) + first)
+                text = _substring_after(rest, first)
+            else:
+                text = text[1:]
+        return "".join(result)
+
+    def _encode_anyxml(self, elem):
+        return json.dumps(self._anyxml_value(elem))
+
+    def _anyxml_value(self, elem):
+        groups = {}
+        for ch in elem:
+            if isinstance(ch.tag, str):
+                groups.setdefault(_qname(ch), []).append(ch)
+        obj = {}
+        for name, entries in groups.items():
+            values = [
+                self._anyxml_value(c) if len(c) else c.text or ""
+                for c in entries
+            ]
+            obj[name] = values if len(values) > 1 else values[0]
+        return obj
+
+
+class JsonToXmlEncoder(object):
+    """
+    JSON to XML encoder as per RFC 7951 driven by the schema tree, the
+    encoding rules follow the pyang json2xml script. The lxml tree is built
+    directly from the JSON data, list keys are placed first and metadata
+    annotations ("@" members) are set as attributes of the elements.
+    """
+
+    def __init__(self, schema):
+        """
+        :param schema: The Schema of the yang modules the data adheres to
+        """
+        self._schema = schema
+        self._nsmap = {"nc": NETCONF_BASE_NS}
+        # prefixes used in identityref and instance-identifier values
+        self._prefixes = {}
+        for module, (prefix, namespace) in schema.prefixes.items():
+            if namespace == NETCONF_BASE_NS:
+                self._prefixes[module] = "nc"
+            else:
+                self._nsmap[prefix] = namespace
+                self._prefixes[module] = prefix
+
+    def encode(self, json_obj, doctype="config"):
+        """
+        Encode JSON data to a XML document
+        :param json_obj: The JSON data as dict
+        :param doctype: Name of the netconf root element (config or data)
+        :return: The lxml root element of the XML document.
+        """
+        root = etree.Element(
+            "{%s}%s" % (NETCONF_BASE_NS, doctype), nsmap=self._nsmap
+        )
+        self._object(json_obj, None, self._schema.root, root, "/")
+        return root
+
+    def _qname(self, module, name):
+        return "{%s}%s" % (self._schema.prefixes[module][1], name)
+
+    def _lookup(self, member, module, node, path):
+        """
+        Find the schema node of a JSON member, a member in the module of its
+        parent may also be qualified.
+        :return: Tuple of the schema node and its module name
+        """
+        child = node.members.get(member)
+        if child is None:
+            prefix, sep, name = member.partition(":")
+            if sep and prefix == module:
+                child = node.members.get(name)
+            if child is None:
+                raise ValueError("error at %s - invalid node" % path)
+        return child, child.module
+
+    def _object(self, json_obj, module, node, parent, path):
+        for key, value in json_obj.items():
+            if key.startswith("@"):
+                if key == "@":
+                    self._annotations(value, parent, module, path)
+                continue
+            member_path = path + key
+            child, child_module = self._lookup(key, module, node, member_path)
+            qname = self._qname(child_module, child.name)
+            keyword = child.keyword
+            if keyword == "container":
+                _check_value(isinstance(value, dict), member_path, keyword)
+                elem = etree.SubElement(parent, qname)
+                self._object(
+                    value, child_module, child, elem, member_path + "/"
+                )
+            elif keyword == "list":
+                _check_value(_is_array(value), member_path, keyword)
+                for index, entry in enumerate(value):
+                    _check_value(
+                        isinstance(entry, dict), member_path, "list entry"
+                    )
+                    entry_path = "%s/%d/" % (member_path, index)
+                    elem = etree.SubElement(parent, qname)
+                    self._object(entry, child_module, child, elem, entry_path)
+                    self._order_keys(elem, child.keys, entry_path)
+            elif keyword == "leaf":
+                _check_value(_is_scalar(value), member_path, keyword)
+                self._leaf(
+                    value,
+                    child.base_type,
+                    child_module,
+                    qname,
+                    parent,
+                    member_path,
+                    json_obj.get("@" + key),
+                )
+            elif keyword == "leaf-list":
+                _check_value(_is_array(value), member_path, keyword)
+                annotations = json_obj.get("@" + key) or []
+                for index, entry in enumerate(value):
+                    _check_value(
+                        _is_scalar(entry), member_path, "leaf-list entry"
+                    )
+                    self._leaf(
+                        entry,
+                        child.base_type,
+                        child_module,
+                        qname,
+                        parent,
+                        "%s/%d" % (member_path, index),
+                        annotations[index]
+                        if index < len(annotations)
+                        else None,
+                    )
+            else:
+                elem = etree.SubElement(parent, qname)
+                annotations = json_obj.get("@" + key)
+                if annotations:
+                    self._annotations(
+                        annotations, elem, child_module, member_path
+                    )
+                if isinstance(value, dict):
+                    _anyxml(value, elem)
+                else:
+                    elem.text = to_text(value)
+
+    def _order_keys(self, elem, keys, path):
+        # keys come first and in the order they are defined
+        for module, name in reversed(keys):
+            key_elem = elem.find(self._qname(module, name))
+            if key_elem is None:
+                raise ValueError(
+                    "error at %s - missing key '%s:%s'" % (path, module, name)
+                )
+            elem.insert(0, key_elem)
+
+    def _leaf(self, value, base_type, module, qname, parent, path, ann_obj):
+        text = self._text_value(value, base_type, module)
+        if text is None:
+            raise _data_type_error(path, base_type, value)
+        elem = etree.SubElement(parent, qname)
+        elem.text = text
+        if ann_obj:
+            self._annotations(ann_obj, elem, module, path)
+
+    def _annotations(self, ann_obj, elem, module, path):
+        if not isinstance(ann_obj, dict):
+            raise ValueError("error at %s - invalid annotation object" % path)
+        for ann, value in ann_obj.items():
+            base_type = self._schema.annotations.get(ann)
+            if base_type is None:
+                raise ValueError(
+                    "error at %s - invalid annotation %s" % (path, ann)
+                )
+            text = self._text_value(value, base_type, module)
+            if text is None:
+                raise _data_type_error(path + "/@" + ann, base_type, value)
+            ann_module, sep, name = ann.partition(":")
+            elem.set(self._qname(ann_module, name), text)
+
+    def _text_value(self, value, base_type, module):
+        """
+        Return the XML text of a JSON value or None if it is not a valid
+        value of the type.
+        """
+        typ = base_type[0] if isinstance(base_type, list) else base_type
+        if typ == "empty":
+            return "" if value == [None] else None
+        if typ.startswith("int"):
+            return _int_value(value, int(typ[3:]), False)
+        if typ.startswith("uint"):
+            return _int_value(value, int(typ[4:]), True)
+        if typ == "decimal64":
+            return _decimal_value(value, base_type[1])
+        if typ == "boolean":
+            if value is True:
+                return "true"
+            if value is False:
+                return "false"
+            return None
+        if typ == "union":
+            for member_type in base_type[1]:
+                text = self._text_value(value, member_type, module)
+                if text is not None:
+                    return text
+            return None
+        if typ == "identityref":
+            if not isinstance(value, string_types):
+                return None
+            prefix, sep, name = value.partition(":")
+            if not sep:
+                prefix, name = module, value
+            if prefix not in self._prefixes:
+                return None
+            return "%s:%s" % (self._prefixes[prefix], name)
+        if typ == "instance-identifier":
+            if not isinstance(value, string_types):
+                return None
+            return self._instance_identifier(value)
+        return to_text(value)
+
+    def _instance_identifier(self, value):
+        result = []
+        node = self._schema.root
+        module = None
+        rest = value.strip()
+        try:
+            while rest:
+                first = rest[0]
+                result.append(first)
+                if first == "/":
+                    match = QNAME_RE.search(rest[1:])
+                    child, module = self._lookup(
+                        match.group(1), module, node, value
+                    )
+                    result.append(
+                        "%s:%s" % (self._prefixes[module], child.name)
+                    )
+                    rest = match.group(2)
+                    if child.keyword in ("container", "list"):
+                        node = child
+                elif first == "[":
+                    match = POSITION_RE.search(rest[1:])
+                    if match is None:
+                        match = QNAME_RE.search(rest[1:])
+                        child, module = self._lookup(
+                            match.group(1), module, node, value
+                        )
+                        result.append(
+                            "%s:%s=" % (self._prefixes[module], child.name)
+                        )
+                        match = PREDICATE_RE.search(match.group(2))
+                    result.append(match.group(1).strip() + "]")
+                    rest = match.group(2)
+                else:
+                    return None
+        except (AttributeError, ValueError):
+            # no match of the tokens or unknown nodes
+            return None
+        return "".join(result)
+
+
+def _is_array(value):
+    return isinstance(value, list) and value != [None]
+
+
+def _is_scalar(value):
+    return not (_is_array(value) or isinstance(value, dict))
+
+
+def _check_value(cond, path, node_type):
+    if not cond:
+        raise ValueError("error at %s -  must be a %s" % (path, node_type))
+
+
+def _data_type_error(path, base_type, value):
+    typ = base_type[0] if isinstance(base_type, list) else base_type
+    return ValueError(
+        'error at %s - %r is not a valid value of "%s" type'
+        % (path, value, typ)
+    )
+
+
+def _int_value(value, bits, unsigned):
+    if isinstance(value, bool):
+        return None
+    if (
+        bits == 64
+        and isinstance(value, string_types)
+        or isinstance(value, numbers.Integral)
+        or isinstance(value, numbers.Real)
+        and value.is_integer()
+    ):
+        try:
+            value = int(value)
+        except ValueError:
+            return None
+    else:
+        return None
+    if unsigned:
+        low, high = 0, 2 ** bits
+    else:
+        high = 2 ** (bits - 1)
+        low = -high
+    return "%d" % value if low <= value < high else None
+
+
+def _decimal_value(value, fraction_digits):
+    if not isinstance(value, string_types):
+        return None
+    whole, dot, fraction = value.partition(".")
+    try:
+        if dot:
+            fraction = fraction.rstrip("0") or "0"
+            if len(fraction) > fraction_digits:
+                return None
+            number = int(whole + fraction)
+        else:
+            number = int(whole)
+    except ValueError:
+        return None
+    if not -(2 ** 63) <= number < 2 ** 63:
+        return None
+    return whole + dot + fraction
+
+
+def _anyxml(obj, parent):
+    for name, value in obj.items():
+        if isinstance(value, dict):
+            _anyxml(value, etree.SubElement(parent, name))
+        elif isinstance(value, list):
+            for entry in value:
+                elem = etree.SubElement(parent, name)
+                if isinstance(entry, dict):
+                    _anyxml(entry, elem)
+                else:
+                    elem.text = to_text(entry)
+        else:
+            etree.SubElement(parent, name).text = to_text(value)
+
+
+def _split_tag(tag):
+    namespace, sep, name = tag[1:].partition("}")
+    return (namespace, name) if sep else (None, tag)
+
+
+def _qname(elem):
+    namespace, name = _split_tag(elem.tag)
+    prefix = elem.prefix
+    return "%s:%s" % (prefix, name) if prefix else name
+
+
+def _substring_before(text, sep):
+    before, found, after = text.partition(sep)
+    return before if found else ""
+
+
+def _substring_after(text, sep):
+    before, found, after = text.partition(sep)
+    return after if found else ""
+
+
+def _release(elem):
+    # drop the encoded element and the already encoded preceding siblings
+    elem.clear()
+    parent = elem.getparent()
+    if parent is not None:
+        while elem.getprevious() is not None:
+            del parent[0]
@@ -0,0 +1,520 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import errno
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+from ansible.module_utils._text import to_bytes
+
+YANG_INDEX_DIR_PATH = "~/.ansible/tmp/yang/index"
+# stored indexes not used for that many seconds are evicted
+YANG_INDEX_MAX_AGE = 30 * 24 * 60 * 60
+# bump when the layout of the stored index changes
+INDEX_VERSION = 2
+
+# same as pyang.syntax.re_filename, the files pyang picks from a directory
+_RE_FILENAME = re.compile(
+    r"^([^@]*?)(?:@([^.]*?))?(?:\.yang|\.yin)*\.(yang|yin)$"
+)
+_RE_TOKEN = re.compile(
+    r"\s+|//[^\n]*|/\*.*?\*/"
+    r'|"(?:[^"\\]|\\.)*"|\'[^\']*\''
+    r"|[{};+]|[^\s{};+\"']+",
+    re.S,
+)
+# statements of the module header, linkage, meta and revision sections, the
+# body of the module starts with the first other statement
+_HEADER_KEYWORDS = frozenset(
+    (
+        "yang-version",
+        "namespace",
+        "prefix",
+        "belongs-to",
+        "import",
+        "include",
+        "organization",
+        "contact",
+        "description",
+        "reference",
+        "revision",
+    )
+)
+_CHUNK_SIZE = 8192
+
+
+def parse_header(path):
+    """
+    Read the header of a yang file up to the first body statement
+    :param path: Path of the yang file
+    :return: Dict with the keyword (module or submodule), name, namespace,
+             belongs_to, imports, includes and latest revision of the
+             module, imports and includes are lists of [name, revision-date]
+    :raises ValueError: when the header can not be parsed
+    """
+    size = _CHUNK_SIZE
+    with io.open(path, "r", encoding="utf-8") as fp:
+        text = fp.read(size)
+        eof = len(text) < size
+        while True:
+            header = _parse_statements(text, eof)
+            if header is not None or eof:
+                break
+            size *= 2
+            chunk = fp.read(size)
+            eof = len(chunk) < size
+            text += chunk
+    if header is None:
+        raise ValueError("%s: incomplete yang module header" % path)
+    return header
+
+
+def _parse_statements(text, eof):
+    # returns None when the text ends before the body of the module
+    header = {
+        "keyword": None,
+        "name": None,
+        "namespace": None,
+        "belongs_to": None,
+        "imports": [],
+        "includes": [],
+        "revision": None,
+    }
+    stack = []
+    words = []
+    pos = 0
+    while pos < len(text):
+        match = _RE_TOKEN.match(text, pos)
+        if match is None or match.end() == len(text) and not eof:
+            # a token cut by the end of the chunk
+            if eof:
+                raise ValueError("unterminated string or comment")
+            return None
+        pos = match.end()
+        token = match.group()
+        if token[0].isspace() or token.startswith(("//", "/*")):
+            continue
+        if token == "+":
+            continue
+        if token in ("{", ";"):
+            if not words:
+                raise ValueError("unexpected '%s'" % token)
+            keyword, arg = words[0], "".join(words[1:])
+            words = []
+            if not stack:
+                if keyword not in ("module", "submodule"):
+                    raise ValueError("not a yang module")
+                header["keyword"], header["name"] = keyword, arg
+            elif len(stack) == 1:
+                if keyword not in _HEADER_KEYWORDS and ":" not in keyword:
+                    return header
+                _header_statement(header, keyword, arg)
+            elif len(stack) == 2 and keyword == "revision-date":
+                parent = stack[-1]
+                if parent[0] in ("import", "include"):
+                    header[parent[0] + "s"][-1][1] = arg
+            if token == "{":
+                stack.append((keyword, arg))
+            elif not stack:
+                return header
+        elif token == "}":
+            if not stack:
+                raise ValueError("unexpected '}'")
+            stack.pop()
+            if not stack:
+                return header
+        else:
+            if token[0] in "\"'":
+                token = token[1:-1]
+            words.append(token)
+    return None
+
+
+def _header_statement(header, keyword, arg):
+    if keyword == "namespace":
+        header["namespace"] = arg
+    elif keyword == "belongs-to":
+        header["belongs_to"] = arg
+    elif keyword in ("import", "include"):
+        header[keyword + "s"].append([arg, None])
+    elif keyword == "revision":
+        header["revision"] = max(header["revision"] or "", arg)
+
+
+class ModuleIndex(object):
+    """
+    Index of the yang modules found in the search path directories by
+    module name, revision and namespace. The entries are built by reading
+    the module headers only and are stored on disk, one index file per
+    search path directory. A directory is scanned again only once its
+    modification time changed, so files added, removed or renamed are picked
+    up while unchanged directory trees cost a stat per directory. The
+    entries of the dependencies of yang files are checked against the
+    modification time and size of their file, so files edited in place are
+    read again as well. The stored index of a directory not searched for
+    max_age seconds is evicted.
+    """
+
+    def __init__(
+        self, index_dir=YANG_INDEX_DIR_PATH, max_age=YANG_INDEX_MAX_AGE
+    ):
+        self._index_dir = (
+            os.path.realpath(os.path.expanduser(index_dir))
+            if index_dir
+            else None
+        )
+        self._max_age = max_age
+        # directory -> {subdirectory path: {"mtime", "files", "subdirs"}}
+        self._roots = {}
+        # primary yang file path -> (mtime, size, header)
+        self._headers = {}
+        self._lock = threading.Lock()
+
+    def modules(self, directories, recurse=True):
+        """
+        Return the yang files of the directories, in the order pyang finds
+        them
+        :param directories: List of directory paths
+        :param recurse: Whether sub directories are searched as well, the
+                        current directory '.' is never searched recursively
+        :return: List of the entry dicts (name, revision, format, path,
+                 namespace, ...) of the files.
+        """
+        entries = []
+        with self._lock:
+            for directory in directories:
+                tree = self._load(directory, recurse and directory != ".")
+                for path in sorted(tree):
+                    entries.extend(tree[path]["files"])
+        return entries
+
+    def find_namespace(self, namespace, directories):
+        """
+        Return the entries of the modules with the given namespace
+        :param namespace: The XML namespace of the module
+        :param directories: List of directory paths
+        :return: List of entry dicts, the latest revision first.
+        """
+        entries = [
+            entry
+            for entry in self.modules(directories)
+            if entry["namespace"] == namespace
+        ]
+        return sorted(
+            entries,
+            key=lambda e: e["revision"] or e["latest"] or "",
+            reverse=True,
+        )
+
+    def dependencies(self, yang_files, directories):
+        """
+        Return the entries of the modules and submodules the yang files
+        import or include, directly or not
+        :param yang_files: List of the yang file paths
+        :param directories: List of the search path directories
+        :return: List of entry dicts in the search path order, None when a
+                 dependency is missing from the index or a header could
+                 not be read, the full search path is needed then.
+        """
+        entries = self.modules(directories)
+        by_name = {}
+        for entry in entries:
+            by_name.setdefault(entry["name"], []).append(entry)
+
+        pending = []
+        for path in yang_files:
+            header = self._file_header(path)
+            if header is None:
+                return None
+            pending.extend(_references(header))
+
+        found = {}
+        seen = set()
+        while pending:
+            name, revision = pending.pop()
+            if (name, revision) in seen:
+                continue
+            seen.add((name, revision))
+            candidates = [
+                entry
+                for entry in by_name.get(name, [])
+                if revision is None
+                or revision in (entry["revision"], entry["latest"])
+            ]
+            if not candidates:
+                return None
+            for entry in candidates:
+                if entry["path"] in found:
+                    continue
+                # files edited in place do not change their directory
+                if not self._refresh(entry) or entry["imports"] is None:
+                    return None
+                found[entry["path"]] = entry
+                pending.extend(_references(entry))
+
+        return [entry for entry in entries if entry["path"] in found]
+
+    def dependency_digest(self, yang_files, directories):
+        """
+        Return a digest of the content of the modules the yang files
+        import or include, directly or not. It changes only when one of
+        those modules changes, the other modules of the search path do not
+        count.
+        :param yang_files: List of the yang file paths
+        :param directories: List of the search path directories
+        :return: Hex digest string, None when the dependencies can not be
+                 resolved with the index.
+        """
+        entries = self.dependencies(yang_files, directories)
+        if entries is None:
+            return None
+        digests = []
+        for entry in entries:
+            with self._lock:
+                if entry["digest"] is None:
+                    try:
+                        with open(entry["path"], "rb") as fp:
+                            entry["digest"] = hashlib.sha256(
+                                fp.read()
+                            ).hexdigest()
+                    except (IOError, OSError):
+                        return None
+                digests.append(entry["digest"])
+        digest = hashlib.sha256()
+        for item in sorted(digests):
+            digest.update(to_bytes(item))
+        return digest.hexdigest()
+
+    def _refresh(self, entry):
+        try:
+            stat = os.stat(entry["path"])
+        except OSError:
+            return False
+        with self._lock:
+            if (entry["mtime"], entry["size"]) != (
+                stat.st_mtime,
+                stat.st_size,
+            ):
+                return _read_entry(entry)
+        return True
+
+    def _file_header(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._headers.get(path)
+            if cached is not None and cached[:2] == (
+                stat.st_mtime,
+                stat.st_size,
+            ):
+                return cached[2]
+        try:
+            header = parse_header(path)
+        except (IOError, OSError, UnicodeDecodeError, ValueError):
+            header = None
+        with self._lock:
+            self._headers[path] = (stat.st_mtime, stat.st_size, header)
+        return header
+
+    def _load(self, directory, recurse):
+        directory = os.path.realpath(os.path.expanduser(directory))
+        key = (directory, recurse)
+        tree = self._roots.get(key)
+        if tree is None:
+            tree = self._read(directory, recurse)
+        updated = {}
+        changed = self._scan(directory, tree, updated, recurse)
+        changed = changed or set(tree) != set(updated)
+        self._roots[key] = updated
+        if changed:
+            self._write(directory, recurse, updated)
+        return updated
+
+    def _scan(self, path, tree, updated, recurse):
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return False
+        changed = False
+        node = tree.get(path)
+        if node is None or node["mtime"] != mtime:
+            node = _scan_directory(path, mtime)
+            changed = True
+        updated[path] = node
+        if recurse:
+            for subdir in node["subdirs"]:
+                if self._scan(subdir, tree, updated, recurse):
+                    changed = True
+        return changed
+
+    def _index_path(self, directory, recurse):
+        digest = hashlib.sha256(to_bytes(directory)).hexdigest()
+        return os.path.join(
+            self._index_dir, "%s%s.json" % (digest, "" if recurse else "-top")
+        )
+
+    def _read(self, directory, recurse):
+        if self._index_dir is None:
+            return {}
+        index_path = self._index_path(directory, recurse)
+        try:
+            with open(index_path) as fp:
+                data = json.load(fp)
+            # the modification time tells the eviction the index is used
+            os.utime(index_path, None)
+        except (IOError, OSError, ValueError):
+            return {}
+        if data.get("version") != INDEX_VERSION:
+            return {}
+        return data.get("directories", {})
+
+    def _write(self, directory, recurse, tree):
+        """
+        Store the index of a directory, the file is written next to its
+        final location and renamed in place so readers never see a partial
+        index. The index is an optimization, write errors are ignored.
+        """
+        if self._index_dir is None:
+            return
+        tmp_path = None
+        try:
+            try:
+                os.makedirs(self._index_dir)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+            fd, tmp_path = tempfile.mkstemp(dir=self._index_dir, prefix=".tmp")
+            with os.fdopen(fd, "w") as fp:
+                json.dump({"version": INDEX_VERSION, "directories": tree}, fp)
+            os.rename(tmp_path, self._index_path(directory, recurse))
+            self.evict()
+        except (IOError, OSError):
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def evict(self):
+        """
+        Remove the stored indexes not used for max_age seconds, along with
+        the temporary files left behind by interrupted writes.
+        :return: List of the removed file paths.
+        """
+        removed = []
+        if self._index_dir is None or self._max_age is None:
+            return removed
+        oldest = time.time() - self._max_age
+        try:
+            names = os.listdir(self._index_dir)
+        except OSError:
+            return removed
+        for name in names:
+            path = os.path.join(self._index_dir, name)
+            try:
+                if os.stat(path).st_mtime < oldest:
+                    os.remove(path)
+                    removed.append(path)
+            except OSError:
+                # removed by a concurrent eviction
+                continue
+        return removed
+
+    def clear(self):
+        """
+        Drop the index loaded by the process, the stored index is read again
+        """
+        with self._lock:
+            self._roots.clear()
+            self._headers.clear()
+
+
+def _references(header):
+    references = [tuple(ref) for ref in header["imports"]]
+    references.extend(tuple(ref) for ref in header["includes"])
+    if header["belongs_to"]:
+        references.append((header["belongs_to"], None))
+    return references
+
+
+def _scan_directory(path, mtime):
+    files = []
+    subdirs = []
+    try:
+        names = sorted(os.listdir(path))
+    except OSError:
+        names = []
+    for name in names:
+        file_path = os.path.join(path, name)
+        match = _RE_FILENAME.search(name)
+        if match is None:
+            if os.path.isdir(file_path):
+                subdirs.append(file_path)
+            continue
+        if not os.path.isfile(file_path) or not os.access(file_path, os.R_OK):
+            continue
+        module_name, revision, in_format = match.groups()
+        entry = {
+            "name": module_name,
+            "revision": revision,
+            "format": in_format,
+            "path": file_path,
+        }
+        _read_entry(entry)
+        files.append(entry)
+    return {"mtime": mtime, "files": files, "subdirs": subdirs}
+
+
+def _read_entry(entry):
+    """
+    Fill in the header fields of an index entry from its file, along with
+    the modification time and size the fields are valid for
+    :return: False if the file can not be found anymore
+    """
+    try:
+        stat = os.stat(entry["path"])
+    except OSError:
+        return False
+    entry.update(
+        {
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "digest": None,
+            "keyword": None,
+            "namespace": None,
+            "belongs_to": None,
+            "imports": None,
+            "includes": None,
+            "latest": None,
+        }
+    )
+    if entry["format"] != "yang":
+        return True
+    try:
+        header = parse_header(entry["path"])
+    except (IOError, OSError, UnicodeDecodeError, ValueError):
+        return True
+    if header["name"] == entry["name"]:
+        for key in (
+            "keyword",
+            "namespace",
+            "belongs_to",
+            "imports",
+            "includes",
+        ):
+            entry[key] = header[key]
+        entry["latest"] = header["revision"]
+    return True
+
+
+MODULE_INDEX = ModuleIndex()
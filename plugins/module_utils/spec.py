@@ -7,35 +7,64 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 import glob
+import multiprocessing
 import os
-import sys
 import shutil
 import json
 import uuid
-import errno
 
-import subprocess
-from copy import deepcopy
+from collections import OrderedDict
 
-from ansible.module_utils.six import StringIO
+from ansible.module_utils._text import to_text
 from ansible.module_utils.basic import missing_required_lib
 
+from ansible_collections.community.yang.plugins.module_utils import compiler
+from ansible_collections.community.yang.plugins.module_utils.cache import (
+    ArtifactCache,
+    fingerprint,
+)
 from ansible_collections.community.yang.plugins.module_utils.common import (
-    find_file_in_path,
     to_list,
 )
+from ansible_collections.community.yang.plugins.module_utils.timing import (
+    Timings,
+)
 
 try:
-    from pyang import error  # noqa: F401
+    import pyang  # noqa: F401
+
+    from ansible_collections.community.yang.plugins.pyang.plugins.json_skeleton_plugin import (
+        SampleJSONSkeletonPlugin,
+    )
 
     HAS_PYANG = True
 except ImportError:
     HAS_PYANG = False
 
 YANG_SPEC_DIR_PATH = "~/.ansible/tmp/yang/spec"
+SCHEMA_FORMATS = ("json_schema", "xml_schema", "tree_schema")
+# file extension of each schema format in the output directory of a batch
+SCHEMA_EXTENSIONS = {
+    "json_schema": "json",
+    "xml_schema": "xml",
+    "tree_schema": "tree",
+}
 
 
 class GenerateSpec(object):
+    """
+    Generate the tree, XML skeleton and JSON skeleton of yang models. pyang
+    is run in-process through its API, the JSON skeleton plugin of the
+    collection is registered along with the pyang output plugins and the
+    validated modules are shared by the formats. The time spent in each
+    stage is accumulated in the timings attribute.
+
+    With a cache_dir the generated schemas are stored in an on-disk artifact
+    cache keyed by the content of the yang files and their dependencies,
+    the search path and the options of the format, the cache_hits attribute
+    tells for each format whether it was read from the cache.
+    """
+
     def __init__(
         self,
         yang_content=None,
@@ -44,6 +73,7 @@ class GenerateSpec(object):
         doctype="config",
         keep_tmp_files=False,
         tmp_dir_path=YANG_SPEC_DIR_PATH,
+        cache_dir=None,
     ):
         if not HAS_PYANG:
             raise ImportError(missing_required_lib("pyang"))
@@ -53,25 +83,38 @@ class GenerateSpec(object):
         self._yang_content = yang_content
         self._doctype = doctype
         self._keep_tmp_files = keep_tmp_files
-        self._pyang_exec_path = find_file_in_path("pyang")
 
         self._tmp_dir_path = tmp_dir_path
-
-        self._handle_yang_file_path(yang_file_path)
-        self._handle_search_path(search_path)
+        # the temporary directory created by the instance, tmp_dir_path may
+        # be shared with other instances and is never removed
+        self._own_tmp_dir_path = None
+        self.timings = Timings()
+        self._cache = ArtifactCache(cache_dir) if cache_dir else None
+        self.cache_hits = {}
+        compiler.register_plugin(SampleJSONSkeletonPlugin)
+
+        with self.timings.stage("resolve"):
+            self._handle_yang_file_path(yang_file_path)
+            self._handle_search_path(search_path)
+        # the default search path of inline content is a new temporary
+        # directory on every run, its modules are covered by the digest of
+        # the dependencies
+        self._cache_search_path = self._search_path if search_path else None
 
     def __del__(self):
-        if not self._keep_tmp_files:
-            shutil.rmtree(self._tmp_dir_path, ignore_errors=True)
-        super(GenerateSpec, self).__del__()
+        own_tmp_dir_path = getattr(self, "_own_tmp_dir_path", None)
+        if own_tmp_dir_path and not self._keep_tmp_files:
+            shutil.rmtree(own_tmp_dir_path, ignore_errors=True)
 
     def _handle_yang_file_path(self, yang_files):
         if not yang_files:
-            content_tmp_file_path = os.path.join(
-                self._tmp_dir_path, "%s.%s" % (str(uuid.uuid4()), "yang")
+            self._own_tmp_dir_path = os.path.join(
+                os.path.realpath(os.path.expanduser(self._tmp_dir_path)),
+                str(uuid.uuid4()),
             )
-            content_tmp_file_path = os.path.realpath(
-                os.path.expanduser(content_tmp_file_path)
+            os.makedirs(self._own_tmp_dir_path)
+            content_tmp_file_path = os.path.join(
+                self._own_tmp_dir_path, "%s.%s" % (str(uuid.uuid4()), "yang")
             )
             with open(content_tmp_file_path, "w") as opened_file:
                 opened_file.write(self._yang_content)
@@ -85,11 +128,12 @@ class GenerateSpec(object):
                     if not _yang_files:
                         # Glob returned no files
                         raise ValueError("%s invalid file path" % yang_file)
-                    self._yang_file_path.extend(_yang_files)
+                    self._yang_file_path.extend(sorted(_yang_files))
                 else:
                     self._yang_file_path.append(yang_file)
-        # ensure file path entry is unique
-        self._yang_file_path = list(set(self._yang_file_path))
+        # ensure file path entry is unique, the order of the files is kept
+        # as it is the order of the modules in the schemas
+        self._yang_file_path = list(OrderedDict.fromkeys(self._yang_file_path))
 
     def _handle_search_path(self, search_path):
         if search_path is None:
@@ -107,87 +151,119 @@ class GenerateSpec(object):
 
         self._search_path = abs_search_path
 
+    def _emit(self, fmt, name, **options):
+        """
+        Render the yang files with a pyang output format in-process, the
+        yang files are parsed and validated once for all the formats. The
+        rendered schema is read from and stored into the artifact cache when
+        one is configured.
+        :param fmt: The pyang output format
+        :param name: Name of the schema used in the error message
+        :param options: Output format specific options
+        :return: The rendered schema as string
+        """
+        cache_key = None
+        if self._cache is not None:
+            digest = compiler.dependency_digest(
+                self._yang_file_path, self._search_path
+            )
+            # nothing is cached when the dependencies can not be resolved
+            if digest is not None:
+                cache_key = fingerprint(
+                    self._yang_file_path,
+                    # the fingerprint does not depend on the order of the
+                    # files, the schemas do
+                    " ".join(
+                        os.path.basename(path) for path in self._yang_file_path
+                    ),
+                    self._cache_search_path,
+                    fmt,
+                    json.dumps(options, sort_keys=True),
+                    digest,
+                )
+                content = self._cache.get_data(fmt, cache_key)
+                if content is not None:
+                    self.cache_hits[fmt] = True
+                    return to_text(content, errors="surrogate_or_strict")
+        self.cache_hits[fmt] = False
+
+        try:
+            with self.timings.stage("compile"):
+                compiler.load_modules(self._yang_file_path, self._search_path)
+            content = compiler.emit(
+                fmt, self._yang_file_path, self._search_path, **options
+            )
+        except ValueError as e:
+            raise ValueError("Error while generating %s: %s" % (name, e))
+        if cache_key is not None:
+            self._cache.put_data(fmt, cache_key, content)
+        return content
+
+    def generate_schemas(
+        self,
+        json_schema=None,
+        xml_schema=None,
+        tree_schema=None,
+        formats=SCHEMA_FORMATS,
+    ):
+        """
+        This method generates the requested schemas among the JSON schema,
+        the XML schema and the tree schema from a single parse and
+        validation of the yang files, and stores them into files (optional)
+        :param json_schema: Dict of the JSON schema options, the path of
+                            the file to store it and defaults
+        :param xml_schema: Dict of the XML schema options, the path of the
+                           file to store it, defaults and annotations
+        :param tree_schema: Dict of the tree schema options, the path of
+                            the file to store it
+        :param formats: List of the schemas to generate, the other ones are
+                        neither generated nor stored.
+        :return: Dict of the requested schemas among json_schema (as dict),
+                 xml_schema and tree_schema.
+        """
+        formats = to_list(formats)
+        invalid = [fmt for fmt in formats if fmt not in SCHEMA_FORMATS]
+        if invalid:
+            raise ValueError(
+                "invalid schema format %s, valid formats are %s"
+                % (", ".join(invalid), ", ".join(SCHEMA_FORMATS))
+            )
+
+        schemas = {}
+        if "json_schema" in formats:
+            json_schema = json_schema or {}
+            schemas["json_schema"] = self.generate_json_schema(
+                schema_out_path=json_schema.get("path"),
+                defaults=bool(json_schema.get("defaults")),
+            )
+        if "xml_schema" in formats:
+            xml_schema = xml_schema or {}
+            schemas["xml_schema"] = self.generate_xml_schema(
+                schema_out_path=xml_schema.get("path"),
+                defaults=bool(xml_schema.get("defaults")),
+                annotations=bool(xml_schema.get("annotations")),
+            )
+        if "tree_schema" in formats:
+            tree_schema = tree_schema or {}
+            schemas["tree_schema"] = self.generate_tree_schema(
+                schema_out_path=tree_schema.get("path")
+            )
+        return schemas
+
     def generate_tree_schema(self, schema_out_path=None):
         """
         This method generates tree schema by parsing the yang file and stores
         the content of tree schema into a file (optional)
         :param schema_out_path: This option provide the file path to
                                 store the generated.
-        :param defaults: If set to True the default values will be added in json schema
-                         from the YANG model for the corresponding option.
-        :param annotations: The boolean flag identifies if the xml skeleton should have
-                            comments describing the field or not.
         :return: YANG tree in string format.
         """
-        saved_arg = deepcopy(sys.argv)
-        sys.stdout = sys.stderr = StringIO()
-
-        tree_tmp_file_path = os.path.join(
-            self._tmp_dir_path, "%s.%s" % (str(uuid.uuid4()), "txt")
-        )
-        tree_tmp_file_path = os.path.realpath(
-            os.path.expanduser(tree_tmp_file_path)
-        )
-        # fill in the sys args before invoking pyang to retrieve tree structure
-        tree_cmd = [
-            self._pyang_exec_path,
-            "-f",
-            "tree",
-            "-o",
-            tree_tmp_file_path,
-            "-p",
-            self._search_path,
-            "--lax-quote-checks",
-        ] + self._yang_file_path
-
-        try:
-            subprocess.check_output(
-                " ".join(tree_cmd), stderr=subprocess.STDOUT, shell=True
-            )
-        except SystemExit:
-            pass
-        except Exception as e:
-            if not self._keep_tmp_files:
-                shutil.rmtree(
-                    os.path.realpath(os.path.expanduser(self._tmp_dir_path)),
-                    ignore_errors=True,
-                )
-            raise ValueError(
-                "Error while generating skeleton xml file: %s" % e.output
-            )
-        finally:
-            err = sys.stdout.getvalue()
-            if err and "error" in err.lower():
-                if not self._keep_tmp_files:
-                    shutil.rmtree(
-                        os.path.realpath(
-                            os.path.expanduser(self._tmp_dir_path)
-                        ),
-                        ignore_errors=True,
-                    )
-                raise ValueError("Error while generating tree file: %s" % err)
-
-        sys.stdout.flush()
-        sys.stderr.flush()
-        sys.argv = saved_arg
-
-        with open(tree_tmp_file_path, "r") as f:
-            tree_schema = f.read()
+        with self.timings.stage("tree"):
+            tree_schema = self._emit("tree", "tree file")
 
         if schema_out_path:
-            try:
-                shutil.copy(tree_tmp_file_path, schema_out_path)
-            except IOError as e:
-                # ENOENT(2): file does not exist, raised also on missing dest parent dir
-                if e.errno != errno.ENOENT:
-                    raise
-                # try creating parent directories
-                os.makedirs(os.path.dirname(schema_out_path))
-                shutil.copyfile(tree_tmp_file_path, schema_out_path)
-
-        if not self._keep_tmp_files:
-            os.remove(tree_tmp_file_path)
-
+            with self.timings.stage("write"):
+                _write_schema(tree_schema, schema_out_path)
         return tree_schema
 
     def generate_xml_schema(
@@ -204,88 +280,18 @@ class GenerateSpec(object):
                             comments describing the field or not.
         :return: XML scehma in string format.
         """
-        saved_arg = deepcopy(sys.argv)
-        sys.stdout = sys.stderr = StringIO()
-
-        xml_tmp_file_path = os.path.join(
-            self._tmp_dir_path, "%s.%s" % (str(uuid.uuid4()), "xml")
-        )
-        xml_tmp_file_path = os.path.realpath(
-            os.path.expanduser(xml_tmp_file_path)
-        )
-        # fill in the sys args before invoking pyang to retrieve xml skeleton
-        sample_xml_skeleton_cmd = [
-            self._pyang_exec_path,
-            "-f",
-            "sample-xml-skeleton",
-            "-o",
-            xml_tmp_file_path,
-            "-p",
-            self._search_path,
-            "--sample-xml-skeleton-doctype",
-            self._doctype,
-            "--lax-quote-checks",
-        ] + self._yang_file_path
-
-        if defaults:
-            sample_xml_skeleton_cmd.append("--sample-xml-skeleton-defaults")
-
-        if annotations:
-            sample_xml_skeleton_cmd.append("--sample-xml-skeleton-annotations")
-
-        try:
-            subprocess.check_output(
-                " ".join(sample_xml_skeleton_cmd),
-                stderr=subprocess.STDOUT,
-                shell=True,
-            )
-        except SystemExit:
-            pass
-        except Exception as e:
-            if not self._keep_tmp_files:
-                shutil.rmtree(
-                    os.path.realpath(os.path.expanduser(self._tmp_dir_path)),
-                    ignore_errors=True,
-                )
-            raise ValueError(
-                "Error while generating skeleton xml file: %s" % e.output
+        with self.timings.stage("xml_skeleton"):
+            xml_schema = self._emit(
+                "sample-xml-skeleton",
+                "skeleton xml file",
+                doctype=self._doctype,
+                sample_defaults=defaults,
+                sample_annots=annotations,
             )
-        finally:
-            err = sys.stdout.getvalue()
-            if err and "error" in err.lower():
-                if not self._keep_tmp_files:
-                    shutil.rmtree(
-                        os.path.realpath(
-                            os.path.expanduser(self._tmp_dir_path)
-                        ),
-                        ignore_errors=True,
-                    )
-                raise ValueError(
-                    "Error while generating skeleton xml file: %s" % err
-                )
-
-        sys.stdout.flush()
-        sys.stderr.flush()
-
-        sys.argv = saved_arg
-
-        with open(xml_tmp_file_path, "r") as f:
-            xml_schema = f.read()
 
         if schema_out_path:
-            try:
-                shutil.copy(xml_tmp_file_path, schema_out_path)
-            except IOError as e:
-                # ENOENT(2): file does not exist, raised also on missing dest parent dir
-                if e.errno != errno.ENOENT:
-                    raise
-                # try creating parent directories
-                os.makedirs(os.path.dirname(schema_out_path))
-                shutil.copyfile(xml_tmp_file_path, schema_out_path)
-
-        if not self._keep_tmp_files:
-            os.remove(xml_tmp_file_path)
-
+            with self.timings.stage("write"):
+                _write_schema(xml_schema, schema_out_path)
         return xml_schema
 
     def generate_json_schema(self, schema_out_path=None, defaults=False):
@@ -298,91 +304,152 @@ class GenerateSpec(object):
                          from the YANG model for the corresponding option.
         :return: JSON schema in string format.
         """
-        saved_arg = deepcopy(sys.argv)
-        sys.stdout = sys.stderr = StringIO()
-
-        json_tmp_file_path = os.path.join(
-            self._tmp_dir_path, "%s.%s" % (str(uuid.uuid4()), "json")
-        )
-        json_tmp_file_path = os.path.realpath(
-            os.path.expanduser(json_tmp_file_path)
-        )
-
-        plugin_file_src = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)),
-            "../pyang/plugins/json_skeleton_plugin.py",
-        )
-        shutil.copy(plugin_file_src, self._tmp_dir_path)
-        # fill in the sys args before invoking pyang to retrieve json skeleton
-        sample_json_skeleton_cmd = [
-            self._pyang_exec_path,
-            "--plugindir",
-            self._tmp_dir_path,
-            "-f",
-            "sample-json-skeleton",
-            "-o",
-            json_tmp_file_path,
-            "-p",
-            self._search_path,
-            "--lax-quote-checks",
-            "--sample-json-skeleton-doctype",
-            self._doctype,
-        ] + self._yang_file_path
-
-        if defaults:
-            sample_json_skeleton_cmd.append("--sample-json-skeleton-defaults")
-
-        try:
-            subprocess.check_output(
-                " ".join(sample_json_skeleton_cmd),
-                stderr=subprocess.STDOUT,
-                shell=True,
+        with self.timings.stage("json_skeleton"):
+            content = self._emit(
+                "sample-json-skeleton",
+                "json schema",
+                doctype=self._doctype,
+                sample_defaults=defaults,
             )
-        except SystemExit:
-            pass
-        except Exception as e:
-            if not self._keep_tmp_files:
-                shutil.rmtree(
-                    os.path.realpath(os.path.expanduser(self._tmp_dir_path)),
-                    ignore_errors=True,
-                )
-            raise ValueError(
-                "Error while generating skeleton json file: %s" % e.output
-            )
-        finally:
-            err = sys.stdout.getvalue()
-            if err and "error" in err.lower():
-                if not self._keep_tmp_files:
-                    shutil.rmtree(
-                        os.path.realpath(
-                            os.path.expanduser(self._tmp_dir_path)
-                        ),
-                        ignore_errors=True,
-                    )
-                raise ValueError(
-                    "Error while generating json schema: %s" % err
-                )
+            json_schema = json.loads(content)
 
-        sys.stdout.flush()
-        sys.stderr.flush()
-
-        sys.argv = saved_arg
+        if schema_out_path:
+            with self.timings.stage("write"):
+                _write_schema(content, schema_out_path)
+        return json_schema
 
-        with open(json_tmp_file_path, "r") as f:
-            json_schema = json.load(f)
 
-        if schema_out_path:
-            try:
-                shutil.copy(json_tmp_file_path, schema_out_path)
-            except IOError as e:
-                # ENOENT(2): file does not exist, raised also on missing dest parent dir
-                if e.errno != errno.ENOENT:
-                    raise
-                # try creating parent directories
-                os.makedirs(os.path.dirname(schema_out_path))
-                shutil.copyfile(json_tmp_file_path, schema_out_path)
-
-        if not self._keep_tmp_files:
-            os.remove(json_tmp_file_path)
+def _write_schema(content, dest):
+    dest = os.path.realpath(os.path.expanduser(dest))
+    if not os.path.isdir(os.path.dirname(dest)):
+        os.makedirs(os.path.dirname(dest))
+    with open(dest, "w") as f:
+        f.write(content)
+
+
+def generate_specs(
+    modules,
+    output_dir,
+    search_path=None,
+    doctype="config",
+    formats=SCHEMA_FORMATS,
+    defaults=False,
+    annotations=False,
+    cache_dir=None,
+    processes=None,
+):
+    """
+    Generate the schemas of many independent yang modules in a pool of
+    worker processes. The modules of the search paths are indexed once
+    before the workers start so they share the module index, and the
+    schemas of each module are written to the output directory as
+    <module>.json, <module>.xml and <module>.tree. The failure of a module
+    is reported in its result and does not stop the batch.
+    :param modules: List of the top level yang file paths, an item may be a
+                    list of yang file paths generated together.
+    :param output_dir: Directory the schemas are written to.
+    :param search_path: Colon separated list of directories to search for
+                        imported yang modules, the directory of each module
+                        by default.
+    :param doctype: The root node of the skeletons, config or data.
+    :param formats: List of the schemas to generate.
+    :param defaults: Whether the JSON and XML skeletons have the default
+                     values of the fields.
+    :param annotations: Whether the XML skeleton has comments describing
+                        the fields.
+    :param cache_dir: Directory of the artifact cache, no cache by default.
+    :param processes: Number of worker processes, the number of CPUs by
+                      default.
+    :return: Dict of the result of each module by module name, the paths of
+             the written schemas by format and cache_hit, or failed and msg
+             when the generation of the module failed.
+    """
+    invalid = [fmt for fmt in to_list(formats) if fmt not in SCHEMA_FORMATS]
+    if invalid:
+        raise ValueError(
+            "invalid schema format %s, valid formats are %s"
+            % (", ".join(invalid), ", ".join(SCHEMA_FORMATS))
+        )
 
-        return json_schema
+    output_dir = os.path.realpath(os.path.expanduser(output_dir))
+    jobs = []
+    names = set()
+    search_paths = set()
+    for yang_files in modules:
+        yang_files = [
+            os.path.realpath(os.path.expanduser(path))
+            for path in to_list(yang_files)
+        ]
+        name = os.path.splitext(os.path.basename(yang_files[0]))[0]
+        if name in names:
+            raise ValueError("duplicate module name %s in the batch" % name)
+        names.add(name)
+        search_paths.add(search_path or os.path.dirname(yang_files[0]))
+        jobs.append(
+            (
+                name,
+                {
+                    "yang_file_path": yang_files,
+                    "search_path": search_path,
+                    "doctype": doctype,
+                    "keep_tmp_files": True,
+                    "cache_dir": cache_dir,
+                },
+                {
+                    "json_schema": {"defaults": defaults},
+                    "xml_schema": {
+                        "defaults": defaults,
+                        "annotations": annotations,
+                    },
+                    "tree_schema": {},
+                    "formats": to_list(formats),
+                },
+                output_dir,
+            )
+        )
+    if not jobs:
+        return {}
+
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    for path in sorted(search_paths):
+        compiler.index_search_path(path)
+
+    processes = min(processes or multiprocessing.cpu_count(), len(jobs))
+    pool = multiprocessing.Pool(processes)
+    try:
+        # one module per task, the modules differ a lot in size
+        results = dict(pool.imap_unordered(_generate_spec_job, jobs, 1))
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+
+def _generate_spec_job(job):
+    """
+    Generate the schemas of a module of a batch in a worker process
+    :param job: Tuple of the module name, the GenerateSpec arguments, the
+                generate_schemas arguments and the output directory.
+    :return: Tuple of the module name and its result.
+    """
+    name, spec_args, schema_args, output_dir = job
+    schema_args = dict(schema_args)
+    for fmt in schema_args["formats"]:
+        schema_args[fmt] = dict(
+            schema_args[fmt],
+            path=os.path.join(
+                output_dir, "%s.%s" % (name, SCHEMA_EXTENSIONS[fmt])
+            ),
+        )
+    try:
+        genspec_obj = GenerateSpec(**spec_args)
+        genspec_obj.generate_schemas(**schema_args)
+    except Exception as e:
+        return name, {"failed": True, "msg": to_text(e)}
+
+    result = dict(
+        (fmt, schema_args[fmt]["path"]) for fmt in schema_args["formats"]
+    )
+    result["cache_hit"] = all(genspec_obj.cache_hits.values())
+    return name, result
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import threading
+import time
+
+from collections import OrderedDict
+from contextlib import contextmanager
+
+_wall_clock = getattr(time, "perf_counter", time.time)
+try:
+    _cpu_clock = time.process_time
+except AttributeError:
+    # python 2, time.clock returns the processor time on posix systems
+    _cpu_clock = time.clock
+
+
+class Timings(object):
+    """
+    Wall clock and CPU time spent in each stage of a translation or spec
+    generation, accumulated over the calls made on the owning object. The
+    stages are exclusive, the time spent in a stage run within another one is
+    only counted in the inner stage, so the stages add up to the time spent.
+    The CPU time is the one of the whole process, when several threads run
+    stages concurrently it includes the time spent by the other threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = OrderedDict()
+        self._local = threading.local()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Measure the time spent in the body of the with statement, less the
+        time spent in the stages nested in it
+        :param name: The stage name (compile, jtox, xslt, ...)
+        """
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        # wall and CPU time of the nested stages
+        nested = [0.0, 0.0]
+        stack.append(nested)
+        wall, cpu = _wall_clock(), _cpu_clock()
+        try:
+            yield
+        finally:
+            wall, cpu = _wall_clock() - wall, _cpu_clock() - cpu
+            stack.pop()
+            if stack:
+                stack[-1][0] += wall
+                stack[-1][1] += cpu
+            self.add(name, wall - nested[0], cpu - nested[1])
+
+    @contextmanager
+    def capture(self):
+        """
+        Collect the stages run by the current thread in the body of the with
+        statement in a separate Timings object, as well as in this one.
+        :return: The Timings object of the captured stages
+        """
+        captured = Timings()
+        captures = getattr(self._local, "captures", None)
+        if captures is None:
+            captures = self._local.captures = []
+        captures.append(captured)
+        try:
+            yield captured
+        finally:
+            captures.remove(captured)
+
+    def add(self, name, wall, cpu, calls=1):
+        """
+        Add time spent in a stage
+        :param name: The stage name
+        :param wall: Wall clock time in seconds
+        :param cpu: CPU time in seconds
+        :param calls: The number of times the stage was run
+        """
+        with self._lock:
+            entry = self._stages.setdefault(name, [0.0, 0.0, 0])
+            entry[0] += wall
+            entry[1] += cpu
+            entry[2] += calls
+        for captured in getattr(self._local, "captures", ()):
+            captured.add(name, wall, cpu, calls)
+
+    def update(self, timings):
+        """
+        Add the stages of a timings dict, as returned by as_dict()
+        :param timings: The timings dict to be added
+        """
+        for name, entry in timings.items():
+            self.add(name, entry["wall"], entry["cpu"], entry["calls"])
+
+    def as_dict(self):
+        """
+        :return: Dict of the stages in the order they first ran, with the
+                 wall clock and CPU time in seconds and the number of calls.
+        """
+        with self._lock:
+            return OrderedDict(
+                (
+                    name,
+                    {
+                        "wall": round(wall, 6),
+                        "cpu": round(cpu, 6),
+                        "calls": calls,
+                    },
+                )
+                for name, (wall, cpu, calls) in self._stages.items()
+            )
@@ -7,35 +7,49 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 import glob
+import io
 import os
-import re
-import sys
 import shutil
-import time
 import json
-import uuid
-
-from copy import deepcopy
+import threading
 
 from ansible.module_utils.basic import missing_required_lib
-from ansible.module_utils._text import to_text
-from ansible.module_utils.six import StringIO
-
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.six import binary_type, text_type
+from ansible.module_utils.six.moves.urllib.parse import urljoin
+from ansible.module_utils.six.moves.urllib.request import pathname2url
+
+from ansible_collections.community.yang.plugins.module_utils import compiler
+from ansible_collections.community.yang.plugins.module_utils.cache import (
+    ArtifactCache,
+    fingerprint,
+)
+from ansible_collections.community.yang.plugins.module_utils.index import (
+    MODULE_INDEX,
+)
+from ansible_collections.community.yang.plugins.module_utils.encoding import (
+    JsonToXmlEncoder,
+    Schema,
+    XmlToJsonEncoder,
+)
 from ansible_collections.community.yang.plugins.module_utils.common import (
-    load_from_source,
-    find_file_in_path,
     find_share_path,
     to_list,
 )
+from ansible_collections.community.yang.plugins.module_utils.timing import (
+    Timings,
+)
 
 try:
     import pyang  # noqa
+    from pyang.scripts import json2xml
 
     HAS_PYANG = True
 except ImportError:
     HAS_PYANG = False
 
 try:
+    import xml.etree.ElementTree as ET
     from lxml import etree
 
     HAS_LXML = True
@@ -43,7 +57,27 @@ except ImportError:
     HAS_LXML = False
 
 
+NETCONF_BASE_NS = "urn:ietf:params:xml:ns:netconf:base:1.0"
+XSLT_NS = "http://www.w3.org/1999/XSL/Transform"
+
+# pyang translates with the artifacts generated by the pyang jsonxsl and jtox
+# plugins, native walks the schema tree in Python
+ENGINES = ("pyang", "native")
+
+
 class Translator(object):
+    """
+    Translate between XML and JSON data encoded as per YANG model (RFC 7951).
+    pyang is run in-process through its API, the process wide state (sys.argv,
+    standard streams, environment) is left untouched so a single instance can
+    be shared by several threads. The time spent in each stage of the
+    translations is accumulated in the timings attribute.
+
+    Without yang files the XML data is translated with the modules of the
+    search path that define the namespaces of its elements, found in the
+    module index, so only those modules and their imports are compiled.
+    """
+
     def __init__(
         self,
         yang_files,
@@ -51,15 +85,37 @@ class Translator(object):
         doctype="config",
         keep_tmp_files=False,
         debug=None,
+        cache_dir=None,
+        engine="pyang",
     ):
+        if engine not in ENGINES:
+            raise ValueError(
+                "engine should be one of %s, got %s"
+                % (", ".join(ENGINES), engine)
+            )
         yang_files = to_list(yang_files) if yang_files else []
         self._yang_files = []
         self._doctype = doctype
+        self._engine = engine
         self._keep_tmp_files = keep_tmp_files
         self._debug = debug
-        self._handle_yang_file_path(yang_files)
-        self._handle_search_path(search_path)
-        self._set_pyang_executables()
+        self._cache_dir = cache_dir
+        # translators of the modules selected by namespace, keyed by files
+        self._selected = {}
+        self._jsonxsl_transform = None
+        self._jtox = None
+        self._schema = None
+        # guards the lazily generated artifacts above
+        self._lock = threading.Lock()
+        self._cache = (
+            ArtifactCache(cache_dir, debug=debug) if cache_dir else None
+        )
+        self.cache_hits = {}
+        self.timings = Timings()
+        with self.timings.stage("resolve"):
+            self._handle_yang_file_path(yang_files)
+            self._handle_search_path(search_path)
+        self._check_required_libs()
 
     def _handle_yang_file_path(self, yang_files):
         for yang_file in yang_files:
@@ -83,6 +139,11 @@ class Translator(object):
 
     def _handle_search_path(self, search_path):
         if search_path is None:
+            if not self._yang_files:
+                raise ValueError(
+                    "search_path is required to select the yang files from "
+                    "the xml namespaces"
+                )
             search_path = os.path.dirname(self._yang_files[0])
 
         abs_search_path = None
@@ -97,15 +158,11 @@ class Translator(object):
 
         self._search_path = abs_search_path
 
-    def _set_pyang_executables(self):
+    def _check_required_libs(self):
         if not HAS_PYANG:
             raise ValueError(missing_required_lib("pyang"))
         if not HAS_LXML:
             raise ValueError(missing_required_lib("lxml"))
-        base_pyang_path = sys.modules["pyang"].__file__
-        self._pyang_exec_path = find_file_in_path("pyang")
-        self._pyang_module = load_from_source(self._pyang_exec_path, "pyang")
-        sys.modules["pyang"].__file__ = base_pyang_path
 
     def json_to_xml(self, json_data, tmp_dir_path):
         """
@@ -115,225 +172,472 @@ class Translator(object):
         :param tmp_dir_path: Temporary directory path to copy intermediate files
         :return: XML data in string format.
         """
-        saved_arg = deepcopy(sys.argv)
-        saved_stdout = sys.stdout
-        saved_stderr = sys.stderr
-        sys.stdout = sys.stderr = StringIO()
+        try:
+            if not isinstance(json_data, dict):
+                json_file_path = os.path.realpath(
+                    os.path.expanduser(json_data)
+                )
+                if not os.path.isfile(json_file_path):
+                    raise ValueError(
+                        "unable to create/find temporary json file %s"
+                        % json_data
+                    )
+                with self.timings.stage("parse"):
+                    with open(json_file_path) as fp:
+                        json_data = fp.read()
+            return self.json_to_xml_many([json_data])[0]
+        finally:
+            self._cleanup(tmp_dir_path)
 
-        if isinstance(json_data, dict):
-            # input is in json format, copy it to file in temporary location
-            json_file_path = os.path.join(
-                tmp_dir_path, "%s.%s" % (str(uuid.uuid4()), "json")
-            )
-            json_file_path = os.path.realpath(
-                os.path.expanduser(json_file_path)
-            )
-            with open(json_file_path, "w") as f:
-                f.write(json.dumps(json_data))
-            json_file_path = os.path.realpath(
-                os.path.expanduser(json_file_path)
-            )
+    def _cleanup(self, tmp_dir_path):
+        if not self._keep_tmp_files:
+            with self.timings.stage("cleanup"):
+                shutil.rmtree(
+                    os.path.realpath(os.path.expanduser(tmp_dir_path)),
+                    ignore_errors=True,
+                )
 
-        elif os.path.isfile(json_data):
-            json_file_path = json_data
-        else:
+    def json_to_xml_in_memory(self, json_data, output="element"):
+        """
+        The method translates JSON data encoded as per YANG model (RFC 7951)
+        to XML payload without writing any intermediate file
+        :param json_data: JSON data as dict or JSON encoded string
+        :param output: Either 'element' to return the lxml root element or
+                       'bytes' to return the serialized utf-8 document
+        :return: XML data as lxml Element or bytes.
+        """
+        if output not in ("element", "bytes"):
             raise ValueError(
-                "unable to create/find temporary json file %s" % json_data
+                "output should be either 'element' or 'bytes', got %s" % output
             )
+        if not self._yang_files:
+            raise ValueError("yang files are required to translate json data")
+        if not isinstance(json_data, dict):
+            try:
+                with self.timings.stage("parse"):
+                    json_data = json.loads(json_data)
+            except Exception as exc:
+                raise ValueError(
+                    "Failed to load json configuration: %s"
+                    % (to_text(exc, errors="surrogate_or_strict"))
+                )
+            if not isinstance(json_data, dict):
+                raise ValueError(
+                    "Failed to load json configuration: expected an object"
+                )
 
-        try:
-            # validate json
-            with open(json_file_path) as fp:
-                json.load(fp)
-        except Exception as exc:
-            raise ValueError(
-                "Failed to load json configuration: %s"
-                % (to_text(exc, errors="surrogate_or_strict"))
-            )
-        jtox_file_path = os.path.join(
-            tmp_dir_path, "%s.%s" % (str(uuid.uuid4()), "jtox")
-        )
-        xml_file_path = os.path.join(
-            tmp_dir_path, "%s.%s" % (str(uuid.uuid4()), "xml")
-        )
-        jtox_file_path = os.path.realpath(os.path.expanduser(jtox_file_path))
-        xml_file_path = os.path.realpath(os.path.expanduser(xml_file_path))
+        if self._engine == "native":
+            root = self._encode_native_xml(json_data)
+        else:
+            root = self._encode_jtox_xml(json_data)
 
-        yang_metada_dir = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), "files/yang"
-        )
-        yang_metadata_path = os.path.join(yang_metada_dir, "nc-op.yang")
-        self._search_path += ":%s" % yang_metada_dir
-
-        # fill in the sys args before invoking pyang
-        sys.argv = (
-            [
-                self._pyang_exec_path,
-                "-f",
-                "jtox",
-                "-o",
-                jtox_file_path,
-                "-p",
-                self._search_path,
-                "--lax-quote-checks",
-            ]
-            + self._yang_files
-            + [yang_metadata_path]
-        )
+        if output == "bytes":
+            with self.timings.stage("serialize"):
+                return etree.tostring(root, encoding="utf-8")
+        return root
+
+    def _encode_jtox_xml(self, json_data):
+        """
+        Convert JSON data to a XML document with the pyang json2xml translator
+        :param json_data: JSON data as dict
+        :return: The lxml root element of the XML document.
+        """
+        jtox = self._get_jtox()
+        with self.timings.stage("json2xml"):
+            root_el = ET.Element("{%s}%s" % (NETCONF_BASE_NS, self._doctype))
+            trans = json2xml.Translator(jtox)
+            try:
+                trans.translate_obj(json_data, None, trans.tree, root_el, "/")
+            except json2xml.Error as exc:
+                raise ValueError("Error while translating to xml: %s" % exc)
+
+            # copy the tree to lxml instead of serializing it, ElementTree
+            # picks the prefixes from its process wide namespace registry
+            nsmap = {"nc": NETCONF_BASE_NS}
+            for m, prefix in trans.prefix.items():
+                nsmap[prefix] = trans.uri[m]
+            root = etree.Element(root_el.tag, nsmap=nsmap)
+            _copy_tree(root_el, root)
+        return root
+
+    def _encode_native_xml(self, json_data):
+        """
+        Convert JSON data to a XML document walking the schema tree
+        :param json_data: JSON data as dict
+        :return: The lxml root element of the XML document.
+        """
+        schema = self._get_schema()
         if self._debug:
-            self._debug(
-                "Generating jtox file '%s' by executing command '%s'"
-                % (jtox_file_path, " ".join(sys.argv))
-            )
+            self._debug("Translating json data to xml with native engine")
         try:
-            self._pyang_module.run()
-        except SystemExit:
-            pass
-        except Exception as e:
-            shutil.rmtree(
-                os.path.realpath(os.path.expanduser(tmp_dir_path)),
-                ignore_errors=True,
-            )
-            raise ValueError(
-                "Error while generating intermediate (jtox) file: %s" % e
-            )
-        finally:
-            err = sys.stderr.getvalue()
-            if err and "error" in err.lower():
-                if not self._keep_tmp_files:
-                    shutil.rmtree(
-                        os.path.realpath(os.path.expanduser(tmp_dir_path)),
-                        ignore_errors=True,
-                    )
-                raise ValueError(
-                    "Error while generating intermediate (jtox) file: %s" % err
+            with self.timings.stage("json2xml"):
+                return JsonToXmlEncoder(schema).encode(
+                    json_data, self._doctype
                 )
+        except ValueError as exc:
+            raise ValueError("Error while translating to xml: %s" % exc)
 
-        json2xml_exec_path = find_file_in_path("json2xml")
-        json2xml_module = load_from_source(json2xml_exec_path, "json2xml")
-
-        # fill in the sys args before invoking json2xml
-        sys.argv = [
-            json2xml_exec_path,
-            "-t",
-            self._doctype,
-            "-o",
-            xml_file_path,
-            jtox_file_path,
-            json_file_path,
-        ]
+    def json_to_xml_many(self, json_data_list, output="text"):
+        """
+        The method translates a batch of JSON documents encoded as per YANG
+        model (RFC 7951) to XML payloads, the jtox driver (or the schema tree
+        of the native engine) is generated once and used for every document.
+        :param json_data_list: Iterable of JSON data as dict, JSON encoded
+                               string or file path of a JSON file
+        :param output: Either 'text' to return the XML documents as string,
+                       'bytes' or 'element' as in json_to_xml_in_memory
+        :return: List of XML data in the order of the input.
+        """
+        results = []
+        for json_data in json_data_list:
+            if not isinstance(json_data, dict) and os.path.isfile(
+                os.path.realpath(os.path.expanduser(json_data))
+            ):
+                with self.timings.stage("parse"):
+                    with open(
+                        os.path.realpath(os.path.expanduser(json_data))
+                    ) as fp:
+                        json_data = fp.read()
+            if output == "text":
+                xml_data = self.json_to_xml_in_memory(json_data, "bytes")
+                with self.timings.stage("serialize"):
+                    results.append(
+                        to_text(xml_data, errors="surrogate_or_strict")
+                    )
+            else:
+                results.append(self.json_to_xml_in_memory(json_data, output))
+        return results
+
+    def _get_jtox(self):
+        with self._lock:
+            if self._jtox is None:
+                self._jtox = self._load_jtox()
+        return self._jtox
+
+    def _load_jtox(self):
+        """
+        Return the parsed jtox driver for the yang files, either read from the
+        artifact cache or generated with pyang in memory.
+        :return: The jtox driver as dict
+        """
+        yang_files, search_path = self._jtox_sources()
+
+        self.cache_hits["jtox"] = False
+        cache_key = None
+        if self._cache is not None:
+            with self.timings.stage("jtox"):
+                cache_key = self._cache_key(yang_files, search_path)
+                if cache_key is not None:
+                    jtox_data = self._cache.get_data("jtox", cache_key)
+                    if jtox_data is not None:
+                        self.cache_hits["jtox"] = True
+                        if self._debug:
+                            self._debug(
+                                "Using cached jtox driver for yang files '%s'"
+                                % " ".join(self._yang_files)
+                            )
+                        return json.loads(to_text(jtox_data))
 
         if self._debug:
             self._debug(
-                "Generating xml file '%s' by executing command '%s'"
-                % (xml_file_path, " ".join(sys.argv))
+                "Generating jtox driver in memory for yang files '%s'"
+                % " ".join(self._yang_files)
             )
         try:
-            json2xml_module.main()
-            with open(xml_file_path, "r+") as fp:
-                b_content = fp.read()
-                content = to_text(b_content, errors="surrogate_or_strict")
-        except UnicodeError as uni_error:
+            with self.timings.stage("compile"):
+                compiler.load_modules(yang_files, search_path)
+            with self.timings.stage("jtox"):
+                content = compiler.emit("jtox", yang_files, search_path)
+        except ValueError as e:
             raise ValueError(
-                "Error while translating to text: %s" % str(uni_error)
+                "Error while generating intermediate (jtox) file: %s" % e
             )
-        except SystemExit:
-            pass
-        finally:
-            err = sys.stderr.getvalue()
-            if err and "error" in err.lower():
-                if not self._keep_tmp_files:
-                    shutil.rmtree(
-                        os.path.realpath(os.path.expanduser(tmp_dir_path)),
-                        ignore_errors=True,
-                    )
-                raise ValueError("Error while translating to xml: %s" % err)
-            sys.argv = saved_arg
-            sys.stdout = saved_stdout
-            sys.stderr = saved_stderr
-
-        try:
-            content = re.sub(r"<\? ?xml .*\? ?>", "", content)
-            root = etree.fromstring(content)
-        except Exception as e:
-            raise ValueError("Error while reading xml document: %s" % e)
-        finally:
-            if not self._keep_tmp_files:
-                shutil.rmtree(
-                    os.path.realpath(os.path.expanduser(tmp_dir_path)),
-                    ignore_errors=True,
-                )
+        with self.timings.stage("jtox"):
+            if cache_key is not None:
+                self._cache.put_data("jtox", cache_key, content)
+            return json.loads(content)
 
-        return etree.tostring(root).decode("utf-8")
+    def _cache_key(self, yang_files, search_path, *extra):
+        """
+        Return the artifact cache key of the yang files
+        :param yang_files: List of the yang file paths
+        :param search_path: The search path the artifact is generated with
+        :param extra: Additional values the artifact depends on
+        :return: The fingerprint, None when there is no cache or when the
+                 dependencies of the yang files can not be resolved, nothing
+                 is cached then as a change of a dependency would go unseen.
+        """
+        if self._cache is None:
+            return None
+        digest = compiler.dependency_digest(yang_files, search_path)
+        if digest is None:
+            return None
+        return fingerprint(yang_files, search_path, *(extra + (digest,)))
+
+    def _jtox_sources(self):
+        """
+        Return the yang files and search path the jtox driver is generated
+        from, including the netconf operation metadata module.
+        """
+        yang_metadata_dir = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "files/yang"
+        )
+        yang_files = self._yang_files + [
+            os.path.join(yang_metadata_dir, "nc-op.yang")
+        ]
+        search_path = "%s:%s" % (self._search_path, yang_metadata_dir)
+        return yang_files, search_path
 
     def xml_to_json(self, xml_data, tmp_dir_path):
         """
         The method translates XML data to JSON data encoded as per YANG model (RFC 7951)
-        :param xml_data: XML data or file path containing xml data that should to translated to JSON
+        :param xml_data: XML data that should to translated to JSON, either as
+                         string or bytes, a file path, a file-like object or
+                         an already parsed lxml Element or ElementTree
         :param tmp_dir_path: Temporary directory path to copy intermediate files
         :return: data in JSON format.
-    """
+        """
+        return self.xml_to_json_many([xml_data], tmp_dir_path)[0]
 
+    def xml_to_json_many(self, xml_data_list, tmp_dir_path):
+        """
+        The method translates a batch of XML documents to JSON data encoded as
+        per YANG model (RFC 7951), the jsonxsl stylesheet (or the schema tree
+        of the native engine) is compiled once and used for every document.
+        :param xml_data_list: Iterable of XML data accepted by xml_to_json
+        :param tmp_dir_path: Temporary directory path to copy intermediate files
+        :return: List of data in JSON format in the order of the input.
+        """
+        results = []
         try:
-            etree.fromstring(xml_data)
-            # input is xml string, copy it to file in temporary location
-            xml_file_path = os.path.join(
-                tmp_dir_path, "%s.%s" % (str(uuid.uuid4()), "xml")
-            )
-            xml_file_path = os.path.realpath(os.path.expanduser(xml_file_path))
-            with open(xml_file_path, "w") as f:
-                if not xml_data.startswith("<?xml version"):
-                    xml_data = (
-                        '<?xml version="1.0" encoding="UTF-8"?>\n' + xml_data
-                    )
-                data = xml_data
-                f.write(data)
-        except etree.XMLSyntaxError:
-            if os.path.isfile(xml_data):
-                # input is xml file path
-                xml_file_path = os.path.realpath(os.path.expanduser(xml_data))
+            for xml_data in xml_data_list:
+                with self.timings.stage("parse"):
+                    doc = self._parse_xml(xml_data)
+                tl = self
+                if not self._yang_files:
+                    with self.timings.stage("resolve"):
+                        tl = self._select_translator(_namespaces(doc))
+                if self._engine == "native":
+                    results.append(tl._encode_native(doc))
+                    continue
+                results.append(tl._apply_jsonxsl(doc))
+        finally:
+            self._cleanup(tmp_dir_path)
+        return results
+
+    def _select_translator(self, namespaces):
+        """
+        Return the translator of the modules defining the namespaces, the
+        latest revision of a module found in the search path is used.
+        :param namespaces: Iterable of the XML namespaces of the data
+        :return: A Translator sharing the timings and the cache hits of this
+                 one.
+        """
+        directories = self._search_path.split(":")
+        yang_files = set()
+        missing = []
+        for namespace in namespaces:
+            if namespace == NETCONF_BASE_NS:
+                continue
+            entries = MODULE_INDEX.find_namespace(namespace, directories)
+            if entries:
+                yang_files.add(entries[0]["path"])
             else:
-                if not self._keep_tmp_files:
-                    shutil.rmtree(
-                        os.path.realpath(os.path.expanduser(tmp_dir_path)),
-                        ignore_errors=True,
+                missing.append(namespace)
+        if missing:
+            raise ValueError(
+                "no yang module of namespace %s found in search path %s"
+                % (", ".join(sorted(missing)), self._search_path)
+            )
+        if not yang_files:
+            raise ValueError("no yang data found in the xml document")
+
+        key = tuple(sorted(yang_files))
+        with self._lock:
+            tl = self._selected.get(key)
+            if tl is None:
+                if self._debug:
+                    self._debug(
+                        "Selected yang files '%s' from the xml namespaces"
+                        % " ".join(key)
                     )
-                raise ValueError(
-                    "Unable to create file or read XML data %s" % xml_data
+                tl = Translator(
+                    list(key),
+                    search_path=self._search_path,
+                    doctype=self._doctype,
+                    keep_tmp_files=True,
+                    debug=self._debug,
+                    cache_dir=self._cache_dir,
+                    engine=self._engine,
                 )
+                tl.timings = self.timings
+                tl.cache_hits = self.cache_hits
+                self._selected[key] = tl
+        return tl
 
-        xml_file_path = os.path.realpath(os.path.expanduser(xml_file_path))
+    def _encode_native(self, doc):
+        """
+        Convert the parsed xml document to JSON data walking the schema tree
+        :param doc: The lxml Element or ElementTree to be translated
+        :return: data in JSON format.
+        """
+        schema = self._get_schema()
+        if self._debug:
+            self._debug("Translating xml document to json with native engine")
+        try:
+            with self.timings.stage("xml2json"):
+                return XmlToJsonEncoder(schema).encode_tree(doc)
+        except ValueError as e:
+            # same message as the errors of the jsonxsl transform
+            raise ValueError("Error while translating to json: %s" % e)
 
-        if os.path.isfile(xml_data):
-            try:
-                # validate xml
-                etree.parse(xml_file_path)
-                if self._debug:
-                    self._debug(
-                        "Parsing xml data from temporary file: %s"
-                        % xml_file_path
+    def xml_to_json_stream(self, xml_data):
+        """
+        The method translates XML data to JSON text encoded as per YANG model
+        (RFC 7951) in a single pass over the document. The elements are
+        released once encoded and the JSON text is generated incrementally,
+        so the memory used stays bounded whatever the size of the document.
+        :param xml_data: XML data as string or bytes, a file path, a file-like
+                         object or an already parsed lxml Element/ElementTree
+        :return: Generator of JSON text fragments.
+        """
+        if isinstance(xml_data, (text_type, binary_type)):
+            b_xml_data = to_bytes(xml_data, errors="surrogate_or_strict")
+            if b_xml_data.lstrip().startswith(b"<"):
+                xml_data = io.BytesIO(b_xml_data)
+            else:
+                xml_data = os.path.realpath(
+                    os.path.expanduser(
+                        to_text(xml_data, errors="surrogate_or_strict")
                     )
-            except Exception as exc:
-                if not self._keep_tmp_files:
-                    shutil.rmtree(
-                        os.path.realpath(os.path.expanduser(tmp_dir_path)),
-                        ignore_errors=True,
+                )
+                if not os.path.isfile(xml_data):
+                    raise ValueError(
+                        "Unable to create file or read XML data %s" % xml_data
                     )
+
+        tl = self
+        if not self._yang_files:
+            # the namespaces are collected in a first pass over the data
+            with self.timings.stage("resolve"):
+                tl = self._select_translator(_stream_namespaces(xml_data))
+            if hasattr(xml_data, "seek"):
+                xml_data.seek(0)
+        return XmlToJsonEncoder(tl._get_schema()).encode(xml_data)
+
+    def xml_to_json_file(self, xml_data, json_file_path):
+        """
+        The method streams the JSON encoding of XML data (RFC 7951) to a file
+        :param xml_data: XML data accepted by xml_to_json_stream
+        :param json_file_path: Path of the JSON file to be written
+        :return: The path of the written JSON file.
+        """
+        json_file_path = os.path.realpath(os.path.expanduser(json_file_path))
+        if self._debug:
+            self._debug("Streaming json data to file '%s'" % json_file_path)
+        try:
+            chunks = self.xml_to_json_stream(xml_data)
+            # parsing and encoding are interleaved while streaming
+            with self.timings.stage("xml2json"):
+                with io.open(json_file_path, "w", encoding="utf-8") as fp:
+                    for chunk in chunks:
+                        fp.write(to_text(chunk))
+        except Exception:
+            if os.path.exists(json_file_path):
+                os.remove(json_file_path)
+            raise
+        return json_file_path
+
+    def _get_schema(self):
+        with self._lock:
+            if self._schema is None:
+                self._schema = self._load_schema()
+        return self._schema
+
+    def _load_schema(self):
+        """
+        Load and validate the yang files in-process and build the schema tree
+        used by the native encoders, the netconf operation metadata module is
+        loaded along for the annotations of the JSON data.
+        :return: The Schema of the yang files
+        """
+        if self._debug:
+            self._debug(
+                "Loading schema for yang files '%s'"
+                % " ".join(self._yang_files)
+            )
+        yang_files, search_path = self._jtox_sources()
+        with self.timings.stage("compile"):
+            ctx, modules = compiler.load_modules(yang_files, search_path)
+        with self.timings.stage("schema"):
+            return Schema(ctx, modules)
+
+    def _parse_xml(self, xml_data):
+        """
+        Parse the xml input at most once, already parsed documents are
+        returned unchanged.
+        :param xml_data: XML data, file path, file-like object or lxml tree
+        :return: The lxml Element or ElementTree of the xml document
+        """
+        if isinstance(xml_data, (etree._Element, etree._ElementTree)):
+            return xml_data
+
+        if hasattr(xml_data, "read"):
+            source = xml_data
+        else:
+            if isinstance(xml_data, text_type):
+                # lxml refuses unicode strings with an encoding declaration
+                b_xml_data = to_bytes(xml_data, errors="surrogate_or_strict")
+            elif isinstance(xml_data, binary_type):
+                b_xml_data = xml_data
+            else:
                 raise ValueError(
-                    "Failed to load xml data: %s"
-                    % (to_text(exc, errors="surrogate_or_strict"))
+                    "Unable to read XML data of type %s"
+                    % type(xml_data).__name__
                 )
 
-        base_pyang_path = sys.modules["pyang"].__file__
-        pyang_exec_path = find_file_in_path("pyang")
+            if b_xml_data.lstrip().startswith(b"<"):
+                try:
+                    return etree.fromstring(b_xml_data)
+                except etree.XMLSyntaxError as exc:
+                    raise ValueError(
+                        "Failed to load xml data: %s"
+                        % (to_text(exc, errors="surrogate_or_strict"))
+                    )
 
-        saved_arg = deepcopy(sys.argv)
-        sys.modules["pyang"].__file__ = base_pyang_path
+            source = os.path.realpath(
+                os.path.expanduser(
+                    to_text(xml_data, errors="surrogate_or_strict")
+                )
+            )
+            if not os.path.isfile(source):
+                raise ValueError(
+                    "Unable to create file or read XML data %s" % xml_data
+                )
+            if self._debug:
+                self._debug("Parsing xml data from file: %s" % source)
+
+        try:
+            return etree.parse(source)
+        except Exception as exc:
+            raise ValueError(
+                "Failed to load xml data: %s"
+                % (to_text(exc, errors="surrogate_or_strict"))
+            )
 
-        saved_stdout = sys.stdout
-        saved_stderr = sys.stderr
-        sys.stdout = sys.stderr = StringIO()
+    def _get_jsonxsl_transform(self):
+        with self._lock:
+            if self._jsonxsl_transform is None:
+                self._jsonxsl_transform = self._compile_jsonxsl()
+        return self._jsonxsl_transform
 
+    def _compile_jsonxsl(self):
+        """
+        Generate the jsonxsl stylesheet for the yang files, or load it from the
+        artifact cache, and compile it in-process. The compiled transform is
+        kept on the instance so subsequent translations skip both steps.
+        :return: The compiled lxml XSLT transform
+        """
         jsonxsl_relative_dirpath = os.path.join("yang", "xslt")
         jsonxsl_dir_path = find_share_path(
             os.path.join(jsonxsl_relative_dirpath, "jsonxsl-templates.xsl")
@@ -342,119 +646,152 @@ class Translator(object):
             raise ValueError(
                 "Could not find jsonxsl-templates.xsl in environment path"
             )
-        os.environ["PYANG_XSLT_DIR"] = os.path.join(
-            jsonxsl_dir_path, jsonxsl_relative_dirpath
-        )
+        xslt_dir = os.path.join(jsonxsl_dir_path, jsonxsl_relative_dirpath)
 
-        xsl_file_path = os.path.join(
-            tmp_dir_path, "%s.%s" % (str(uuid.uuid4()), "xsl")
+        stylesheet = None
+        # the generated stylesheet includes the templates by absolute path
+        cache_key = self._cache_key(
+            self._yang_files, self._search_path, self._doctype, xslt_dir
         )
-        json_file_path = os.path.join(
-            tmp_dir_path, "%s.%s" % (str(uuid.uuid4()), "json")
-        )
-        xls_file_path = os.path.realpath(os.path.expanduser(xsl_file_path))
-        json_file_path = os.path.realpath(os.path.expanduser(json_file_path))
+        if cache_key is not None:
+            with self.timings.stage("jsonxsl"):
+                xsl_data = self._cache.get_data("jsonxsl", cache_key)
+            if xsl_data is not None:
+                if self._debug:
+                    self._debug(
+                        "Using cached xsl stylesheet for yang files '%s'"
+                        % " ".join(self._yang_files)
+                    )
+                try:
+                    with self.timings.stage("jsonxsl"):
+                        stylesheet = etree.ElementTree(
+                            etree.fromstring(xsl_data)
+                        )
+                except etree.XMLSyntaxError as e:
+                    raise ValueError("Error while compiling xsl file: %s" % e)
+        self.cache_hits["jsonxsl"] = stylesheet is not None
+
+        if stylesheet is None:
+            stylesheet = self._generate_jsonxsl(xslt_dir)
+            if cache_key is not None:
+                with self.timings.stage("jsonxsl"):
+                    self._cache.put_data(
+                        "jsonxsl", cache_key, etree.tostring(stylesheet)
+                    )
 
-        # fill in the sys args before invoking pyang
-        sys.argv = [
-            pyang_exec_path,
-            "-f",
-            "jsonxsl",
-            "-o",
-            xls_file_path,
-            "-p",
-            self._search_path,
-            "--lax-quote-checks",
-        ] + self._yang_files
+        try:
+            if self._debug:
+                self._debug("Compiling xsl stylesheet in-process")
+            with self.timings.stage("jsonxsl"):
+                return etree.XSLT(stylesheet)
+        except etree.XSLTParseError as e:
+            raise ValueError("Error while compiling xsl file: %s" % e)
 
+    def _generate_jsonxsl(self, xslt_dir):
+        """
+        Generate the jsonxsl stylesheet for the yang files with pyang in memory
+        :param xslt_dir: Directory path of the pyang jsonxsl templates
+        :return: The stylesheet as lxml ElementTree
+        """
         if self._debug:
             self._debug(
-                "Generating xsl file '%s' by executing command '%s'"
-                % (xls_file_path, " ".join(sys.argv))
+                "Generating xsl stylesheet in memory for yang files '%s'"
+                % " ".join(self._yang_files)
             )
         try:
-            self._pyang_module.run()
-        except SystemExit:
-            pass
-        except Exception as e:
-            if not self._keep_tmp_files:
-                shutil.rmtree(
-                    os.path.realpath(os.path.expanduser(tmp_dir_path)),
-                    ignore_errors=True,
+            with self.timings.stage("compile"):
+                compiler.load_modules(self._yang_files, self._search_path)
+            with self.timings.stage("jsonxsl"):
+                content = compiler.emit(
+                    "jsonxsl", self._yang_files, self._search_path
                 )
-            raise ValueError(
-                "Error while generating intermediate (xsl) file: %s" % e
-            )
-        finally:
-            err = sys.stderr.getvalue()
-            if err and "error" in err.lower():
-                if not self._keep_tmp_files:
-                    shutil.rmtree(
-                        os.path.realpath(os.path.expanduser(tmp_dir_path)),
-                        ignore_errors=True,
+                stylesheet = etree.ElementTree(
+                    etree.fromstring(
+                        to_bytes(content, errors="surrogate_or_strict")
                     )
-                raise ValueError(
-                    "Error while generating (xsl) intermediate file: %s" % err
                 )
-
-        xsltproc_exec_path = find_file_in_path("xsltproc")
-        if not xsltproc_exec_path:
+        except (ValueError, etree.XMLSyntaxError) as e:
             raise ValueError(
-                "xsltproc executable not found."
-                " Install 'libxml2-dev' and 'libxslt-dev' packages"
+                "Error while generating intermediate (xsl) file: %s" % e
             )
-
-        # fill in the sys args before invoking xsltproc
-        sys.argv = [
-            xsltproc_exec_path,
-            "-o",
-            json_file_path,
-            xsl_file_path,
-            xml_file_path,
-        ]
-
-        if self._debug:
-            self._debug(
-                "Generating json data in temp file '%s' by executing command '%s'"
-                % (json_file_path, " ".join(sys.argv))
+        # the plugin takes the templates directory from the PYANG_XSLT_DIR
+        # environment variable, point the include to it afterwards instead
+        for include in stylesheet.iterfind("{%s}include" % XSLT_NS):
+            include.set(
+                "href",
+                urljoin(
+                    "file:",
+                    pathname2url(
+                        os.path.join(xslt_dir, "jsonxsl-templates.xsl")
+                    ),
+                ),
             )
-        time.sleep(5)
-
-        try:
-            os.system(" ".join(sys.argv))
-        except SystemExit:
-            pass
-        finally:
-            err = sys.stderr.getvalue()
-            if err and "error" in err.lower():
-                if not self._keep_tmp_files:
-                    shutil.rmtree(
-                        os.path.realpath(os.path.expanduser(tmp_dir_path)),
-                        ignore_errors=True,
-                    )
-                raise ValueError("Error while translating to json: %s" % err)
-            sys.argv = saved_arg
-            sys.stdout = saved_stdout
-            sys.stderr = saved_stderr
+        return stylesheet
 
+    def _apply_jsonxsl(self, doc):
+        """
+        Apply the compiled jsonxsl transform to the parsed xml document and
+        load the resulting JSON text.
+        :param doc: The lxml Element or ElementTree to be translated
+        :return: data in JSON format.
+        """
+        transform = self._get_jsonxsl_transform()
+        if self._debug:
+            self._debug("Translating xml document to json in-process")
         try:
-            if self._debug:
-                self._debug(
-                    "Reading output json data from temporary file: %s"
-                    % json_file_path
-                )
-            with open(json_file_path, "r") as fp:
-                raw_content = fp.read()
-                content = json.loads(raw_content)
-        except Exception as e:
+            with self.timings.stage("xslt"):
+                result = str(transform(doc))
+            with self.timings.stage("parse"):
+                content = json.loads(result)
+        except etree.XSLTApplyError as e:
             raise ValueError(
-                "Error while reading json document %s from path %s"
-                % (e, json_file_path)
+                "Error while translating to json: %s"
+                % (transform.error_log or e)
             )
-        finally:
-            if not self._keep_tmp_files:
-                shutil.rmtree(
-                    os.path.realpath(os.path.expanduser(tmp_dir_path)),
-                    ignore_errors=True,
-                )
+        except Exception as e:
+            raise ValueError("Error while reading json document %s" % e)
         return content
+
+
+def _namespaces(doc):
+    """
+    Return the namespaces of the elements of a parsed XML document
+    """
+    namespaces = set()
+    for elem in doc.iter(etree.Element):
+        if elem.tag.startswith("{"):
+            namespaces.add(elem.tag[1:].split("}", 1)[0])
+    return namespaces
+
+
+def _stream_namespaces(source):
+    """
+    Return the namespaces of the elements of an XML file or file-like object,
+    the elements are released once read
+    """
+    namespaces = set()
+    try:
+        for event, elem in etree.iterparse(source, events=("end",)):
+            if elem.tag.startswith("{"):
+                namespaces.add(elem.tag[1:].split("}", 1)[0])
+            elem.clear()
+    except etree.XMLSyntaxError as exc:
+        raise ValueError(
+            "Failed to load xml data: %s"
+            % (to_text(exc, errors="surrogate_or_strict"))
+        )
+    return namespaces
+
+
+def _copy_tree(src, dest):
+    """
+    Copy the attributes, text and children of an ElementTree element to a
+    lxml element
+    """
+    for name, value in src.attrib.items():
+        dest.set(name, value)
+    dest.text = src.text
+    for child in src:
+        elem = etree.SubElement(dest, child.tag)
+        _copy_tree(child, elem)
+        elem.tail = child.tail
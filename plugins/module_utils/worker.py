@@ -0,0 +1,550 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Controller local translation worker. Ansible runs every task in a forked
+process, so schemas compiled by a task are lost when it ends. The worker is
+a long lived process started on demand which keeps the Translator instances,
+and with them the compiled schemas and transforms, warm for all the tasks
+of the controller. Clients talk to it over a Unix socket with a
+multiprocessing manager.
+"""
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import binascii
+import errno
+import fcntl
+import glob
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from multiprocessing import AuthenticationError
+from multiprocessing.managers import BaseManager
+
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.six import string_types
+
+from ansible_collections.community.yang.plugins.module_utils.common import (
+    to_list,
+)
+from ansible_collections.community.yang.plugins.module_utils.timing import (
+    Timings,
+)
+
+try:
+    from lxml import etree
+
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+WORKER_SOCKET_PATH = "~/.ansible/tmp/yang/worker.sock"
+# seconds without requests after which the worker exits
+WORKER_IDLE_TIMEOUT = 600
+# maximum number of translators kept warm by the worker
+WORKER_MAX_TRANSLATORS = 32
+# seconds to wait for a started worker to accept connections
+WORKER_START_TIMEOUT = 30
+
+
+class TranslationService(object):
+    """
+    Translation requests served by the worker process. Translators are kept
+    per yang file set, the modification time of the files and the content
+    of the modules they import or include are part of the key, so a changed
+    model is compiled again.
+    """
+
+    def __init__(self):
+        self._translators = OrderedDict()
+        self._lock = threading.Lock()
+        # requests in flight, the worker is idle only when none is running
+        self._running = 0
+        self._closing = False
+        self._requests_lock = threading.Lock()
+        self.last_request = time.time()
+
+    @contextmanager
+    def _request(self):
+        with self._requests_lock:
+            if self._closing:
+                raise ValueError("translation worker is shutting down")
+            self._running += 1
+        try:
+            yield
+        finally:
+            with self._requests_lock:
+                self._running -= 1
+                self.last_request = time.time()
+
+    def _idle(self, idle_timeout):
+        """
+        Tell whether no request ran for idle_timeout seconds, the requests
+        received afterwards are refused so the worker can exit.
+        :param idle_timeout: Seconds without requests
+        :return: True when the worker is idle.
+        """
+        with self._requests_lock:
+            self._closing = (
+                self._running == 0
+                and time.time() - self.last_request >= idle_timeout
+            )
+            return self._closing
+
+    def _translator(self, yang_files, search_path, doctype, engine, options):
+        from ansible_collections.community.yang.plugins.module_utils import (
+            compiler,
+        )
+        from ansible_collections.community.yang.plugins.module_utils.translator import (
+            Translator,
+        )
+
+        files_key = _files_key(yang_files)
+        paths = [entry[0] for entry in files_key]
+        key = (
+            files_key,
+            search_path,
+            # the translator keeps the artifacts generated from the imported
+            # modules as well, search in the directory of the yang files by
+            # default as the translator does
+            compiler.dependency_digest(
+                paths,
+                search_path or (os.path.dirname(paths[0]) if paths else None),
+            ),
+            doctype,
+            engine,
+            tuple(sorted(options.items())),
+        )
+        with self._lock:
+            tl = self._translators.pop(key, None)
+            if tl is None:
+                tl = Translator(
+                    yang_files, search_path, doctype, engine=engine, **options
+                )
+            self._translators[key] = tl
+            while len(self._translators) > WORKER_MAX_TRANSLATORS:
+                self._translators.popitem(last=False)
+        return tl
+
+    def ping(self):
+        with self._request():
+            return os.getpid()
+
+    def translate(self, method, translator_args, args):
+        """
+        Run a Translator method
+        :param method: Name of the Translator method
+        :param translator_args: Tuple of the yang files, search path,
+                                doctype, engine and Translator options
+        :param args: Positional arguments of the method
+        :return: Tuple of the result of the method, the timings of the
+                 stages it ran and the cache hits of the artifacts of the
+                 translator.
+        """
+        if method not in (
+            "json_to_xml",
+            "json_to_xml_many",
+            "xml_to_json",
+            "xml_to_json_many",
+            "xml_to_json_file",
+        ):
+            raise ValueError("unsupported translation method '%s'" % method)
+        with self._request():
+            tl = self._translator(*translator_args)
+            # the translator is shared by the clients, only report the
+            # stages run for this request
+            with tl.timings.capture() as timings:
+                result = getattr(tl, method)(*args)
+            # the artifacts are loaded once by the shared translator, the
+            # hits recorded then apply to all the requests using them
+            cache_hits = dict(tl.cache_hits)
+        return result, timings.as_dict(), cache_hits
+
+    def generate_spec(self, spec_args, requests):
+        """
+        Generate yang specs with a GenerateSpec instance
+        :param spec_args: Keyword arguments of GenerateSpec
+        :param requests: List of (method name, keyword arguments) tuples
+        :return: Tuple of the list of the generated specs in the order of
+                 the requests, the timings of the stages and the cache hits
+                 of the formats.
+        """
+        from ansible_collections.community.yang.plugins.module_utils.spec import (
+            GenerateSpec,
+        )
+
+        with self._request():
+            tmp_dir_path = spec_args.get("tmp_dir_path")
+            if tmp_dir_path and not os.path.isdir(tmp_dir_path):
+                os.makedirs(tmp_dir_path)
+            genspec_obj = GenerateSpec(**spec_args)
+            results = []
+            for method, kwargs in requests:
+                if method not in (
+                    "generate_schemas",
+                    "generate_tree_schema",
+                    "generate_xml_schema",
+                    "generate_json_schema",
+                ):
+                    raise ValueError("unsupported spec method '%s'" % method)
+                results.append(getattr(genspec_obj, method)(**kwargs))
+        return results, genspec_obj.timings.as_dict(), genspec_obj.cache_hits
+
+
+def _files_key(yang_files):
+    key = []
+    for pattern in to_list(yang_files):
+        for path in sorted(glob.glob(os.path.expanduser(pattern))):
+            stat = os.stat(path)
+            key.append((path, stat.st_mtime, stat.st_size))
+    return tuple(key)
+
+
+class _ClientManager(BaseManager):
+    pass
+
+
+_ClientManager.register("service")
+
+
+def _paths(socket_path):
+    socket_path = os.path.realpath(os.path.expanduser(socket_path))
+    return socket_path, socket_path + ".key", socket_path + ".lock"
+
+
+def _authkey(key_path):
+    """
+    Read the key authenticating the clients of the worker, generate it on
+    first use. It is only readable by the user running the controller.
+    """
+    try:
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+    else:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(binascii.hexlify(os.urandom(32)))
+    with open(key_path, "rb") as fp:
+        return fp.read()
+
+
+def _connect(socket_path, authkey):
+    manager = _ClientManager(address=socket_path, authkey=authkey)
+    manager.connect()
+    return manager.service()
+
+
+def connect(socket_path, start=True, idle_timeout=WORKER_IDLE_TIMEOUT):
+    """
+    Connect to the translation worker listening on socket_path, start it if
+    it is not running.
+    :param socket_path: Path of the Unix socket of the worker
+    :param start: Start the worker if it is not running
+    :param idle_timeout: Seconds without requests after which a started
+                         worker exits
+    :return: Proxy of the TranslationService of the worker.
+    """
+    socket_path, key_path, lock_path = _paths(socket_path)
+    socket_dir = os.path.dirname(socket_path)
+    if not os.path.isdir(socket_dir):
+        os.makedirs(socket_dir)
+    authkey = _authkey(key_path)
+    try:
+        return _connect(socket_path, authkey)
+    except (AuthenticationError, EOFError, IOError, OSError) as exc:
+        if not start:
+            raise ValueError(
+                "translation worker is not running at %s: %s"
+                % (socket_path, to_text(exc, errors="surrogate_or_strict"))
+            )
+
+    # only one of the concurrent clients starts the worker
+    with open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            return _connect(socket_path, authkey)
+        except (AuthenticationError, EOFError, IOError, OSError):
+            pass
+        if os.path.exists(socket_path):
+            # left behind by a worker that did not exit cleanly
+            os.remove(socket_path)
+        _spawn(socket_path, idle_timeout)
+
+        deadline = time.time() + WORKER_START_TIMEOUT
+        while True:
+            try:
+                return _connect(socket_path, authkey)
+            except (AuthenticationError, EOFError, IOError, OSError) as exc:
+                if time.time() > deadline:
+                    raise ValueError(
+                        "unable to start translation worker at %s: %s"
+                        % (
+                            socket_path,
+                            to_text(exc, errors="surrogate_or_strict"),
+                        )
+                    )
+                time.sleep(0.1)
+
+
+def _spawn(socket_path, idle_timeout):
+    # the worker runs in a new interpreter detached from the forked task,
+    # with the collection importable the same way as in the controller
+    collections_root = os.path.abspath(
+        os.path.join(os.path.dirname(__file__), *([os.pardir] * 5))
+    )
+    bootstrap = (
+        "import sys; sys.path.insert(0, %r); "
+        "from ansible_collections.community.yang.plugins.module_utils."
+        "worker import serve; serve(%r, %r)"
+        % (collections_root, socket_path, idle_timeout)
+    )
+    with open(os.devnull, "r+b") as devnull:
+        subprocess.Popen(
+            [sys.executable, "-c", bootstrap],
+            stdin=devnull,
+            stdout=devnull,
+            stderr=devnull,
+            close_fds=True,
+            preexec_fn=os.setsid,
+        )
+
+
+def serve(socket_path, idle_timeout=WORKER_IDLE_TIMEOUT):
+    """
+    Run the translation worker until it is idle for idle_timeout seconds.
+    :param socket_path: Path of the Unix socket to listen on
+    :param idle_timeout: Seconds without requests after which it exits
+    """
+    socket_path, key_path, lock_path = _paths(socket_path)
+    service = TranslationService()
+
+    class _ServerManager(BaseManager):
+        pass
+
+    _ServerManager.register("service", callable=lambda: service)
+    manager = _ServerManager(address=socket_path, authkey=_authkey(key_path))
+    server = manager.get_server()
+
+    def watch():
+        # requests running longer than idle_timeout keep the worker alive
+        while not service._idle(idle_timeout):
+            time.sleep(min(idle_timeout, 5))
+        try:
+            os.remove(socket_path)
+        except OSError:
+            pass
+        os._exit(0)
+
+    watcher = threading.Thread(target=watch)
+    watcher.daemon = True
+    watcher.start()
+    server.serve_forever()
+
+
+def stop(socket_path):
+    """
+    Stop the translation worker listening on socket_path, if any.
+    :param socket_path: Path of the Unix socket of the worker
+    :return: True if a worker was stopped.
+    """
+    try:
+        pid = connect(socket_path, start=False).ping()
+    except ValueError:
+        return False
+    os.kill(pid, 15)
+    socket_path = _paths(socket_path)[0]
+    deadline = time.time() + WORKER_START_TIMEOUT
+    while time.time() < deadline:
+        try:
+            os.kill(pid, 0)
+        except OSError:
+            break
+        time.sleep(0.1)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    return True
+
+
+class WorkerTranslator(object):
+    """
+    Translator client running the translations in the worker process. It
+    offers the methods of Translator used by the plugins, the file paths
+    given are resolved by the client as the worker runs in another
+    directory.
+    """
+
+    def __init__(
+        self,
+        yang_files,
+        search_path=None,
+        doctype="config",
+        keep_tmp_files=False,
+        debug=None,
+        cache_dir=None,
+        engine="pyang",
+        socket_path=WORKER_SOCKET_PATH,
+    ):
+        yang_files = [_abspath(f) for f in to_list(yang_files)]
+        if search_path is not None:
+            search_path = _abs_search_path(search_path)
+        options = {"keep_tmp_files": keep_tmp_files}
+        if cache_dir:
+            options["cache_dir"] = _abspath(cache_dir)
+        self._args = (yang_files, search_path, doctype, engine, options)
+        self._debug = debug
+        self._service = connect(socket_path)
+        self.cache_hits = {}
+        self.timings = Timings()
+
+    def _translate(self, method, *args):
+        if self._debug:
+            self._debug("Running %s in translation worker" % method)
+        result, timings, cache_hits = self._service.translate(
+            method, self._args, args
+        )
+        self.timings.update(timings)
+        self.cache_hits.update(cache_hits)
+        return result
+
+    def json_to_xml(self, json_data, tmp_dir_path):
+        return self._translate(
+            "json_to_xml", _abspath(json_data), _abspath(tmp_dir_path)
+        )
+
+    def json_to_xml_many(self, json_data_list, output="text"):
+        if output != "text":
+            raise ValueError("output should be 'text' with the worker")
+        return self._translate(
+            "json_to_xml_many", [_abspath(d) for d in json_data_list]
+        )
+
+    def json_to_xml_in_memory(self, json_data, output="element"):
+        xml_data = to_bytes(self.json_to_xml_many([json_data])[0])
+        if output == "bytes":
+            return xml_data
+        return etree.fromstring(xml_data)
+
+    def xml_to_json(self, xml_data, tmp_dir_path):
+        return self.xml_to_json_many([xml_data], tmp_dir_path)[0]
+
+    def xml_to_json_many(self, xml_data_list, tmp_dir_path):
+        return self._translate(
+            "xml_to_json_many",
+            [_xml_arg(x) for x in xml_data_list],
+            _abspath(tmp_dir_path),
+        )
+
+    def xml_to_json_file(self, xml_data, json_file_path):
+        return self._translate(
+            "xml_to_json_file", _xml_arg(xml_data), _abspath(json_file_path)
+        )
+
+
+class WorkerGenerateSpec(object):
+    """
+    GenerateSpec client generating the specs in the worker process.
+    """
+
+    def __init__(self, socket_path=WORKER_SOCKET_PATH, **kwargs):
+        """
+        :param socket_path: Path of the Unix socket of the worker
+        :param kwargs: Keyword arguments of GenerateSpec
+        """
+        if kwargs.get("yang_file_path"):
+            kwargs["yang_file_path"] = [
+                _abspath(p) for p in to_list(kwargs["yang_file_path"])
+            ]
+        if kwargs.get("tmp_dir_path"):
+            kwargs["tmp_dir_path"] = _abspath(kwargs["tmp_dir_path"])
+        if kwargs.get("search_path"):
+            kwargs["search_path"] = _abs_search_path(kwargs["search_path"])
+        if kwargs.get("cache_dir"):
+            kwargs["cache_dir"] = _abspath(kwargs["cache_dir"])
+        self._kwargs = kwargs
+        self._service = connect(socket_path)
+        self.cache_hits = {}
+        self.timings = Timings()
+
+    def _generate(self, method, **kwargs):
+        if kwargs.get("schema_out_path"):
+            kwargs["schema_out_path"] = _abspath(kwargs["schema_out_path"])
+        results, timings, cache_hits = self._service.generate_spec(
+            self._kwargs, [(method, kwargs)]
+        )
+        self.timings.update(timings)
+        self.cache_hits.update(cache_hits)
+        return results[0]
+
+    def generate_schemas(
+        self,
+        json_schema=None,
+        xml_schema=None,
+        tree_schema=None,
+        formats=None,
+    ):
+        kwargs = {}
+        if formats is not None:
+            kwargs["formats"] = to_list(formats)
+        for name, options in (
+            ("json_schema", json_schema),
+            ("xml_schema", xml_schema),
+            ("tree_schema", tree_schema),
+        ):
+            options = dict(options or {})
+            if options.get("path"):
+                options["path"] = _abspath(options["path"])
+            kwargs[name] = options
+        return self._generate("generate_schemas", **kwargs)
+
+    def generate_tree_schema(self, schema_out_path=None):
+        return self._generate(
+            "generate_tree_schema", schema_out_path=schema_out_path
+        )
+
+    def generate_xml_schema(
+        self, schema_out_path=None, defaults=False, annotations=False
+    ):
+        return self._generate(
+            "generate_xml_schema",
+            schema_out_path=schema_out_path,
+            defaults=defaults,
+            annotations=annotations,
+        )
+
+    def generate_json_schema(self, schema_out_path=None, defaults=False):
+        return self._generate(
+            "generate_json_schema",
+            schema_out_path=schema_out_path,
+            defaults=defaults,
+        )
+
+
+def _abspath(value):
+    # file paths are made absolute, inline JSON or XML data is passed through
+    if isinstance(value, string_types) and not value.lstrip().startswith(
+        ("{", "<")
+    ):
+        return os.path.abspath(os.path.expanduser(value))
+    return value
+
+
+def _abs_search_path(search_path):
+    return ":".join(_abspath(p) if p else p for p in search_path.split(":"))
+
+
+def _xml_arg(xml_data):
+    # parsed documents and file objects can not be sent to the worker
+    if HAS_LXML and isinstance(xml_data, (etree._Element, etree._ElementTree)):
+        return etree.tostring(xml_data)
+    if hasattr(xml_data, "read"):
+        return xml_data.read()
+    return _abspath(xml_data)
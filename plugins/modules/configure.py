@@ -46,6 +46,30 @@ options:
         the default directory path.
     type: path
     default: "~/.ansible/yang/spec"
+  engine:
+    description:
+      - The engine used to translate the JSON configuration to the XML payload. With C(pyang) the configuration
+        is translated with the driver generated by the pyang jtox plugin. With C(native) the XML tree is built
+        directly walking the compiled YANG schema tree.
+    type: str
+    default: pyang
+    choices:
+    - pyang
+    - native
+  use_worker:
+    description:
+      - Run the translation in a worker process on the control node instead of the task process. The worker is
+        started on demand, listens on C(~/.ansible/tmp/yang/worker.sock) and keeps the compiled YANG schemas
+        in memory across tasks, so the tasks of all the hosts using the same model compile it once. The worker
+        exits after 10 minutes without requests.
+    type: bool
+    default: False
+  timings:
+    description:
+      - Return the wall clock and CPU time spent in each stage of the translation in the C(timings) key of the
+        result, to find out which stage a slow task spends its time in.
+    type: bool
+    default: False
   netconf_options:
     description:
     - Pass arguments to the lower level component, M(ansible.netcommon.netconf_config), that this module uses.
@@ -200,6 +224,11 @@ notes:
 - This module supports the use of connection=ansible.netcommon.netconf
 """
 RETURN = """
+cache_hit:
+  description: Whether the jtox schema artifact used for the translation was loaded from the controller side cache.
+  returned: always
+  type: bool
+  sample: true
 diff:
   description: If --diff option in enabled while running, the before and after configuration change are
                returned as part of before and after key.
@@ -208,6 +237,19 @@ diff:
   sample:
     "after": "<rpc-reply>\n<data>\n<configuration>\n<version>17.3R1.10</version>...<--snip-->"
     "before": "<rpc-reply>\n<data>\n<configuration>\n <version>17.3R1.10</version>...<--snip-->"
+timings:
+  description: The wall clock and CPU time in seconds spent in each stage of the translation and the number of
+               times the stage was run. The stages are C(resolve), C(compile), C(jtox) or C(jsonxsl) emission,
+               C(json2xml) or C(xslt), C(parse), C(serialize) and C(cleanup).
+  returned: when C(timings) is set
+  type: dict
+  sample:
+    resolve: {"wall": 0.0002, "cpu": 0.0002, "calls": 1}
+    parse: {"wall": 0.0001, "cpu": 0.0001, "calls": 1}
+    compile: {"wall": 1.61, "cpu": 1.58, "calls": 1}
+    jtox: {"wall": 0.05, "cpu": 0.05, "calls": 2}
+    json2xml: {"wall": 0.003, "cpu": 0.003, "calls": 1}
+    serialize: {"wall": 0.0001, "cpu": 0.0001, "calls": 1}
 """
 EXAMPLES = """
 - name: configure interface using structured data in JSON format
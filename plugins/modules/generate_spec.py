@@ -81,6 +81,28 @@ options:
       path:
         description: The file path to which the generated tree schema should be stored.
         type: path
+  formats:
+    description:
+      - The list of the schemas to generate. The schemas that are not listed are neither generated, stored into
+        their C(path) nor returned in the result.
+    type: list
+    elements: str
+    choices: ['json_schema', 'xml_schema', 'tree_schema']
+    default: ['json_schema', 'xml_schema', 'tree_schema']
+  use_worker:
+    description:
+      - Run the spec generation in a worker process on the control node instead of the task process. The worker is
+        started on demand, listens on C(~/.ansible/tmp/yang/worker.sock) and keeps the compiled YANG schemas
+        in memory across tasks, so the tasks of all the hosts using the same model compile it once. The worker
+        exits after 10 minutes without requests.
+    type: bool
+    default: False
+  timings:
+    description:
+      - Return the wall clock and CPU time spent in each stage of the spec generation in the C(timings) key of the
+        result, to find out which stage a slow task spends its time in.
+    type: bool
+    default: False
 requirements:
 - ncclient (>=v0.5.2)
 - pyang
@@ -90,9 +112,14 @@ notes:
 - This module supports the use of connection=ansible.netcommon.netconf
 """
 RETURN = """
+cache_hit:
+  description: Whether all the generated schemas were loaded from the controller side cache.
+  returned: always
+  type: bool
+  sample: true
 tree_schema:
   description: The tree schema representation of yang scehma as per RFC 8340
-  returned: always
+  returned: when C(tree_schema) is in C(formats)
   type: dict
   sample: |
     module: openconfig-interfaces
@@ -119,7 +146,7 @@ tree_schema:
             |  +--ro last-change?     oc-types:timeticks64
 json_schema:
   description: The json schema generated from yang document
-  returned: always
+  returned: when C(json_schema) is in C(formats)
   type: dict
   sample: |
     {
@@ -158,7 +185,7 @@ json_schema:
         }
 xml_schema:
   description: The xml configuration schema generated from yang document
-  returned: always
+  returned: when C(xml_schema) is in C(formats)
   type: dict
   sample: |
     <config xmlns="urn:ietf:params:xml:ns:netconf:base:1.0">
@@ -192,6 +219,21 @@ xml_schema:
         </interface>
       </interfaces>
     </config>
+timings:
+  description: The wall clock and CPU time in seconds spent in each stage of the spec generation and the number of
+               times the stage was run. The stages are C(resolve), C(compile) which parses and validates the yang
+               files once for all the schemas, C(json_skeleton), C(xml_skeleton) and C(tree) which render the schemas
+               or read them from the cache, and C(write). The stages are exclusive, the time of C(compile) is not
+               counted in the schema stages.
+  returned: when C(timings) is set
+  type: dict
+  sample:
+    resolve: {"wall": 0.0001, "cpu": 0.0001, "calls": 1}
+    compile: {"wall": 0.14, "cpu": 0.13, "calls": 3}
+    json_skeleton: {"wall": 0.0008, "cpu": 0.0008, "calls": 1}
+    write: {"wall": 0.0003, "cpu": 0.0003, "calls": 1}
+    xml_skeleton: {"wall": 0.0007, "cpu": 0.0007, "calls": 1}
+    tree: {"wall": 0.001, "cpu": 0.001, "calls": 1}
 """
 EXAMPLES = """
 - name: generate spec from openconfig interface data and in result
@@ -213,4 +255,11 @@ EXAMPLES = """
       annotations: True
     tree_schema:
       path: "~/.ansible/yang/spec/{{ inventory_hostname }}/openconfig-interfaces-config.tree"
+
+- name: generate only the tree schema of openconfig interface
+  community.yang.generate_spec:
+    file: "openconfig/public/release/models/interfaces/openconfig-interfaces.yang"
+    search_path: "{{ playbook_dir }}/openconfig/public/release/models:pyang/modules"
+    formats:
+      - tree_schema
 """
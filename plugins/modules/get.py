@@ -57,7 +57,8 @@ options:
       - The file path of the YANG model that corresponds to the configuration fetch from the remote host.
         This options accepts wildcard (*) as well for the filename in case the configuration requires
         to parse multiple yang file. For example "openconfig/public/tree/master/release/models/interfaces/*.yang"
-    required: True
+      - If not given the YANG modules are selected from the namespaces of the reply, the modules of C(search_path)
+        defining them are compiled along with their imports only.
     type: list
     elements: path
   search_path:
@@ -67,6 +68,39 @@ options:
         the default directory path.
     type: path
     default: "~/.ansible/yang/spec"
+  engine:
+    description:
+      - The engine used to translate the XML reply to JSON. With C(pyang) the reply is translated with the
+        stylesheet generated by the pyang jsonxsl plugin. With C(native) the reply is converted in a single
+        pass walking the compiled YANG schema tree, which scales linearly with the number of list entries.
+    type: str
+    default: pyang
+    choices:
+    - pyang
+    - native
+  output_file:
+    description:
+      - The path of a file on the control node the JSON data is streamed to. The reply is translated in
+        a single pass and the JSON data is written incrementally instead of being built in memory, this is
+        useful for large operational state replies. Only the JSON output is streamed, the XML reply returned
+        by C(netconf_get) is still held in memory as a whole. If this option is set
+        the result contains C(json_file) instead of C(json_data). The reply is always streamed with the
+        C(native) engine, C(engine=pyang) is rejected.
+    type: path
+  use_worker:
+    description:
+      - Run the translation in a worker process on the control node instead of the task process. The worker is
+        started on demand, listens on C(~/.ansible/tmp/yang/worker.sock) and keeps the compiled YANG schemas
+        in memory across tasks, so the tasks of all the hosts using the same model compile it once. The worker
+        exits after 10 minutes without requests.
+    type: bool
+    default: False
+  timings:
+    description:
+      - Return the wall clock and CPU time spent in each stage of the translation in the C(timings) key of the
+        result, to find out which stage a slow task spends its time in.
+    type: bool
+    default: False
 requirements:
 - ncclient (>=v0.5.2)
 - pyang
@@ -79,9 +113,14 @@ notes:
 """
 
 RETURN = """
+cache_hit:
+  description: Whether the jsonxsl stylesheet used for the translation was loaded from the controller side cache.
+  returned: always
+  type: bool
+  sample: true
 json_data:
   description: The running configuration in json format
-  returned: always
+  returned: when C(output_file) is not set
   type: dict
   sample: |
     {
@@ -97,6 +136,11 @@ json_data:
             }]
          }
     }
+json_file:
+  description: The path of the file the running configuration in json format is written to
+  returned: when C(output_file) is set
+  type: str
+  sample: /tmp/interfaces.json
 xml_data:
   description: The running configuration in xml format
   returned: always
@@ -112,6 +156,18 @@ xml_data:
          </interface-configuration>
        </interface-configurations>
      </data>
+timings:
+  description: The wall clock and CPU time in seconds spent in each stage of the translation and the number of
+               times the stage was run. The stages are C(resolve), C(compile), C(jtox) or C(jsonxsl) emission,
+               C(json2xml) or C(xslt), C(parse), C(serialize) and C(cleanup).
+  returned: when C(timings) is set
+  type: dict
+  sample:
+    resolve: {"wall": 0.0002, "cpu": 0.0002, "calls": 1}
+    compile: {"wall": 1.52, "cpu": 1.49, "calls": 1}
+    jsonxsl: {"wall": 0.31, "cpu": 0.3, "calls": 2}
+    parse: {"wall": 0.004, "cpu": 0.004, "calls": 2}
+    xslt: {"wall": 0.012, "cpu": 0.012, "calls": 1}
 """
 EXAMPLES = """
 - name: fetch interface configuration and return it in JSON format
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Compare the results of a benchmark run, as written by pytest-benchmark with
+--benchmark-json, against the committed baseline and fail when the median
+time or the peak memory of a benchmark grew beyond its threshold.
+
+    compare.py benchmark.json            compare against the baseline
+    compare.py --save benchmark.json     replace the baseline with the run
+"""
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import json
+import os
+import re
+import sys
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCHMARKS_DIR, "baseline.json")
+THRESHOLDS_PATH = os.path.join(BENCHMARKS_DIR, "thresholds.json")
+
+
+def load_results(path):
+    """
+    Read the median time and the peak memory of the benchmarks of a
+    pytest-benchmark JSON report
+    :param path: Path of the report
+    :return: Dict of {benchmark name: {"time": seconds, "memory": bytes}}
+    """
+    with open(path) as fp:
+        report = json.load(fp)
+    results = {}
+    for bench in report["benchmarks"]:
+        results[bench["name"]] = {
+            "time": bench["stats"]["median"],
+            "memory": bench.get("extra_info", {}).get("peak_memory"),
+        }
+    return results
+
+
+def thresholds_for(name, config):
+    """
+    Return the thresholds of a benchmark, the first pattern of the config
+    matching the benchmark name wins over the defaults. ``*`` is the only
+    wildcard of the patterns, the brackets of the parameters are literal.
+    :param name: The benchmark name
+    :param config: The thresholds config
+    :return: Dict of the thresholds
+    """
+    thresholds = dict(config["default"])
+    for pattern, overrides in config.get("benchmarks", []):
+        regex = re.escape(pattern).replace(r"\*", ".*")
+        if re.match("%s$" % regex, name):
+            thresholds.update(overrides)
+            break
+    return thresholds
+
+
+def compare(baseline, current, config):
+    """
+    Compare the current results with the baseline
+    :param baseline: The baseline results as returned by load_results
+    :param current: The current results as returned by load_results
+    :param config: The thresholds config
+    :return: Tuple of the report lines and the list of the regressions.
+    """
+    lines = []
+    regressions = []
+    for name in sorted(current):
+        if name not in baseline:
+            lines.append("%-70s new benchmark, no baseline" % name)
+            continue
+        thresholds = thresholds_for(name, config)
+        for metric, unit, scale in (
+            ("time", "ms", 1000.0),
+            ("memory", "MiB", 1.0 / (1024 * 1024)),
+        ):
+            old, new = baseline[name].get(metric), current[name].get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            regressed = (
+                change > thresholds[metric]
+                and new - old > thresholds["min_%s" % metric]
+            )
+            lines.append(
+                "%-70s %-6s %10.3f -> %10.3f %s %+7.1f%% (max %+.0f%%)%s"
+                % (
+                    name,
+                    metric,
+                    old * scale,
+                    new * scale,
+                    unit,
+                    change * 100,
+                    thresholds[metric] * 100,
+                    "  REGRESSION" if regressed else "",
+                )
+            )
+            if regressed:
+                regressions.append((name, metric, change))
+    for name in sorted(set(baseline) - set(current)):
+        lines.append("%-70s not run" % name)
+    return lines, regressions
+
+
+def save(current, path):
+    with open(path, "w") as fp:
+        json.dump(current, fp, indent=2, sort_keys=True)
+        fp.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("report", help="pytest-benchmark JSON report")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH)
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="store the results of the report as the new baseline",
+    )
+    args = parser.parse_args(argv)
+
+    current = load_results(args.report)
+    if args.save:
+        save(current, args.baseline)
+        print("baseline of %d benchmarks saved" % len(current))
+        return 0
+
+    with open(args.baseline) as fp:
+        baseline = json.load(fp)
+    with open(args.thresholds) as fp:
+        config = json.load(fp)
+
+    lines, regressions = compare(baseline, current, config)
+    print("\n".join(lines))
+    if regressions:
+        print(
+            "\n%d regression(s) beyond the thresholds of %s"
+            % (len(regressions), args.thresholds)
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
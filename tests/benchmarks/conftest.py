@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from lxml import etree
+
+from .data import MODELS, scale_json
+from .memory import peak_rss, reset_peak_rss
+
+
+@pytest.fixture(scope="session")
+def scaled_data():
+    """
+    Cache of the scaled JSON data and its XML encoding, keyed by model and
+    size, the data is generated with the pyang translator outside of the
+    measured code.
+    """
+    from ansible_collections.community.yang.plugins.module_utils.translator import (
+        Translator,
+    )
+
+    translators = {}
+    cache = {}
+
+    def get(model, size):
+        if (model, size) not in cache:
+            if model not in translators:
+                yang_files, search_path = MODELS[model][:2]
+                translators[model] = Translator(
+                    yang_files, search_path=search_path
+                )
+            json_data = scale_json(model, size)
+            xml_data = etree.tostring(
+                translators[model].json_to_xml_in_memory(json_data)
+            )
+            cache[(model, size)] = (json_data, xml_data)
+        return cache[(model, size)]
+
+    return get
+
+
+@pytest.fixture
+def measure(benchmark):
+    """
+    benchmark.pedantic recording the peak memory used by the measured rounds
+    in the peak_memory extra info of the benchmark, in bytes.
+    """
+
+    def run(func, **kwargs):
+        rss = reset_peak_rss()
+        result = benchmark.pedantic(func, **kwargs)
+        peak = peak_rss()
+        if rss is not None and peak is not None:
+            benchmark.extra_info["peak_memory"] = max(peak - rss, 0)
+        return result
+
+    return run
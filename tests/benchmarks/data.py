@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import copy
+import json
+import os
+
+FIXTURES_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../fixtures"
+)
+YANG_FILE_SEARCH_PATH = os.path.join(FIXTURES_DIR, "files")
+OC_INTF_YANG_FILE_PATH = os.path.join(
+    FIXTURES_DIR, "files/openconfig/interfaces/openconfig-interfaces.yang"
+)
+OC_INTF_JSON_CONFIG_FILE_PATH = os.path.join(
+    FIXTURES_DIR, "config/openconfig/interface_oc_json_valid.json"
+)
+IETF_YANG_FILE_DIR = os.path.join(FIXTURES_DIR, "files/ietf")
+IETF_YANG_FILE_PATHS = [
+    os.path.join(IETF_YANG_FILE_DIR, "ietf-interfaces.yang"),
+    os.path.join(IETF_YANG_FILE_DIR, "ietf-netconf-acm.yang"),
+    os.path.join(IETF_YANG_FILE_DIR, "iana-if-type.yang"),
+]
+IETF_JSON_CONFIG_FILE_PATH = os.path.join(
+    FIXTURES_DIR, "config/ietf/multi_ietf_json_valid.json"
+)
+
+# number of list entries of the translated documents
+SIZES = (1, 10, 100, 1000, 10000)
+
+# yang files, search path and data fixture of the benchmarked models, the
+# first entry of the list at the given path is repeated to scale the data
+MODELS = {
+    "openconfig": (
+        [OC_INTF_YANG_FILE_PATH],
+        YANG_FILE_SEARCH_PATH,
+        OC_INTF_JSON_CONFIG_FILE_PATH,
+        ("openconfig-interfaces:interfaces", "interface"),
+    ),
+    "ietf": (
+        IETF_YANG_FILE_PATHS,
+        IETF_YANG_FILE_DIR,
+        IETF_JSON_CONFIG_FILE_PATH,
+        ("ietf-interfaces:interfaces", "interface"),
+    ),
+}
+
+
+def rounds(size):
+    """
+    Number of measured rounds for a document size, large documents take
+    seconds to translate and are measured less often.
+    """
+    return max(1, min(20, 10000 // (size * 10)))
+
+
+def scale_json(model, size):
+    """
+    Scale the JSON fixture of a model to the given number of list entries,
+    the entries are copies of the first one with a distinct name.
+    :param model: The model name, a key of MODELS
+    :param size: The number of list entries
+    :return: The JSON data as dict
+    """
+    json_file, path = MODELS[model][2], MODELS[model][3]
+    with open(json_file) as fp:
+        json_data = json.load(fp)
+
+    container = json_data
+    for name in path[:-1]:
+        container = container[name]
+    template = container[path[-1]][0]
+    entries = []
+    for index in range(size):
+        entry = copy.deepcopy(template)
+        name = "%s.%d" % (template["name"], index)
+        entry["name"] = name
+        if isinstance(entry.get("config"), dict) and "name" in entry["config"]:
+            entry["config"]["name"] = name
+        entries.append(entry)
+    container[path[-1]] = entries
+    return json_data
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Peak memory of the benchmarked code, measured with the resident set size
+high water mark of the process on Linux so the memory allocated by lxml
+and libxml2 is accounted for as well.
+"""
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import ctypes
+import ctypes.util
+import gc
+
+
+def _status(key):
+    try:
+        with open("/proc/self/status") as fp:
+            for line in fp:
+                if line.startswith(key + ":"):
+                    return int(line.split()[1]) * 1024
+    except (IOError, OSError):
+        pass
+    return None
+
+
+def _release_free_memory():
+    # the memory freed by the previous benchmarks stays resident and is
+    # reused without growing the resident set size, give it back to the
+    # system first so the high water mark accounts for the next allocations
+    gc.collect()
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"))
+        libc.malloc_trim(0)
+    except (AttributeError, OSError, TypeError):
+        pass
+
+
+def reset_peak_rss():
+    """
+    Reset the high water mark of the resident set size of the process
+    :return: The current resident set size in bytes, None if the peak can
+             not be measured on this system.
+    """
+    _release_free_memory()
+    try:
+        with open("/proc/self/clear_refs", "w") as fp:
+            fp.write("5")
+    except (IOError, OSError):
+        return None
+    return _status("VmRSS")
+
+
+def peak_rss():
+    """
+    :return: The resident set size high water mark in bytes since the last
+             reset, None if it can not be measured on this system.
+    """
+    return _status("VmHWM")
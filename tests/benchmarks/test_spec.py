@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from ansible_collections.community.yang.plugins.module_utils import compiler
+from ansible_collections.community.yang.plugins.module_utils.spec import (
+    GenerateSpec,
+)
+
+from .data import MODELS
+
+SPEC_ROUNDS = 5
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        "generate_tree_schema",
+        "generate_xml_schema",
+        "generate_json_schema",
+        "generate_schemas",
+    ],
+)
+@pytest.mark.parametrize("model", sorted(MODELS))
+def test_generate_spec(measure, tmp_path, model, method):
+    yang_files, search_path = MODELS[model][:2]
+    tmp_dir_path = tmp_path / "spec"
+    tmp_dir_path.mkdir()
+
+    def generate():
+        genspec_obj = GenerateSpec(
+            yang_file_path=yang_files,
+            search_path=search_path,
+            tmp_dir_path=str(tmp_dir_path),
+            keep_tmp_files=True,
+        )
+        # every round compiles the yang files, the context of the previous
+        # round is not reused
+        compiler.clear_cache()
+        return getattr(genspec_obj, method)()
+
+    result = measure(
+        generate, rounds=SPEC_ROUNDS, iterations=1, warmup_rounds=1
+    )
+    assert result
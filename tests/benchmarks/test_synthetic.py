@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from ansible_collections.community.yang.plugins.module_utils import compiler
+from ansible_collections.community.yang.plugins.module_utils.spec import (
+    GenerateSpec,
+)
+from ansible_collections.community.yang.plugins.module_utils.translator import (
+    ENGINES,
+    Translator,
+)
+from ansible_collections.community.yang.tests.unit.utils.synthetic import (
+    SyntheticModel,
+)
+
+# model sizes, the data size is fixed to one entry per list
+MODEL_SIZES = {
+    "small": dict(depth=1, breadth=2, lists=1, groupings=1, augments=1),
+    "medium": dict(depth=3, breadth=3, lists=2, groupings=2, augments=2),
+    "large": dict(depth=4, breadth=4, lists=4, groupings=4, augments=4),
+}
+# serialized JSON document sizes in bytes, the model is the medium one
+DATA_SIZES = (10 * 1024, 100 * 1024, 1024 * 1024)
+SPEC_ROUNDS = 3
+
+
+@pytest.fixture(scope="module")
+def synthetic_model(tmp_path_factory):
+    """
+    Yang files of the generated models, written once per model size
+    """
+    models = {}
+
+    def get(size):
+        if size not in models:
+            model = SyntheticModel(**MODEL_SIZES[size])
+            yang_dir = str(tmp_path_factory.mktemp("yang-%s" % size))
+            models[size] = (model, model.write(yang_dir), yang_dir)
+        return models[size]
+
+    return get
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        "generate_tree_schema",
+        "generate_xml_schema",
+        "generate_json_schema",
+        "generate_schemas",
+    ],
+)
+@pytest.mark.parametrize("size", sorted(MODEL_SIZES))
+def test_generate_spec_model_size(
+    benchmark, measure, synthetic_model, tmp_path, size, method
+):
+    model, yang_files, yang_dir = synthetic_model(size)
+    benchmark.extra_info["nodes"] = model.node_count
+
+    def generate():
+        genspec_obj = GenerateSpec(
+            yang_file_path=yang_files,
+            search_path=yang_dir,
+            tmp_dir_path=str(tmp_path),
+            keep_tmp_files=True,
+        )
+        # every round compiles the yang files, the context of the previous
+        # round is not reused
+        compiler.clear_cache()
+        return getattr(genspec_obj, method)()
+
+    assert measure(generate, rounds=SPEC_ROUNDS, iterations=1, warmup_rounds=1)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("size", sorted(MODEL_SIZES))
+def test_compile_model_size(
+    benchmark, measure, synthetic_model, tmp_path, size, engine
+):
+    model, yang_files, yang_dir = synthetic_model(size)
+    benchmark.extra_info["nodes"] = model.node_count
+    json_data = model.json_data(entries=1)
+    xml_data = model.xml_data(entries=1)
+
+    def translate():
+        compiler.clear_cache()
+        tl = Translator(yang_files, search_path=yang_dir, engine=engine)
+        tl.json_to_xml(json_data, str(tmp_path / "json2xml"))
+        return tl.xml_to_json(xml_data, str(tmp_path / "xml2json"))
+
+    assert (
+        measure(translate, rounds=SPEC_ROUNDS, iterations=1, warmup_rounds=1)
+        == json_data
+    )
+
+
+@pytest.fixture(scope="module")
+def medium_translator(synthetic_model):
+    translators = {}
+
+    def get(engine):
+        if engine not in translators:
+            model, yang_files, yang_dir = synthetic_model("medium")
+            translators[engine] = Translator(
+                yang_files, search_path=yang_dir, engine=engine
+            )
+        return translators[engine]
+
+    return get
+
+
+@pytest.mark.parametrize("data_size", DATA_SIZES)
+@pytest.mark.parametrize("engine", ENGINES)
+def test_xml_to_json_data_size(
+    benchmark,
+    measure,
+    synthetic_model,
+    medium_translator,
+    tmp_path,
+    engine,
+    data_size,
+):
+    model = synthetic_model("medium")[0]
+    json_data = model.json_data(size=data_size)
+    xml_data = model.xml_data(size=data_size)
+    tl = medium_translator(engine)
+    benchmark.extra_info["bytes"] = data_size
+
+    assert (
+        measure(
+            tl.xml_to_json,
+            args=(xml_data, str(tmp_path / "xml2json")),
+            rounds=SPEC_ROUNDS,
+            iterations=1,
+        )
+        == json_data
+    )
+
+
+@pytest.mark.parametrize("data_size", DATA_SIZES)
+@pytest.mark.parametrize("engine", ENGINES)
+def test_json_to_xml_data_size(
+    benchmark, measure, synthetic_model, medium_translator, engine, data_size
+):
+    model = synthetic_model("medium")[0]
+    json_data = model.json_data(size=data_size)
+    tl = medium_translator(engine)
+    benchmark.extra_info["bytes"] = data_size
+
+    root = measure(
+        tl.json_to_xml_in_memory,
+        args=(json_data,),
+        rounds=SPEC_ROUNDS,
+        iterations=1,
+    )
+    assert len(root[0]) == len(json_data["synth:root"]["list0"]) * 2
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from lxml import etree
+
+from ansible_collections.community.yang.plugins.module_utils import compiler
+from ansible_collections.community.yang.plugins.module_utils.translator import (
+    ENGINES,
+    Translator,
+)
+
+from .data import MODELS, SIZES, rounds
+
+
+@pytest.fixture(scope="module")
+def translator():
+    """
+    Translators compiled once per model and engine, the translation
+    benchmarks measure warm translators as the plugins use them for the
+    second and subsequent documents.
+    """
+    translators = {}
+
+    def get(model, engine):
+        if (model, engine) not in translators:
+            yang_files, search_path = MODELS[model][:2]
+            translators[(model, engine)] = Translator(
+                yang_files, search_path=search_path, engine=engine
+            )
+        return translators[(model, engine)]
+
+    return get
+
+
+def _run(benchmark, measure, func, size, *args):
+    benchmark.extra_info["entries"] = size
+    count = rounds(size)
+    # a warmup round of the largest documents takes as long as the run
+    return measure(
+        func,
+        args=args,
+        rounds=count,
+        iterations=1,
+        warmup_rounds=1 if count > 1 else 0,
+    )
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("model", sorted(MODELS))
+def test_json_to_xml(
+    benchmark, measure, translator, scaled_data, tmp_path, model, engine, size
+):
+    tl = translator(model, engine)
+    json_data, xml_data = scaled_data(model, size)
+    result = _run(
+        benchmark,
+        measure,
+        tl.json_to_xml,
+        size,
+        json_data,
+        str(tmp_path / "json2xml"),
+    )
+    root = etree.fromstring(result.encode("utf-8"))
+    assert len(root.xpath("/*/*/*[local-name()='interface']")) == size
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("model", sorted(MODELS))
+def test_xml_to_json(
+    benchmark, measure, translator, scaled_data, tmp_path, model, engine, size
+):
+    tl = translator(model, engine)
+    json_data, xml_data = scaled_data(model, size)
+    result = _run(
+        benchmark,
+        measure,
+        tl.xml_to_json,
+        size,
+        xml_data,
+        str(tmp_path / "xml2json"),
+    )
+    assert result == json_data
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("model", sorted(MODELS))
+def test_compile(benchmark, measure, scaled_data, tmp_path, model, engine):
+    """
+    Cold start: compile the yang files and translate a single entry
+    document both ways, without any process or artifact cache.
+    """
+    json_data, xml_data = scaled_data(model, 1)
+    yang_files, search_path = MODELS[model][:2]
+
+    def translate():
+        compiler.clear_cache()
+        tl = Translator(yang_files, search_path=search_path, engine=engine)
+        tl.json_to_xml(json_data, str(tmp_path / "json2xml"))
+        return tl.xml_to_json(xml_data, str(tmp_path / "xml2json"))
+
+    assert _run(benchmark, measure, translate, 1) == json_data
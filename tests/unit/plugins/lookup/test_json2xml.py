@@ -8,12 +8,22 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 import os
+import shutil
+import tempfile
 import unittest
 
+from lxml import etree
+
 from ansible.errors import AnsibleLookupError
+from ansible_collections.community.yang.plugins.common.base import (
+    JSON2XML_DIR_PATH,
+)
 from ansible_collections.community.yang.plugins.lookup.json2xml import (
     LookupModule,
 )
+from ansible_collections.community.yang.tests.unit.utils.index import (
+    use_module_index,
+)
 
 YANG_FILE_SEARCH_PATH = os.path.join(
     os.path.dirname(os.path.abspath(__file__)), "../../../fixtures/files"
@@ -27,10 +37,14 @@ OC_INTF_YANG_FILE_PATH = os.path.join(
     "../../../fixtures/files/openconfig/interfaces/openconfig-interfaces.yang",
 )
 LOOKUP_VARIABLES = {}
+TMP_DIR_PATH = os.path.expanduser(JSON2XML_DIR_PATH)
 
 
 class TestValidate(unittest.TestCase):
     def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self._dir, ignore_errors=True)
+        use_module_index(self, os.path.join(self._dir, "index"))
         self._lp = LookupModule()
 
     def test_invalid_argspec(self):
@@ -68,3 +82,34 @@ class TestValidate(unittest.TestCase):
             '<nc:config xmlns:nc="urn:ietf:params:xml:ns:netconf:base:1.0"',
             result[0],
         )
+
+    def test_valid_json2xml_many(self):
+        """Check all the terms are translated"""
+
+        terms = [OC_INTF_JSON_CONFIG_FILE_PATH, OC_INTF_JSON_CONFIG_FILE_PATH]
+        kwargs = {
+            "yang_file": OC_INTF_YANG_FILE_PATH,
+            "search_path": YANG_FILE_SEARCH_PATH,
+        }
+        single = self._lp.run(terms[:1], LOOKUP_VARIABLES, **kwargs)
+        tmp_dirs = os.listdir(TMP_DIR_PATH)
+        result = self._lp.run(terms, LOOKUP_VARIABLES, **kwargs)
+        self.assertEqual(result, single * 2)
+        # the terms are translated in memory without temporary files
+        self.assertEqual(os.listdir(TMP_DIR_PATH), tmp_dirs)
+
+    def test_valid_json2xml_native_engine(self):
+        """Check the native engine returns the same xml"""
+
+        terms = [OC_INTF_JSON_CONFIG_FILE_PATH]
+        kwargs = {
+            "yang_file": OC_INTF_YANG_FILE_PATH,
+            "search_path": YANG_FILE_SEARCH_PATH,
+        }
+        expected = self._lp.run(terms, LOOKUP_VARIABLES, **kwargs)
+        kwargs["engine"] = "native"
+        result = self._lp.run(terms, LOOKUP_VARIABLES, **kwargs)
+        self.assertEqual(
+            etree.tostring(etree.fromstring(result[0]), method="c14n"),
+            etree.tostring(etree.fromstring(expected[0]), method="c14n"),
+        )
@@ -8,10 +8,15 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 import os
+import shutil
+import tempfile
 import unittest
 
 from ansible.errors import AnsibleLookupError
 from ansible_collections.community.yang.plugins.lookup.spec import LookupModule
+from ansible_collections.community.yang.tests.unit.utils.index import (
+    use_module_index,
+)
 
 YANG_FILE_SEARCH_PATH = os.path.join(
     os.path.dirname(os.path.abspath(__file__)), "../../../fixtures/files"
@@ -29,6 +34,9 @@ LOOKUP_VARIABLES = {}
 
 class TestValidate(unittest.TestCase):
     def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self._dir, ignore_errors=True)
+        use_module_index(self, os.path.join(self._dir, "index"))
         self._lp = LookupModule()
 
     def test_invalid_argspec(self):
@@ -98,3 +106,23 @@ class TestValidate(unittest.TestCase):
             "module: openconfig-interfaces\n  +--rw interfaces\n     +--rw interface* [name]\n",
             result[0]["tree"],
         )
+
+    def test_formats(self):
+        """Check only the requested outputs are generated"""
+
+        kwargs = {"search_path": YANG_FILE_SEARCH_PATH, "formats": ["tree"]}
+        result = self._lp.run(
+            [OC_INTF_YANG_FILE_PATH], LOOKUP_VARIABLES, **kwargs
+        )
+        self.assertIn("module: openconfig-interfaces", result[0]["tree"])
+        self.assertNotIn("json_skeleton", result[0])
+        self.assertNotIn("xml_skeleton", result[0])
+
+        kwargs["formats"] = ["tree", "yang"]
+        with self.assertRaises(AnsibleLookupError) as error:
+            self._lp.run([OC_INTF_YANG_FILE_PATH], LOOKUP_VARIABLES, **kwargs)
+        self.assertIn(
+            "formats value yang is invalid, valid values are json_skeleton, "
+            "xml_skeleton, tree",
+            str(error.exception),
+        )
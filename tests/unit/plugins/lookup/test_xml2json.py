@@ -7,13 +7,19 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import json
 import os
+import shutil
+import tempfile
 import unittest
 
 from ansible.errors import AnsibleLookupError
 from ansible_collections.community.yang.plugins.lookup.xml2json import (
     LookupModule,
 )
+from ansible_collections.community.yang.tests.unit.utils.index import (
+    use_module_index,
+)
 
 YANG_FILE_SEARCH_PATH = os.path.join(
     os.path.dirname(os.path.abspath(__file__)), "../../../fixtures/files"
@@ -31,6 +37,9 @@ LOOKUP_VARIABLES = {}
 
 class TestValidate(unittest.TestCase):
     def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self._dir, ignore_errors=True)
+        use_module_index(self, os.path.join(self._dir, "index"))
         self._lp = LookupModule()
 
     def test_invalid_argspec(self):
@@ -43,7 +52,8 @@ class TestValidate(unittest.TestCase):
                 [OC_INTF_XML_CONFIG_FILE_PATH], LOOKUP_VARIABLES, **kwargs
             )
         self.assertIn(
-            "value of 'yang_file' must be specified", str(error.exception)
+            "value of 'yang_file' or 'search_path' must be specified",
+            str(error.exception),
         )
 
         # invalid json file value arguments
@@ -82,3 +92,80 @@ class TestValidate(unittest.TestCase):
             ]["description"],
             "configured by Ansible yang collection",
         )
+
+    def test_valid_xml2json_many(self):
+        """Check all the terms are translated"""
+
+        terms = [OC_INTF_XML_CONFIG_FILE_PATH, OC_INTF_XML_CONFIG_FILE_PATH]
+        kwargs = {
+            "yang_file": OC_INTF_YANG_FILE_PATH,
+            "search_path": YANG_FILE_SEARCH_PATH,
+        }
+        result = self._lp.run(terms, LOOKUP_VARIABLES, **kwargs)
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0], result[1])
+
+    def test_valid_xml2json_output_dir(self):
+        """Check the json data is written to the output directory"""
+
+        output_dir = tempfile.mkdtemp(dir=self._dir)
+        kwargs = {
+            "yang_file": OC_INTF_YANG_FILE_PATH,
+            "search_path": YANG_FILE_SEARCH_PATH,
+        }
+        expected = self._lp.run(
+            [OC_INTF_XML_CONFIG_FILE_PATH], LOOKUP_VARIABLES, **kwargs
+        )
+
+        kwargs["output_dir"] = output_dir
+        result = self._lp.run(
+            [OC_INTF_XML_CONFIG_FILE_PATH], LOOKUP_VARIABLES, **kwargs
+        )
+        self.assertEqual(
+            result, [os.path.join(output_dir, "interface_oc_xml_valid.json")]
+        )
+        with open(result[0]) as fp:
+            self.assertEqual(json.load(fp), expected[0])
+
+        # the data is streamed with the native engine only
+        with self.assertRaises(AnsibleLookupError) as error:
+            self._lp.run(
+                [OC_INTF_XML_CONFIG_FILE_PATH],
+                LOOKUP_VARIABLES,
+                engine="pyang",
+                **kwargs
+            )
+        self.assertIn("engine 'pyang' is not supported", str(error.exception))
+
+        # files of the same name would overwrite each other
+        other_dir = tempfile.mkdtemp(dir=self._dir)
+        other = os.path.join(other_dir, "interface_oc_xml_valid.xml")
+        with open(OC_INTF_XML_CONFIG_FILE_PATH) as src:
+            with open(other, "w") as dest:
+                dest.write(src.read())
+        with self.assertRaises(AnsibleLookupError) as error:
+            self._lp.run(
+                [OC_INTF_XML_CONFIG_FILE_PATH, other],
+                LOOKUP_VARIABLES,
+                **kwargs
+            )
+        self.assertIn(
+            "xml files with the same name would be written to",
+            str(error.exception),
+        )
+
+    def test_valid_xml2json_native_engine(self):
+        """Check the native engine returns the same data"""
+
+        kwargs = {
+            "yang_file": OC_INTF_YANG_FILE_PATH,
+            "search_path": YANG_FILE_SEARCH_PATH,
+        }
+        expected = self._lp.run(
+            [OC_INTF_XML_CONFIG_FILE_PATH], LOOKUP_VARIABLES, **kwargs
+        )
+        kwargs["engine"] = "native"
+        result = self._lp.run(
+            [OC_INTF_XML_CONFIG_FILE_PATH], LOOKUP_VARIABLES, **kwargs
+        )
+        self.assertEqual(result, expected)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ansible_collections.community.yang.plugins.module_utils.cache import (
+    ArtifactCache,
+    fingerprint,
+)
+
+
+class TestArtifactCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.mkdtemp()
+        self._files = []
+        for name, content in (("a.yang", "module a {}"), ("b.yang", "b")):
+            path = os.path.join(self._tmp_dir, name)
+            with open(path, "w") as f:
+                f.write(content)
+            self._files.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+    def test_fingerprint(self):
+        """Check the fingerprint depends on content and extra values only"""
+
+        key = fingerprint(self._files, "/search", "config")
+        self.assertEqual(
+            key, fingerprint(list(reversed(self._files)), "/search", "config")
+        )
+        self.assertNotEqual(key, fingerprint(self._files, "/search", "data"))
+
+        with open(self._files[0], "a") as f:
+            f.write(" ")
+        self.assertNotEqual(key, fingerprint(self._files, "/search", "config"))
+
+    def test_get_put(self):
+        """Check an artifact stored in the cache is returned on lookup"""
+
+        cache = ArtifactCache(os.path.join(self._tmp_dir, "cache"))
+        key = fingerprint(self._files)
+        self.assertIsNone(cache.get("jsonxsl", key))
+
+        path = cache.put("jsonxsl", key, self._files[0])
+        self.assertEqual(cache.get("jsonxsl", key), path)
+        with open(path) as f:
+            self.assertEqual(f.read(), "module a {}")
+        self.assertEqual(os.listdir(os.path.dirname(path)), [key + ".jsonxsl"])
+
+        path = cache.put_data("jtox", key, '{"modules": {}}')
+        self.assertEqual(cache.get("jtox", key), path)
+        with open(path) as f:
+            self.assertEqual(f.read(), '{"modules": {}}')
+
+    def test_evict_least_recently_used(self):
+        """Check the least recently used entries are evicted first"""
+
+        cache = ArtifactCache(
+            os.path.join(self._tmp_dir, "cache"), max_size=25, max_age=None
+        )
+        first = cache.put("jtox", "first", self._files[0])
+        os.utime(first, (1, 1))
+        second = cache.put("jtox", "second", self._files[0])
+        os.utime(second, (2, 2))
+
+        # a hit refreshes the entry so the second one is now the oldest
+        self.assertEqual(cache.get("jtox", "first"), first)
+        third = cache.put("jtox", "third", self._files[0])
+
+        self.assertIsNone(cache.get("jtox", "second"))
+        self.assertEqual(cache.get("jtox", "first"), first)
+        self.assertEqual(cache.get("jtox", "third"), third)
+
+    def test_evict_expired(self):
+        """Check the entries not used for max_age seconds are evicted"""
+
+        cache = ArtifactCache(os.path.join(self._tmp_dir, "cache"), max_age=60)
+        old = cache.put("jtox", "old", self._files[0])
+        recent = cache.put("jtox", "recent", self._files[0])
+        os.utime(old, (1, 1))
+
+        self.assertEqual(cache.evict(), [old])
+        self.assertIsNone(cache.get("jtox", "old"))
+        self.assertEqual(cache.get("jtox", "recent"), recent)
+
+    def test_best_effort(self):
+        """Check an unusable cache behaves as a cache miss"""
+
+        messages = []
+        blocker = os.path.join(self._tmp_dir, "blocker")
+        with open(blocker, "w") as f:
+            f.write("")
+        cache = ArtifactCache(blocker, debug=messages.append)
+        self.assertIsNone(cache.put_data("jtox", "key", "{}"))
+        self.assertIsNone(cache.put("jtox", "key", self._files[0]))
+        self.assertEqual(len(messages), 2)
+
+        # an entry that can not be read anymore is a miss
+        cache = ArtifactCache(os.path.join(self._tmp_dir, "cache"))
+        path = cache.put_data("jtox", "key", "{}")
+        self.assertEqual(cache.get_data("jtox", "key"), b"{}")
+        os.remove(path)
+        os.mkdir(path)
+        self.assertIsNone(cache.get_data("jtox", "key"))
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ansible_collections.community.yang.plugins.module_utils import common
+
+
+class TestCommon(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.mkdtemp()
+        self._bin_dir = os.path.join(self._tmp_dir, "bin")
+        os.makedirs(os.path.join(self._tmp_dir, "share", "yang"))
+        os.makedirs(self._bin_dir)
+        with open(
+            os.path.join(self._tmp_dir, "share", "yang", "templates.xsl"), "w"
+        ) as f:
+            f.write("")
+        self._path = os.environ["PATH"]
+        os.environ["PATH"] = self._bin_dir
+
+    def tearDown(self):
+        os.environ["PATH"] = self._path
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+    def test_find_share_path(self):
+        """Check the share directory is resolved from the current $PATH"""
+
+        templates = os.path.join("yang", "templates.xsl")
+        self.assertEqual(
+            common.find_share_path(templates),
+            os.path.join(self._tmp_dir, "share"),
+        )
+
+        shutil.rmtree(self._tmp_dir)
+        self.assertIsNone(common.find_share_path(templates))
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ansible_collections.community.yang.plugins.module_utils import compiler
+from ansible_collections.community.yang.tests.unit.utils.index import (
+    use_module_index,
+)
+
+YANG_FILE_SEARCH_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../../../fixtures/files"
+)
+OC_INTF_YANG_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../../fixtures/files/openconfig/interfaces/openconfig-interfaces.yang",
+)
+
+
+class TestCompiler(unittest.TestCase):
+    def setUp(self):
+        compiler.clear_cache()
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir, ignore_errors=True)
+        use_module_index(self, index_dir)
+
+    def test_context_cache(self):
+        """Check the modules are validated once for all the formats"""
+
+        ctx, modules = compiler.load_modules(
+            [OC_INTF_YANG_FILE_PATH], YANG_FILE_SEARCH_PATH
+        )
+        self.assertIs(
+            compiler.load_modules(
+                [OC_INTF_YANG_FILE_PATH], YANG_FILE_SEARCH_PATH
+            )[0],
+            ctx,
+        )
+        children = [c.arg for c in modules[0].i_children]
+
+        jtox = compiler.emit(
+            "jtox", [OC_INTF_YANG_FILE_PATH], YANG_FILE_SEARCH_PATH
+        )
+        compiler.emit(
+            "jsonxsl", [OC_INTF_YANG_FILE_PATH], YANG_FILE_SEARCH_PATH
+        )
+        tree = compiler.emit(
+            "tree",
+            [OC_INTF_YANG_FILE_PATH],
+            YANG_FILE_SEARCH_PATH,
+            tree_depth=2,
+        )
+        self.assertEqual(
+            compiler.load_modules(
+                [OC_INTF_YANG_FILE_PATH], YANG_FILE_SEARCH_PATH
+            ),
+            (ctx, modules),
+        )
+        self.assertEqual([c.arg for c in modules[0].i_children], children)
+        self.assertEqual(
+            compiler.emit(
+                "jtox", [OC_INTF_YANG_FILE_PATH], YANG_FILE_SEARCH_PATH
+            ),
+            jtox,
+        )
+        self.assertIn("+--rw interfaces", tree)
+        self.assertNotIn("+--rw config", tree)
+
+        # a modified file is loaded again
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            yang_file = os.path.join(tmp_dir, "a.yang")
+            with open(yang_file, "w") as f:
+                f.write(
+                    "module a { namespace urn:a; prefix a; leaf x { type string; } }"
+                )
+            first = compiler.load_modules([yang_file], tmp_dir)[0]
+            with open(yang_file, "w") as f:
+                f.write(
+                    "module a { namespace urn:a; prefix a; leaf yy { type string; } }"
+                )
+            second, modules = compiler.load_modules([yang_file], tmp_dir)
+            self.assertIsNot(first, second)
+            self.assertEqual([c.arg for c in modules[0].i_children], ["yy"])
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_context_cache_order(self):
+        """Check the modules follow the order of the yang files of a call"""
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            yang_files = []
+            for name in ("a", "b"):
+                yang_file = os.path.join(tmp_dir, "%s.yang" % name)
+                with open(yang_file, "w") as f:
+                    f.write(
+                        "module %s { namespace urn:%s; prefix %s; "
+                        "leaf x { type string; } }" % (name, name, name)
+                    )
+                yang_files.append(yang_file)
+
+            for files in (yang_files, yang_files[::-1]):
+                modules = compiler.load_modules(files, tmp_dir)[1]
+                self.assertEqual(
+                    [m.arg for m in modules],
+                    [os.path.basename(f)[:-5] for f in files],
+                )
+            tree = compiler.emit("tree", yang_files[::-1], tmp_dir)
+            self.assertTrue(tree.startswith("module: b"))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_emit_is_repeatable(self):
+        """Check the output of a format does not depend on previous runs"""
+
+        first = compiler.emit(
+            "jsonxsl", [OC_INTF_YANG_FILE_PATH], YANG_FILE_SEARCH_PATH
+        )
+        second = compiler.emit(
+            "jsonxsl", [OC_INTF_YANG_FILE_PATH], YANG_FILE_SEARCH_PATH
+        )
+        self.assertEqual(first, second)
+        self.assertEqual(first.count("<include "), 1)
+
+    def test_emit_errors(self):
+        """Check validation errors are reported from the pyang context"""
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            yang_file = os.path.join(tmp_dir, "broken.yang")
+            with open(yang_file, "w") as f:
+                f.write(
+                    "module broken { namespace urn:broken; prefix b; "
+                    "leaf x { type unknown-type; } }"
+                )
+            with self.assertRaises(ValueError) as ctx:
+                compiler.emit("jtox", [yang_file], tmp_dir)
+            self.assertIn("broken.yang:1: error:", str(ctx.exception))
+
+            with self.assertRaises(ValueError):
+                compiler.emit("unknown-format", [yang_file], tmp_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
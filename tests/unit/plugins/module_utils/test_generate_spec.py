@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from ansible_collections.community.yang.plugins.module_utils.spec import (
+    GenerateSpec,
+    generate_specs,
+)
+from ansible_collections.community.yang.tests.unit.utils.index import (
+    use_module_index,
+)
+
+YANG_FILE_SEARCH_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../../../fixtures/files"
+)
+OC_INTF_YANG_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../../fixtures/files/openconfig/interfaces/openconfig-interfaces.yang",
+)
+
+
+class TestGenerateSpec(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        use_module_index(self, os.path.join(self._dir, "index"))
+
+    def tearDown(self):
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+    def _genspec(self, doctype="config", **kwargs):
+        return GenerateSpec(
+            yang_file_path=OC_INTF_YANG_FILE_PATH,
+            search_path=YANG_FILE_SEARCH_PATH,
+            doctype=doctype,
+            tmp_dir_path=os.path.join(self._dir, "tmp"),
+            keep_tmp_files=True,
+            **kwargs
+        )
+
+    def test_generate_schemas(self):
+        """Check the schemas generated at once match the separate ones"""
+
+        for doctype in ("config", "data"):
+            genspec_obj = self._genspec(doctype)
+            expected = {
+                "json_schema": genspec_obj.generate_json_schema(defaults=True),
+                "xml_schema": genspec_obj.generate_xml_schema(
+                    annotations=True
+                ),
+                "tree_schema": genspec_obj.generate_tree_schema(),
+            }
+            schemas = genspec_obj.generate_schemas(
+                json_schema={"defaults": True},
+                xml_schema={"annotations": True},
+            )
+            self.assertEqual(schemas, expected)
+
+        timings = genspec_obj.timings.as_dict()
+        for stage in ("compile", "json_skeleton", "xml_skeleton", "tree"):
+            self.assertIn(stage, timings)
+
+    def test_generate_schemas_write(self):
+        """Check the schemas are stored into the given files"""
+
+        paths = dict(
+            (name, os.path.join(self._dir, "out", name))
+            for name in ("json_schema", "xml_schema", "tree_schema")
+        )
+        schemas = self._genspec().generate_schemas(
+            json_schema={"path": paths["json_schema"]},
+            xml_schema={"path": paths["xml_schema"]},
+            tree_schema={"path": paths["tree_schema"]},
+        )
+        with open(paths["json_schema"]) as fp:
+            self.assertEqual(json.load(fp), schemas["json_schema"])
+        for name in ("xml_schema", "tree_schema"):
+            with open(paths[name]) as fp:
+                self.assertEqual(fp.read(), schemas[name])
+
+    def test_generate_schemas_formats(self):
+        """Check only the requested schemas are generated and stored"""
+
+        paths = dict(
+            (name, os.path.join(self._dir, "out", name))
+            for name in ("json_schema", "xml_schema", "tree_schema")
+        )
+        genspec_obj = self._genspec()
+        schemas = genspec_obj.generate_schemas(
+            json_schema={"path": paths["json_schema"]},
+            xml_schema={"path": paths["xml_schema"]},
+            tree_schema={"path": paths["tree_schema"]},
+            formats=["tree_schema"],
+        )
+        self.assertEqual(list(schemas), ["tree_schema"])
+        self.assertTrue(os.path.exists(paths["tree_schema"]))
+        self.assertFalse(os.path.exists(paths["json_schema"]))
+        self.assertFalse(os.path.exists(paths["xml_schema"]))
+
+        timings = genspec_obj.timings.as_dict()
+        self.assertIn("tree", timings)
+        self.assertNotIn("json_skeleton", timings)
+        self.assertNotIn("xml_skeleton", timings)
+
+        with self.assertRaises(ValueError) as error:
+            genspec_obj.generate_schemas(formats=["tree_schema", "yin"])
+        self.assertIn("invalid schema format yin", str(error.exception))
+
+    def test_generate_from_content(self):
+        """Check the schemas of inline yang content are generated"""
+
+        tmp_dir_path = os.path.join(self._dir, "content")
+        # the directory of another instance sharing tmp_dir_path
+        other_dir_path = os.path.join(tmp_dir_path, "other")
+        os.makedirs(other_dir_path)
+        genspec_obj = GenerateSpec(
+            yang_content=(
+                'module inline { namespace "urn:inline"; prefix i; '
+                "container top { leaf name { type string; } } }"
+            ),
+            tmp_dir_path=tmp_dir_path,
+        )
+        self.assertEqual(
+            genspec_obj.generate_json_schema(), {"inline:top": {"name": ""}},
+        )
+        self.assertIn(
+            "+--rw name?   string", genspec_obj.generate_tree_schema()
+        )
+
+        # only the temporary files of the instance are removed with it
+        del genspec_obj
+        self.assertEqual(os.listdir(tmp_dir_path), ["other"])
+
+        genspec_obj = GenerateSpec(
+            yang_content='module broken { namespace "urn:b"; prefix b; '
+            "leaf x { type unknown; } }",
+            tmp_dir_path=tmp_dir_path,
+        )
+        with self.assertRaises(ValueError) as error:
+            genspec_obj.generate_xml_schema()
+        self.assertIn("Error while generating", str(error.exception))
+
+    def test_cache(self):
+        """Check the schemas are read from the cache until an input changes"""
+
+        cache_dir = os.path.join(self._dir, "cache")
+        genspec_obj = self._genspec(cache_dir=cache_dir)
+        expected = genspec_obj.generate_schemas(json_schema={"defaults": True})
+        self.assertEqual(
+            genspec_obj.cache_hits,
+            {
+                "sample-json-skeleton": False,
+                "sample-xml-skeleton": False,
+                "tree": False,
+            },
+        )
+
+        genspec_obj = self._genspec(cache_dir=cache_dir)
+        schemas = genspec_obj.generate_schemas(json_schema={"defaults": True})
+        self.assertEqual(schemas, expected)
+        self.assertTrue(all(genspec_obj.cache_hits.values()))
+        self.assertNotIn("compile", genspec_obj.timings.as_dict())
+
+        # the options of a format are part of its key
+        genspec_obj = self._genspec(doctype="data", cache_dir=cache_dir)
+        genspec_obj.generate_schemas(json_schema={"defaults": True})
+        self.assertEqual(
+            genspec_obj.cache_hits,
+            {
+                "sample-json-skeleton": False,
+                "sample-xml-skeleton": False,
+                "tree": True,
+            },
+        )
+
+    def test_cache_unusable(self):
+        """Check the schemas are generated when the cache can not be used"""
+
+        expected = self._genspec().generate_tree_schema()
+
+        # the cache directory can not be written
+        blocker = os.path.join(self._dir, "blocker")
+        with open(blocker, "w") as f:
+            f.write("")
+        genspec_obj = self._genspec(cache_dir=blocker)
+        self.assertEqual(genspec_obj.generate_tree_schema(), expected)
+        self.assertEqual(genspec_obj.cache_hits, {"tree": False})
+
+        # the entry can not be read anymore after the lookup
+        cache_dir = os.path.join(self._dir, "cache")
+        self._genspec(cache_dir=cache_dir).generate_tree_schema()
+        tree_dir = os.path.join(cache_dir, "tree")
+        for name in os.listdir(tree_dir):
+            os.remove(os.path.join(tree_dir, name))
+            os.mkdir(os.path.join(tree_dir, name))
+        genspec_obj = self._genspec(cache_dir=cache_dir)
+        self.assertEqual(genspec_obj.generate_tree_schema(), expected)
+        self.assertEqual(genspec_obj.cache_hits, {"tree": False})
+
+    def test_cache_dependency_change(self):
+        """Check a change of an imported module invalidates the schemas"""
+
+        module_dir = os.path.join(self._dir, "modules")
+        os.makedirs(module_dir)
+        top = os.path.join(module_dir, "top.yang")
+        with open(top, "w") as fp:
+            fp.write(
+                'module top { namespace "urn:top"; prefix t; '
+                "import types { prefix ty; } "
+                "container top { leaf name { type ty:name; } } }"
+            )
+
+        def generate(leaf_type):
+            with open(os.path.join(module_dir, "types.yang"), "w") as fp:
+                fp.write(
+                    'module types { namespace "urn:types"; prefix ty; '
+                    "typedef name { type %s; } }" % leaf_type
+                )
+            genspec_obj = GenerateSpec(
+                yang_file_path=top,
+                tmp_dir_path=os.path.join(self._dir, "tmp"),
+                keep_tmp_files=True,
+                cache_dir=os.path.join(self._dir, "cache"),
+            )
+            return genspec_obj.generate_tree_schema(), genspec_obj.cache_hits
+
+        self.assertEqual(generate("string")[1], {"tree": False})
+        self.assertEqual(generate("string")[1], {"tree": True})
+        tree, cache_hits = generate("uint8")
+        self.assertEqual(cache_hits, {"tree": False})
+        self.assertIn("ty:name", tree)
+
+    def test_generate_specs(self):
+        """Check a batch reports the failed modules along with the others"""
+
+        module_dir = os.path.join(self._dir, "modules")
+        os.makedirs(module_dir)
+        broken = os.path.join(module_dir, "broken.yang")
+        with open(broken, "w") as fp:
+            fp.write(
+                'module broken { namespace "urn:b"; prefix b; '
+                "leaf x { type unknown; } }"
+            )
+
+        output_dir = os.path.join(self._dir, "out")
+        results = generate_specs(
+            [OC_INTF_YANG_FILE_PATH, broken],
+            output_dir,
+            search_path="%s:%s" % (YANG_FILE_SEARCH_PATH, module_dir),
+            formats=["json_schema", "tree_schema"],
+            processes=2,
+        )
+
+        self.assertTrue(results["broken"]["failed"])
+        self.assertIn("Error while generating", results["broken"]["msg"])
+
+        result = results["openconfig-interfaces"]
+        self.assertEqual(
+            result,
+            {
+                "json_schema": os.path.join(
+                    output_dir, "openconfig-interfaces.json"
+                ),
+                "tree_schema": os.path.join(
+                    output_dir, "openconfig-interfaces.tree"
+                ),
+                "cache_hit": False,
+            },
+        )
+        genspec_obj = self._genspec()
+        with open(result["json_schema"]) as fp:
+            self.assertEqual(json.load(fp), genspec_obj.generate_json_schema())
+        with open(result["tree_schema"]) as fp:
+            self.assertEqual(fp.read(), genspec_obj.generate_tree_schema())
+        self.assertEqual(
+            sorted(os.listdir(output_dir)),
+            ["openconfig-interfaces.json", "openconfig-interfaces.tree"],
+        )
+
+    def test_keep_tmp_dir(self):
+        """Check the tmp_dir_path given to an instance is never removed"""
+
+        tmp_dir_path = os.path.join(self._dir, "spec")
+        os.makedirs(os.path.join(tmp_dir_path, "otherjob"))
+        genspec_obj = GenerateSpec(
+            yang_file_path=OC_INTF_YANG_FILE_PATH,
+            search_path=YANG_FILE_SEARCH_PATH,
+            tmp_dir_path=tmp_dir_path,
+        )
+        genspec_obj.generate_tree_schema()
+        del genspec_obj
+        self.assertEqual(os.listdir(tmp_dir_path), ["otherjob"])
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from ansible_collections.community.yang.plugins.module_utils.index import (
+    ModuleIndex,
+    parse_header,
+)
+
+MAIN = """
+module main {
+  yang-version 1.1;
+  namespace "urn:main";
+  prefix m;
+  // the body starts after the revisions
+  import dep { prefix d; }
+  import dated { prefix t; revision-date 2020-01-01; }
+  include main-sub;
+  description
+    "container in a " +
+    "description";
+  revision 2019-05-01;
+  revision "2020-02-01" { description "{ not a block"; }
+  container top { leaf x { type d:t; } }
+  import ignored { prefix i; }
+}
+"""
+
+
+class TestModuleIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.mkdtemp()
+        self._search_dir = os.path.join(self._tmp_dir, "search")
+        self._write("main.yang", MAIN)
+        self._write(
+            "main-sub.yang",
+            "submodule main-sub { belongs-to main { prefix m; } }",
+        )
+        self._write(
+            "dep.yang",
+            'module dep { namespace "urn:dep"; prefix d; typedef t '
+            "{ type string; } }",
+        )
+        self._write(
+            "nested/dated@2020-01-01.yang",
+            'module dated { namespace "urn:dated"; prefix t; }',
+        )
+        self._write(
+            "nested/dated@2019-01-01.yang",
+            'module dated { namespace "urn:dated"; prefix t; }',
+        )
+        self._write("unused.yang", 'module unused { namespace "urn:u"; }')
+        self._index = ModuleIndex(os.path.join(self._tmp_dir, "index"))
+
+    def tearDown(self):
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+    def _write(self, name, content):
+        path = os.path.join(self._search_dir, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_parse_header(self):
+        """Check the header is read up to the first body statement"""
+
+        header = parse_header(os.path.join(self._search_dir, "main.yang"))
+        self.assertEqual(header["keyword"], "module")
+        self.assertEqual(header["name"], "main")
+        self.assertEqual(header["namespace"], "urn:main")
+        self.assertEqual(
+            header["imports"], [["dep", None], ["dated", "2020-01-01"]]
+        )
+        self.assertEqual(header["includes"], [["main-sub", None]])
+        self.assertEqual(header["revision"], "2020-02-01")
+
+        path = self._write("broken.yang", 'module broken { description "')
+        self.assertRaises(ValueError, parse_header, path)
+
+    def test_dependencies(self):
+        """Check only the modules the yang files depend on are returned"""
+
+        entries = self._index.dependencies(
+            [os.path.join(self._search_dir, "main.yang")], [self._search_dir]
+        )
+        self.assertEqual(
+            sorted(os.path.basename(e["path"]) for e in entries),
+            [
+                "dated@2020-01-01.yang",
+                "dep.yang",
+                "main-sub.yang",
+                "main.yang",
+            ],
+        )
+
+        # a missing dependency requires the full search path
+        path = self._write(
+            "other/other.yang",
+            'module other { namespace "urn:o"; import missing { prefix x; } }',
+        )
+        self.assertIsNone(self._index.dependencies([path], [self._search_dir]))
+
+    def test_dependency_digest(self):
+        """Check the digest changes with the dependencies of the files only"""
+
+        yang_files = [os.path.join(self._search_dir, "main.yang")]
+        digest = self._index.dependency_digest(yang_files, [self._search_dir])
+        self.assertIsNotNone(digest)
+
+        self._write("unused.yang", 'module unused { namespace "urn:v"; }')
+        self._write("nested/dated@2019-01-01.yang", "module dated {}")
+        self.assertEqual(
+            self._index.dependency_digest(yang_files, [self._search_dir]),
+            digest,
+        )
+
+        # the new import of a dependency edited in place is followed
+        self._write(
+            "dep.yang",
+            'module dep { namespace "urn:dep"; prefix d; import unused '
+            "{ prefix u; } typedef t { type string; } }",
+        )
+        entries = self._index.dependencies(yang_files, [self._search_dir])
+        self.assertIn("unused", [e["name"] for e in entries])
+        self.assertNotEqual(
+            self._index.dependency_digest(yang_files, [self._search_dir]),
+            digest,
+        )
+
+    def test_find_namespace(self):
+        """Check modules are found by namespace, latest revision first"""
+
+        entries = self._index.find_namespace("urn:dated", [self._search_dir])
+        self.assertEqual(
+            [e["revision"] for e in entries], ["2020-01-01", "2019-01-01"]
+        )
+        self.assertEqual(
+            self._index.find_namespace("urn:none", [self._search_dir]), []
+        )
+
+    def test_invalidation(self):
+        """Check the stored index is reused until a directory changes"""
+
+        names = [e["name"] for e in self._index.modules([self._search_dir])]
+        self.assertNotIn("added", names)
+        self.assertEqual(
+            len(os.listdir(os.path.join(self._tmp_dir, "index"))), 1
+        )
+
+        # another process reads the stored index, the files are not read
+        # again as long as their directory is unchanged
+        stat = os.stat(self._search_dir)
+        self._write("dep.yang", 'module dep { namespace "urn:changed"; }')
+        os.utime(self._search_dir, (stat.st_atime, stat.st_mtime))
+        index = ModuleIndex(os.path.join(self._tmp_dir, "index"))
+        self.assertEqual(
+            index.find_namespace("urn:dep", [self._search_dir])[0]["name"],
+            "dep",
+        )
+
+        # a file added to a sub directory updates its modification time
+        self._write("nested/added.yang", 'module added { namespace "a"; }')
+        mtime = time.time() + 10
+        os.utime(os.path.join(self._search_dir, "nested"), (mtime, mtime))
+        entries = index.modules([self._search_dir])
+        self.assertIn("added", [e["name"] for e in entries])
+
+    def test_evict(self):
+        """Check the stored indexes not used for max_age are evicted"""
+
+        index_dir = os.path.join(self._tmp_dir, "index")
+        nested = os.path.join(self._search_dir, "nested")
+        self._index.modules([self._search_dir])
+        self._index.modules([nested], recurse=False)
+        paths = sorted(
+            os.path.join(index_dir, name) for name in os.listdir(index_dir)
+        )
+        self.assertEqual(len(paths), 2)
+        for path in paths:
+            os.utime(path, (1, 1))
+
+        # reading a stored index marks it as used
+        index = ModuleIndex(index_dir, max_age=60)
+        index.modules([self._search_dir])
+        used = [path for path in paths if os.stat(path).st_mtime > 1]
+        self.assertEqual(len(used), 1)
+
+        self.assertEqual(index.evict(), [p for p in paths if p not in used])
+        self.assertEqual(os.listdir(index_dir), [os.path.basename(used[0])])
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import time
+import unittest
+
+from ansible_collections.community.yang.plugins.module_utils.timing import (
+    Timings,
+)
+
+
+class TestTimings(unittest.TestCase):
+    def test_stage(self):
+        """Check the stages are accumulated in the order they first ran"""
+
+        timings = Timings()
+        for stage in ("compile", "parse", "compile"):
+            with timings.stage(stage):
+                pass
+        with self.assertRaises(ValueError):
+            with timings.stage("parse"):
+                raise ValueError("failed")
+
+        result = timings.as_dict()
+        self.assertEqual(list(result), ["compile", "parse"])
+        self.assertEqual(result["compile"]["calls"], 2)
+        self.assertEqual(result["parse"]["calls"], 2)
+        self.assertGreaterEqual(result["compile"]["wall"], 0)
+
+    def test_nested_stage(self):
+        """Check the time of a nested stage is not counted twice"""
+
+        timings = Timings()
+        with timings.stage("tree"):
+            with timings.stage("compile"):
+                time.sleep(0.05)
+        result = timings.as_dict()
+        self.assertGreaterEqual(result["compile"]["wall"], 0.05)
+        self.assertLess(result["tree"]["wall"], 0.05)
+        self.assertEqual(result["tree"]["calls"], 1)
+
+    def test_capture_and_update(self):
+        """Check stages run in a capture are also collected separately"""
+
+        timings = Timings()
+        with timings.stage("resolve"):
+            pass
+        with timings.capture() as captured:
+            with timings.stage("xslt"):
+                pass
+        with timings.stage("cleanup"):
+            pass
+
+        self.assertEqual(list(captured.as_dict()), ["xslt"])
+        self.assertEqual(
+            list(timings.as_dict()), ["resolve", "xslt", "cleanup"]
+        )
+
+        merged = Timings()
+        merged.update(timings.as_dict())
+        merged.update(captured.as_dict())
+        self.assertEqual(merged.as_dict()["xslt"]["calls"], 2)
@@ -0,0 +1,640 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from multiprocessing.pool import ThreadPool
+
+from lxml import etree
+
+from ansible_collections.community.yang.plugins.module_utils.translator import (
+    Translator,
+)
+from ansible_collections.community.yang.tests.unit.utils.index import (
+    use_module_index,
+)
+from ansible_collections.community.yang.tests.unit.utils.synthetic import (
+    SyntheticModel,
+)
+
+YANG_FILE_SEARCH_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../../../fixtures/files"
+)
+OC_INTF_XML_CONFIG_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../../fixtures/config/openconfig/interface_oc_xml_valid.xml",
+)
+OC_INTF_JSON_CONFIG_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../../fixtures/config/openconfig/interface_oc_json_valid.json",
+)
+OC_INTF_YANG_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../../fixtures/files/openconfig/interfaces/openconfig-interfaces.yang",
+)
+IETF_YANG_FILE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../../../fixtures/files/ietf"
+)
+IETF_INTF_YANG_FILE_PATH = os.path.join(
+    IETF_YANG_FILE_DIR, "ietf-interfaces.yang"
+)
+IETF_NACM_YANG_FILE_PATH = os.path.join(
+    IETF_YANG_FILE_DIR, "ietf-netconf-acm.yang"
+)
+IANA_IF_TYPE_YANG_FILE_PATH = os.path.join(
+    IETF_YANG_FILE_DIR, "iana-if-type.yang"
+)
+IETF_JSON_CONFIG_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../../fixtures/config/ietf/multi_ietf_json_valid.json",
+)
+
+
+class TestTranslator(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self._dir, ignore_errors=True)
+        use_module_index(self, os.path.join(self._dir, "index"))
+        self._tl = Translator(
+            OC_INTF_YANG_FILE_PATH, search_path=YANG_FILE_SEARCH_PATH
+        )
+
+    def _mkdtemp(self):
+        return tempfile.mkdtemp(dir=self._dir)
+
+    def test_xml_to_json_reuses_compiled_transform(self):
+        """Check the compiled jsonxsl transform is kept on the translator"""
+
+        first = self._tl.xml_to_json(
+            OC_INTF_XML_CONFIG_FILE_PATH, self._mkdtemp()
+        )
+        transform = self._tl._jsonxsl_transform
+        self.assertIsNotNone(transform)
+
+        second = self._tl.xml_to_json(
+            OC_INTF_XML_CONFIG_FILE_PATH, self._mkdtemp()
+        )
+        self.assertIs(self._tl._jsonxsl_transform, transform)
+        self.assertEqual(first, second)
+        self.assertEqual(
+            second["openconfig-interfaces:interfaces"]["interface"][0]["name"],
+            "GigabitEthernet0/0/0/2",
+        )
+
+    def test_xml_to_json_jsonxsl_cache(self):
+        """Check the jsonxsl stylesheet is loaded from the cache on reuse"""
+
+        cache_dir = self._mkdtemp()
+        tl = Translator(
+            OC_INTF_YANG_FILE_PATH,
+            search_path=YANG_FILE_SEARCH_PATH,
+            cache_dir=cache_dir,
+        )
+        first = tl.xml_to_json(OC_INTF_XML_CONFIG_FILE_PATH, self._mkdtemp())
+        self.assertFalse(tl.cache_hits["jsonxsl"])
+
+        tl = Translator(
+            OC_INTF_YANG_FILE_PATH,
+            search_path=YANG_FILE_SEARCH_PATH,
+            cache_dir=cache_dir,
+        )
+        second = tl.xml_to_json(OC_INTF_XML_CONFIG_FILE_PATH, self._mkdtemp())
+        self.assertTrue(tl.cache_hits["jsonxsl"])
+        self.assertEqual(first, second)
+
+    def test_json_to_xml_jtox_cache(self):
+        """Check the jtox driver file is loaded from the cache on reuse"""
+
+        cache_dir = self._mkdtemp()
+        results = []
+        for expected_hit in (False, True):
+            tl = Translator(
+                OC_INTF_YANG_FILE_PATH,
+                search_path=YANG_FILE_SEARCH_PATH,
+                cache_dir=cache_dir,
+            )
+            results.append(
+                tl.json_to_xml(OC_INTF_JSON_CONFIG_FILE_PATH, self._mkdtemp())
+            )
+            self.assertEqual(tl.cache_hits["jtox"], expected_hit)
+        self.assertEqual(results[0], results[1])
+        self.assertIn(
+            "<oc-if:name>GigabitEthernet0/0/0/2</oc-if:name>", results[1]
+        )
+
+    def test_json_to_xml_jtox_cache_unusable(self):
+        """Check an unusable jtox cache falls back to generating the driver"""
+
+        cache_dir = self._mkdtemp()
+        json_to_xml_dir = self._mkdtemp()
+        blocker = os.path.join(cache_dir, "blocker")
+        with open(blocker, "w") as f:
+            f.write("")
+
+        def translate(cache_path):
+            tl = Translator(
+                OC_INTF_YANG_FILE_PATH,
+                search_path=YANG_FILE_SEARCH_PATH,
+                cache_dir=cache_path,
+            )
+            result = tl.json_to_xml(
+                OC_INTF_JSON_CONFIG_FILE_PATH, json_to_xml_dir
+            )
+            self.assertFalse(tl.cache_hits["jtox"])
+            return result
+
+        # the cache directory can not be written
+        expected = translate(blocker)
+
+        # the entry can not be read anymore after the lookup
+        self.assertEqual(translate(cache_dir), expected)
+        jtox_dir = os.path.join(cache_dir, "jtox")
+        for name in os.listdir(jtox_dir):
+            os.remove(os.path.join(jtox_dir, name))
+            os.mkdir(os.path.join(jtox_dir, name))
+        self.assertEqual(translate(cache_dir), expected)
+
+    def test_cache_dependency_invalidation(self):
+        """Check cached artifacts are rebuilt when a dependency changes"""
+
+        model = SyntheticModel(imports=2)
+        yang_dir = self._mkdtemp()
+        yang_files = model.write(yang_dir)
+        with open(os.path.join(yang_dir, "unrelated.yang"), "w") as fp:
+            fp.write('module unrelated { namespace "urn:u"; prefix u; }')
+        cache_dir = self._mkdtemp()
+        xml_data = model.xml_data(entries=1)
+
+        def translate():
+            tl = Translator(
+                yang_files, search_path=yang_dir, cache_dir=cache_dir
+            )
+            tl.json_to_xml_in_memory(model.json_data(entries=1))
+            tl.xml_to_json(xml_data, self._mkdtemp())
+            return tl.cache_hits
+
+        self.assertEqual(translate(), {"jtox": False, "jsonxsl": False})
+        self.assertEqual(translate(), {"jtox": True, "jsonxsl": True})
+
+        # a module the yang files do not depend on
+        with open(os.path.join(yang_dir, "unrelated.yang"), "a") as fp:
+            fp.write("// changed\n")
+        self.assertEqual(translate(), {"jtox": True, "jsonxsl": True})
+
+        # an imported module edited in place
+        with open(os.path.join(yang_dir, "synth-types-1.yang"), "a") as fp:
+            fp.write("// changed\n")
+        self.assertEqual(translate(), {"jtox": False, "jsonxsl": False})
+        self.assertEqual(translate(), {"jtox": True, "jsonxsl": True})
+
+    def test_cache_unresolved_dependencies(self):
+        """Check nothing is cached when the dependencies are not indexed"""
+
+        yang_dir = self._mkdtemp()
+        cache_dir = os.path.join(yang_dir, "cache")
+        # the index does not read the headers of yin modules
+        with open(os.path.join(yang_dir, "dep.yin"), "w") as fp:
+            fp.write(
+                '<module name="dep" xmlns="urn:ietf:params:xml:ns:yang:yin:1"'
+                ' xmlns:d="urn:dep"><namespace uri="urn:dep"/>'
+                '<prefix value="d"/><typedef name="t"><type name="string"/>'
+                "</typedef></module>"
+            )
+        yang_file = os.path.join(yang_dir, "main.yang")
+        with open(yang_file, "w") as fp:
+            fp.write(
+                'module main { namespace "urn:main"; prefix m; import dep '
+                "{ prefix d; } container top { leaf x { type d:t; } } }"
+            )
+
+        for dummy in range(2):
+            tl = Translator(
+                [yang_file], search_path=yang_dir, cache_dir=cache_dir
+            )
+            root = tl.json_to_xml_in_memory({"main:top": {"x": "a"}})
+            self.assertEqual(root.findtext("{urn:main}top/{urn:main}x"), "a")
+            self.assertEqual(tl.cache_hits, {"jtox": False})
+        self.assertFalse(os.path.exists(cache_dir))
+
+    def test_json_to_xml_in_memory(self):
+        """Check the in-memory translation matches the file based one"""
+
+        with open(OC_INTF_JSON_CONFIG_FILE_PATH) as fp:
+            json_data = json.load(fp)
+
+        expected = self._tl.json_to_xml(json_data, self._mkdtemp())
+        self.assertEqual(
+            self._tl.json_to_xml_in_memory(json_data, output="bytes"),
+            expected.encode("utf-8"),
+        )
+
+        root = self._tl.json_to_xml_in_memory(json.dumps(json_data))
+        self.assertEqual(
+            root.tag, "{urn:ietf:params:xml:ns:netconf:base:1.0}config"
+        )
+
+        with self.assertRaises(ValueError) as ctx:
+            self._tl.json_to_xml_in_memory({"invalid-node": "value"})
+        self.assertIn("invalid node", str(ctx.exception))
+
+    def test_xml_to_json_input_types(self):
+        """Check str, bytes, file objects and parsed trees are accepted"""
+
+        expected = self._tl.xml_to_json(
+            OC_INTF_XML_CONFIG_FILE_PATH, self._mkdtemp()
+        )
+        with open(OC_INTF_XML_CONFIG_FILE_PATH, "rb") as fp:
+            b_xml_data = fp.read()
+
+        inputs = [
+            b_xml_data,
+            b_xml_data.decode("utf-8"),
+            io.BytesIO(b_xml_data),
+            etree.fromstring(b_xml_data),
+            etree.parse(OC_INTF_XML_CONFIG_FILE_PATH),
+        ]
+        for xml_data in inputs:
+            self.assertEqual(
+                self._tl.xml_to_json(xml_data, self._mkdtemp()), expected
+            )
+
+        with self.assertRaises(ValueError) as ctx:
+            self._tl.xml_to_json(b"<data><unclosed></data>", self._mkdtemp())
+        self.assertIn("Failed to load xml data", str(ctx.exception))
+
+    def test_xml_to_json_many(self):
+        """Check a batch of xml documents is translated in order"""
+
+        with open(OC_INTF_XML_CONFIG_FILE_PATH, "rb") as fp:
+            b_xml_data = fp.read()
+        other = b_xml_data.replace(b"GigabitEthernet0/0/0/2", b"Loopback0")
+
+        results = self._tl.xml_to_json_many(
+            [b_xml_data, other, OC_INTF_XML_CONFIG_FILE_PATH], self._mkdtemp(),
+        )
+        names = [
+            result["openconfig-interfaces:interfaces"]["interface"][0]["name"]
+            for result in results
+        ]
+        self.assertEqual(
+            names,
+            ["GigabitEthernet0/0/0/2", "Loopback0", "GigabitEthernet0/0/0/2"],
+        )
+
+    def test_json_to_xml_many(self):
+        """Check a batch of json documents is translated in order"""
+
+        with open(OC_INTF_JSON_CONFIG_FILE_PATH) as fp:
+            json_data = json.load(fp)
+        expected = self._tl.json_to_xml(json_data, self._mkdtemp())
+
+        results = self._tl.json_to_xml_many(
+            [OC_INTF_JSON_CONFIG_FILE_PATH, json_data, {}]
+        )
+        self.assertEqual(results[:2], [expected, expected])
+        self.assertEqual(len(etree.fromstring(results[2])), 0)
+
+    def test_xml_to_json_stream(self):
+        """Check the streamed json matches the pyang based translation"""
+
+        expected = self._tl.xml_to_json(
+            OC_INTF_XML_CONFIG_FILE_PATH, self._mkdtemp()
+        )
+        with open(OC_INTF_XML_CONFIG_FILE_PATH, "rb") as fp:
+            b_xml_data = fp.read()
+
+        for xml_data in (
+            OC_INTF_XML_CONFIG_FILE_PATH,
+            b_xml_data,
+            etree.fromstring(b_xml_data),
+        ):
+            result = "".join(self._tl.xml_to_json_stream(xml_data))
+            self.assertEqual(json.loads(result), expected)
+
+        json_file_path = os.path.join(self._mkdtemp(), "out.json")
+        self.assertEqual(
+            self._tl.xml_to_json_file(b_xml_data, json_file_path),
+            json_file_path,
+        )
+        with open(json_file_path) as fp:
+            self.assertEqual(json.load(fp), expected)
+
+    def test_xml_to_json_stream_ietf(self):
+        """Check identityref, leaf-list and module qualified names"""
+
+        tl = Translator(
+            [
+                IETF_INTF_YANG_FILE_PATH,
+                IETF_NACM_YANG_FILE_PATH,
+                IANA_IF_TYPE_YANG_FILE_PATH,
+            ],
+            search_path=IETF_YANG_FILE_DIR,
+            doctype="data",
+        )
+        with open(IETF_JSON_CONFIG_FILE_PATH) as fp:
+            json_data = json.load(fp)
+        xml_data = tl.json_to_xml_in_memory(json_data)
+
+        result = "".join(tl.xml_to_json_stream(xml_data))
+        self.assertEqual(json.loads(result), json_data)
+        self.assertEqual(
+            json.loads(result), tl.xml_to_json(xml_data, self._mkdtemp()),
+        )
+
+    def test_xml_to_json_stream_invalid(self):
+        """Check unknown elements and scattered list entries are reported"""
+
+        xml_data = (
+            b'<data xmlns="urn:ietf:params:xml:ns:netconf:base:1.0">'
+            b'<interfaces xmlns="http://openconfig.net/yang/interfaces">'
+            b"<interface><name>a</name></interface><unknown/>"
+            b"</interfaces></data>"
+        )
+        with self.assertRaises(ValueError) as ctx:
+            "".join(self._tl.xml_to_json_stream(xml_data))
+        self.assertIn("bad element: unknown", str(ctx.exception))
+
+        tl = Translator(
+            IETF_NACM_YANG_FILE_PATH, search_path=IETF_YANG_FILE_DIR,
+        )
+        xml_data = (
+            b'<data xmlns="urn:ietf:params:xml:ns:netconf:base:1.0">'
+            b'<nacm xmlns="urn:ietf:params:xml:ns:yang:ietf-netconf-acm">'
+            b"<rule-list><name>a</name></rule-list>"
+            b"<enable-nacm>true</enable-nacm>"
+            b"<rule-list><name>b</name></rule-list>"
+            b"</nacm></data>"
+        )
+        with self.assertRaises(ValueError) as ctx:
+            "".join(tl.xml_to_json_stream(xml_data))
+        self.assertIn(
+            "entries of ietf-netconf-acm:rule-list are not siblings",
+            str(ctx.exception),
+        )
+
+    def test_xml_to_json_stream_reply(self):
+        """Check a reply is streamed as the native engine encodes it"""
+
+        tl = Translator(
+            OC_INTF_YANG_FILE_PATH,
+            search_path=YANG_FILE_SEARCH_PATH,
+            engine="native",
+        )
+        with open(OC_INTF_XML_CONFIG_FILE_PATH, "rb") as fp:
+            b_data = etree.tostring(etree.fromstring(fp.read()))
+        for xml_data, expected in (
+            (b"<rpc-reply %s><ok/></rpc-reply>", {}),
+            (
+                b"<rpc-reply %s><ok><data/></ok>" + b_data + b"</rpc-reply>",
+                tl.xml_to_json(b_data, self._mkdtemp()),
+            ),
+        ):
+            xml_data = xml_data.replace(
+                b"%s", b'xmlns="urn:ietf:params:xml:ns:netconf:base:1.0"'
+            )
+            self.assertEqual(
+                tl.xml_to_json(xml_data, self._mkdtemp()), expected
+            )
+            for data in (xml_data, etree.fromstring(xml_data)):
+                result = "".join(tl.xml_to_json_stream(data))
+                self.assertEqual(json.loads(result), expected)
+
+    def test_xml_to_json_native_engine(self):
+        """Check the native engine matches the pyang based translation"""
+
+        tl = Translator(
+            [
+                IETF_INTF_YANG_FILE_PATH,
+                IETF_NACM_YANG_FILE_PATH,
+                IANA_IF_TYPE_YANG_FILE_PATH,
+            ],
+            search_path=IETF_YANG_FILE_DIR,
+            doctype="data",
+            engine="native",
+        )
+        with open(IETF_JSON_CONFIG_FILE_PATH) as fp:
+            json_data = json.load(fp)
+        xml_data = tl.json_to_xml_in_memory(json_data)
+        self.assertEqual(tl.xml_to_json(xml_data, self._mkdtemp()), json_data)
+
+        native = Translator(
+            OC_INTF_YANG_FILE_PATH,
+            search_path=YANG_FILE_SEARCH_PATH,
+            engine="native",
+        )
+        self.assertEqual(
+            native.xml_to_json(OC_INTF_XML_CONFIG_FILE_PATH, self._mkdtemp()),
+            self._tl.xml_to_json(
+                OC_INTF_XML_CONFIG_FILE_PATH, self._mkdtemp()
+            ),
+        )
+
+        # list entries are grouped even if they are not siblings
+        tl = Translator(
+            IETF_NACM_YANG_FILE_PATH,
+            search_path=IETF_YANG_FILE_DIR,
+            engine="native",
+        )
+        xml_data = (
+            b'<data xmlns="urn:ietf:params:xml:ns:netconf:base:1.0">'
+            b'<nacm xmlns="urn:ietf:params:xml:ns:yang:ietf-netconf-acm">'
+            b"<rule-list><name>a</name></rule-list>"
+            b"<enable-nacm>true</enable-nacm>"
+            b"<rule-list><name>b</name></rule-list>"
+            b"</nacm></data>"
+        )
+        self.assertEqual(
+            tl.xml_to_json(xml_data, self._mkdtemp()),
+            {
+                "ietf-netconf-acm:nacm": {
+                    "rule-list": [{"name": "a"}, {"name": "b"}],
+                    "enable-nacm": True,
+                }
+            },
+        )
+
+        # the engines report translation errors the same way
+        xml_data = (
+            b'<data xmlns="urn:ietf:params:xml:ns:netconf:base:1.0">'
+            b'<interfaces xmlns="http://openconfig.net/yang/interfaces">'
+            b"<unknown/></interfaces></data>"
+        )
+        for engine in ("pyang", "native"):
+            tl = Translator(
+                OC_INTF_YANG_FILE_PATH,
+                search_path=YANG_FILE_SEARCH_PATH,
+                engine=engine,
+            )
+            with self.assertRaises(ValueError) as ctx:
+                tl.xml_to_json(xml_data, self._mkdtemp())
+            self.assertTrue(
+                str(ctx.exception).startswith(
+                    "Error while translating to json: "
+                )
+            )
+
+        with self.assertRaises(ValueError):
+            Translator(OC_INTF_YANG_FILE_PATH, engine="invalid")
+
+    def test_json_to_xml_native_engine(self):
+        """Check the native encoder builds the same xml as json2xml"""
+
+        native = Translator(
+            OC_INTF_YANG_FILE_PATH,
+            search_path=YANG_FILE_SEARCH_PATH,
+            engine="native",
+        )
+        with open(OC_INTF_JSON_CONFIG_FILE_PATH) as fp:
+            json_data = json.load(fp)
+        # keys come first, whatever their position in the JSON object
+        interface = json_data["openconfig-interfaces:interfaces"]["interface"]
+        interface[0] = dict(reversed(list(interface[0].items())))
+        json_data["openconfig-interfaces:interfaces"]["@"] = {
+            "nc-op:operation": "replace"
+        }
+
+        expected = self._tl.json_to_xml_in_memory(json_data)
+        root = native.json_to_xml_in_memory(json_data)
+        self.assertEqual(
+            etree.tostring(root, method="c14n"),
+            etree.tostring(expected, method="c14n"),
+        )
+        self.assertEqual(
+            native.json_to_xml(json_data, self._mkdtemp()),
+            native.json_to_xml_many([json_data])[0],
+        )
+
+        json_data["openconfig-interfaces:interfaces"]["interface"] = [
+            {"config": {"name": "GigabitEthernet0/0/0/2"}}
+        ]
+        with self.assertRaises(ValueError) as ctx:
+            native.json_to_xml_in_memory(json_data)
+        self.assertIn(
+            "missing key 'openconfig-interfaces:name'", str(ctx.exception)
+        )
+
+    def test_concurrent_translations(self):
+        """Check a translator can be shared by several threads"""
+
+        argv = list(sys.argv)
+        environ = dict(os.environ)
+        with open(OC_INTF_JSON_CONFIG_FILE_PATH) as fp:
+            json_data = json.load(fp)
+
+        def translate(index):
+            xml_data = self._tl.json_to_xml_in_memory(json_data, "bytes")
+            return xml_data, self._tl.xml_to_json(xml_data, self._mkdtemp())
+
+        pool = ThreadPool(4)
+        try:
+            results = pool.map(translate, range(8))
+        finally:
+            pool.close()
+            pool.join()
+
+        for xml_data, result in results:
+            self.assertEqual(xml_data, results[0][0])
+            self.assertEqual(result, json_data)
+        self.assertEqual(sys.argv, argv)
+        self.assertEqual(dict(os.environ), environ)
+
+    def test_timings(self):
+        """Check the time spent in each stage is recorded"""
+
+        with open(OC_INTF_JSON_CONFIG_FILE_PATH) as fp:
+            json_data = json.load(fp)
+
+        self._tl.json_to_xml(json_data, self._mkdtemp())
+        self._tl.xml_to_json(OC_INTF_XML_CONFIG_FILE_PATH, self._mkdtemp())
+        timings = self._tl.timings.as_dict()
+        for stage in (
+            "resolve",
+            "compile",
+            "jtox",
+            "json2xml",
+            "serialize",
+            "parse",
+            "jsonxsl",
+            "xslt",
+            "cleanup",
+        ):
+            self.assertIn(stage, timings)
+            self.assertGreaterEqual(timings[stage]["wall"], 0)
+            self.assertGreaterEqual(timings[stage]["cpu"], 0)
+        self.assertEqual(timings["xslt"]["calls"], 1)
+        self.assertEqual(timings["json2xml"]["calls"], 1)
+
+    def test_synthetic_model(self):
+        """Check both engines translate a generated model back and forth"""
+
+        model = SyntheticModel(
+            depth=2, breadth=2, lists=2, groupings=2, augments=2, imports=2
+        )
+        yang_dir = self._mkdtemp()
+        yang_files = model.write(yang_dir)
+        json_data = model.json_data(entries=3)
+        xml_data = model.xml_data(entries=3)
+
+        for engine in ("pyang", "native"):
+            tl = Translator(yang_files, search_path=yang_dir, engine=engine)
+            self.assertEqual(
+                tl.xml_to_json(xml_data, self._mkdtemp()), json_data
+            )
+            self.assertEqual(
+                tl.xml_to_json(
+                    tl.json_to_xml_in_memory(json_data), self._mkdtemp()
+                ),
+                json_data,
+            )
+
+    def test_select_modules_by_namespace(self):
+        """Check the yang files are selected from the xml namespaces"""
+
+        tl = Translator(None, search_path=YANG_FILE_SEARCH_PATH)
+        self.assertEqual(
+            tl.xml_to_json(OC_INTF_XML_CONFIG_FILE_PATH, self._mkdtemp()),
+            self._tl.xml_to_json(
+                OC_INTF_XML_CONFIG_FILE_PATH, self._mkdtemp()
+            ),
+        )
+        self.assertEqual(
+            list(tl._selected), [(os.path.realpath(OC_INTF_YANG_FILE_PATH),)],
+        )
+        self.assertRaises(ValueError, tl.json_to_xml_in_memory, {})
+
+        model = SyntheticModel(augments=2, imports=2)
+        yang_dir = self._mkdtemp()
+        model.write(yang_dir)
+        xml_data = model.xml_data(entries=2)
+        for engine in ("pyang", "native"):
+            tl = Translator(None, search_path=yang_dir, engine=engine)
+            self.assertEqual(
+                tl.xml_to_json(xml_data, self._mkdtemp()),
+                model.json_data(entries=2),
+            )
+            # the modules imported for their typedefs are not selected
+            self.assertEqual(
+                [os.path.basename(f) for f in list(tl._selected)[0]],
+                ["synth-aug-0.yang", "synth-aug-1.yang", "synth.yang"],
+            )
+        self.assertEqual(
+            json.loads("".join(tl.xml_to_json_stream(xml_data))),
+            model.json_data(entries=2),
+        )
+
+        xml_data = xml_data.replace(b"urn:synthetic:synth-aug-1", b"urn:none")
+        with self.assertRaises(ValueError) as error:
+            tl.xml_to_json(xml_data, self._mkdtemp())
+        self.assertIn("namespace urn:none", str(error.exception))
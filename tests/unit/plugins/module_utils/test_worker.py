@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from ansible_collections.community.yang.plugins.module_utils import worker
+from ansible_collections.community.yang.plugins.module_utils.translator import (
+    Translator,
+)
+from ansible_collections.community.yang.tests.unit.utils.index import (
+    use_module_index,
+)
+
+YANG_FILE_SEARCH_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../../../fixtures/files"
+)
+OC_INTF_XML_CONFIG_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../../fixtures/config/openconfig/interface_oc_xml_valid.xml",
+)
+OC_INTF_JSON_CONFIG_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../../fixtures/config/openconfig/interface_oc_json_valid.json",
+)
+OC_INTF_YANG_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../../fixtures/files/openconfig/interfaces/openconfig-interfaces.yang",
+)
+
+
+class TestWorker(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._socket_path = os.path.join(self._dir, "worker.sock")
+        use_module_index(self, os.path.join(self._dir, "index"))
+        # the worker process stores its module index under the home directory
+        self.addCleanup(os.environ.__setitem__, "HOME", os.environ["HOME"])
+        os.environ["HOME"] = self._dir
+
+    def tearDown(self):
+        worker.stop(self._socket_path)
+        shutil.rmtree(self._dir)
+
+    def test_worker_translator(self):
+        """Check the worker translations match the in-process ones"""
+
+        tl = Translator(
+            OC_INTF_YANG_FILE_PATH, search_path=YANG_FILE_SEARCH_PATH
+        )
+        wt = worker.WorkerTranslator(
+            OC_INTF_YANG_FILE_PATH,
+            search_path=YANG_FILE_SEARCH_PATH,
+            socket_path=self._socket_path,
+        )
+        with open(OC_INTF_JSON_CONFIG_FILE_PATH) as fp:
+            json_data = json.load(fp)
+
+        for dummy in range(2):
+            self.assertEqual(
+                wt.xml_to_json(OC_INTF_XML_CONFIG_FILE_PATH, self._dir),
+                tl.xml_to_json(OC_INTF_XML_CONFIG_FILE_PATH, self._dir),
+            )
+            self.assertEqual(
+                wt.json_to_xml_in_memory(json_data, output="bytes"),
+                tl.json_to_xml_in_memory(json_data, output="bytes"),
+            )
+        self.assertEqual(wt.timings.as_dict()["xslt"]["calls"], 2)
+        self.assertEqual(wt.cache_hits, {"jsonxsl": False, "jtox": False})
+
+    def test_worker_errors(self):
+        """Check translation errors are raised in the client"""
+
+        wt = worker.WorkerTranslator(
+            OC_INTF_YANG_FILE_PATH,
+            search_path=YANG_FILE_SEARCH_PATH,
+            socket_path=self._socket_path,
+        )
+        with self.assertRaises(ValueError):
+            wt.json_to_xml_in_memory({"invalid-module:interfaces": {}})
+
+    def test_worker_generate_spec(self):
+        """Check specs are generated by the worker"""
+
+        spec = worker.WorkerGenerateSpec(
+            socket_path=self._socket_path,
+            yang_file_path=OC_INTF_YANG_FILE_PATH,
+            search_path=YANG_FILE_SEARCH_PATH,
+            tmp_dir_path=os.path.join(self._dir, "spec"),
+        )
+        tree = spec.generate_tree_schema()
+        self.assertIn("module: openconfig-interfaces", tree)
+
+        schemas = spec.generate_schemas(
+            tree_schema={"path": os.path.join(self._dir, "out", "tree.txt")},
+            formats="tree_schema",
+        )
+        self.assertEqual(schemas, {"tree_schema": tree})
+        with open(os.path.join(self._dir, "out", "tree.txt")) as fp:
+            self.assertEqual(fp.read(), tree)
+
+
+class TestTranslationService(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        use_module_index(self, os.path.join(self._dir, "index"))
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def test_idle(self):
+        """Check the worker is not idle while a request is running"""
+
+        service = worker.TranslationService()
+        with service._request():
+            service.last_request = 0
+            self.assertFalse(service._idle(1))
+        self.assertFalse(service._idle(60))
+        self.assertTrue(service._idle(0))
+
+        # the requests received once idle are refused
+        with self.assertRaises(ValueError):
+            service.ping()
+
+    def test_translate_cache_hits(self):
+        """Check the cache hits of the shared translator are returned"""
+
+        translator_args = (
+            [OC_INTF_YANG_FILE_PATH],
+            YANG_FILE_SEARCH_PATH,
+            "config",
+            "pyang",
+            {"cache_dir": os.path.join(self._dir, "cache")},
+        )
+        with open(OC_INTF_JSON_CONFIG_FILE_PATH) as fp:
+            json_data = fp.read()
+
+        for expected_hit in (False, True):
+            service = worker.TranslationService()
+            for dummy in range(2):
+                result, timings, cache_hits = service.translate(
+                    "json_to_xml_many", translator_args, ([json_data],)
+                )
+                self.assertEqual(cache_hits, {"jtox": expected_hit})
+
+    def test_translator_dependency_change(self):
+        """Check a change of an imported module gives a new translator"""
+
+        top = os.path.join(self._dir, "top.yang")
+        with open(top, "w") as fp:
+            fp.write(
+                'module top { namespace "urn:top"; prefix t; '
+                "import types { prefix ty; } "
+                "container top { leaf name { type ty:name; } } }"
+            )
+
+        def translator(leaf_type):
+            with open(os.path.join(self._dir, "types.yang"), "w") as fp:
+                fp.write(
+                    'module types { namespace "urn:types"; prefix ty; '
+                    "typedef name { type %s; } }" % leaf_type
+                )
+            return service._translator([top], self._dir, "config", "pyang", {})
+
+        service = worker.TranslationService()
+        first = translator("string")
+        self.assertIs(translator("string"), first)
+        self.assertIsNot(translator("uint8"), first)
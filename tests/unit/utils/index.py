@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Keep the module index used by the compiler and the translator out of the
+home directory while the unit tests run.
+"""
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.community.yang.plugins.module_utils import (
+    compiler,
+    translator,
+)
+from ansible_collections.community.yang.plugins.module_utils.index import (
+    ModuleIndex,
+)
+
+
+def use_module_index(test_case, index_dir):
+    """
+    Store the module index in index_dir for the duration of a test, the
+    global index is restored when the test is cleaned up
+    :param test_case: The unittest.TestCase instance
+    :param index_dir: Directory the index is stored in
+    :return: The ModuleIndex used by the test
+    """
+    index = ModuleIndex(index_dir)
+    for module in (compiler, translator):
+        test_case.addCleanup(
+            setattr, module, "MODULE_INDEX", module.MODULE_INDEX
+        )
+        module.MODULE_INDEX = index
+    return index
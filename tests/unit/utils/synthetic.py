@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Generator of synthetic yang models and matching instance documents, used to
+measure how the translations and the spec generation scale with the size of
+the model and the size of the data independently.
+"""
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import os
+
+from lxml import etree
+
+NETCONF_BASE_NS = "urn:ietf:params:xml:ns:netconf:base:1.0"
+MODULE_NAME = "synth"
+ENUM_VALUES = ("red", "green", "blue")
+# leaf types used in turn, typedef is the one of an imported module
+LEAF_TYPES = ("string", "uint32", "boolean", "enumeration", "typedef")
+
+
+class _Node(object):
+    def __init__(self, kind, name, module, children=None, leaf_type=None):
+        self.kind = kind
+        self.name = name
+        self.module = module
+        self.children = children or []
+        self.leaf_type = leaf_type
+
+
+class SyntheticModel(object):
+    """
+    A generated yang model made of a main module with a root container
+    holding the lists, the entries of which are nested containers, modules
+    imported for their typedefs and modules augmenting the first list.
+
+    :param depth: Number of nested container levels in a list entry
+    :param breadth: Number of child containers of each container
+    :param leaves: Number of leaves of each container
+    :param lists: Number of lists of the root container
+    :param groupings: Number of groupings of the main module, each one is
+                      used in every list entry
+    :param augments: Number of modules augmenting the first list
+    :param imports: Number of modules imported by the main module for their
+                    typedefs
+    """
+
+    def __init__(
+        self,
+        depth=2,
+        breadth=2,
+        leaves=4,
+        lists=1,
+        groupings=1,
+        augments=1,
+        imports=1,
+    ):
+        if lists < 1:
+            raise ValueError("lists should be at least 1")
+        self.depth = depth
+        self.breadth = breadth
+        self.leaves = leaves
+        self.lists = lists
+        self.groupings = groupings
+        self.augments = augments
+        self.imports = imports
+        self._leaf_index = 0
+        self._groupings = [
+            self._leaves(MODULE_NAME, "g%d-" % index)
+            for index in range(groupings)
+        ]
+        self._lists = [
+            self._list_entry("list%d" % index) for index in range(lists)
+        ]
+        self._augments = [
+            _Node(
+                "container",
+                "ext%d" % index,
+                "%s-aug-%d" % (MODULE_NAME, index),
+                self._leaves("%s-aug-%d" % (MODULE_NAME, index), "x-"),
+            )
+            for index in range(augments)
+        ]
+
+    def _leaves(self, module, prefix=""):
+        leaves = []
+        for index in range(self.leaves):
+            leaf_type = LEAF_TYPES[self._leaf_index % len(LEAF_TYPES)]
+            if leaf_type == "typedef" and not self.imports:
+                leaf_type = "string"
+            self._leaf_index += 1
+            leaves.append(
+                _Node(
+                    "leaf",
+                    "%sleaf%d" % (prefix, index),
+                    module,
+                    leaf_type=leaf_type,
+                )
+            )
+        return leaves
+
+    def _container(self, name, level):
+        children = self._leaves(MODULE_NAME)
+        if level < self.depth:
+            for index in range(self.breadth):
+                children.append(
+                    self._container("%s-c%d" % (name, index), level + 1)
+                )
+        return _Node("container", name, MODULE_NAME, children)
+
+    def _list_entry(self, name):
+        children = [_Node("leaf", "name", MODULE_NAME, leaf_type="string")]
+        children.extend(self._leaves(MODULE_NAME))
+        if self.depth:
+            for index in range(self.breadth):
+                children.append(self._container("c%d" % index, 1))
+        return _Node("list", name, MODULE_NAME, children)
+
+    @property
+    def node_count(self):
+        """
+        Number of schema nodes of an entry of each list, including the
+        nodes of the groupings and of the augments
+        """
+
+        def count(node):
+            return 1 + sum(count(child) for child in node.children)
+
+        total = 0
+        for entry in self._lists:
+            total += count(entry)
+            total += sum(len(grouping) for grouping in self._groupings)
+        for augment in self._augments:
+            total += count(augment)
+        return total
+
+    def write(self, directory):
+        """
+        Write the yang modules of the model
+        :param directory: Directory the yang files are written to, it is
+                          also the search path of the imported modules
+        :return: List of the paths of the main module and of the augmenting
+                 modules, the imported modules are found in the directory.
+        """
+        files = {MODULE_NAME: self._main_module()}
+        for index in range(self.augments):
+            name = "%s-aug-%d" % (MODULE_NAME, index)
+            files[name] = self._augment_module(index)
+        for index in range(self.imports):
+            name = "%s-types-%d" % (MODULE_NAME, index)
+            files[name] = self._types_module(index)
+
+        paths = []
+        for name, text in files.items():
+            path = os.path.join(directory, "%s.yang" % name)
+            with open(path, "w") as fp:
+                fp.write(text)
+            if "-types-" not in name:
+                paths.append(path)
+        return sorted(paths)
+
+    def _header(self, name, prefix):
+        return [
+            "module %s {" % name,
+            "  yang-version 1.1;",
+            '  namespace "%s";' % _namespace(name),
+            "  prefix %s;" % prefix,
+        ]
+
+    def _main_module(self):
+        lines = self._header(MODULE_NAME, "sy")
+        for index in range(self.imports):
+            lines.append(
+                "  import %s-types-%d { prefix st%d; }"
+                % (MODULE_NAME, index, index)
+            )
+        for index, grouping in enumerate(self._groupings):
+            lines.append("  grouping g%d {" % index)
+            for leaf in grouping:
+                lines.extend(self._statement(leaf, 2))
+            lines.append("  }")
+        lines.append("  container root {")
+        for entry in self._lists:
+            lines.extend(self._statement(entry, 2))
+        lines.append("  }")
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+    def _augment_module(self, index):
+        name = "%s-aug-%d" % (MODULE_NAME, index)
+        lines = self._header(name, "sa%d" % index)
+        lines.append("  import %s { prefix sy; }" % MODULE_NAME)
+        for imported in range(self.imports):
+            lines.append(
+                "  import %s-types-%d { prefix st%d; }"
+                % (MODULE_NAME, imported, imported)
+            )
+        lines.append('  augment "/sy:root/sy:%s" {' % self._lists[0].name)
+        lines.extend(self._statement(self._augments[index], 2))
+        lines.append("  }")
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+    def _types_module(self, index):
+        lines = self._header("%s-types-%d" % (MODULE_NAME, index), "st")
+        lines.extend(
+            [
+                "  typedef name-type {",
+                "    type string {",
+                '      length "1..64";',
+                "    }",
+                "  }",
+                "}",
+            ]
+        )
+        return "\n".join(lines) + "\n"
+
+    def _statement(self, node, indent):
+        pad = "  " * indent
+        if node.kind == "leaf":
+            return (
+                [pad + "leaf %s {" % node.name]
+                + [pad + "  " + line for line in self._type(node)]
+                + [pad + "}"]
+            )
+
+        lines = [pad + "%s %s {" % (node.kind, node.name)]
+        if node.kind == "list":
+            lines.append(pad + '  key "name";')
+        for child in node.children:
+            lines.extend(self._statement(child, indent + 1))
+        if node.kind == "list":
+            for index in range(self.groupings):
+                lines.append(pad + "  uses g%d;" % index)
+        lines.append(pad + "}")
+        return lines
+
+    def _type(self, leaf):
+        if leaf.leaf_type == "enumeration":
+            return (
+                ["type enumeration {"]
+                + ["  enum %s;" % value for value in ENUM_VALUES]
+                + ["}"]
+            )
+        if leaf.leaf_type == "typedef":
+            # the imported modules are used in turn
+            return [
+                "type st%d:name-type;"
+                % (int(leaf.name.rsplit("leaf", 1)[1]) % self.imports)
+            ]
+        return ["type %s;" % leaf.leaf_type]
+
+    def _value(self, leaf, index):
+        if leaf.name == "name":
+            return "entry-%d" % index
+        if leaf.leaf_type == "uint32":
+            return index
+        if leaf.leaf_type == "boolean":
+            return index % 2 == 0
+        if leaf.leaf_type == "enumeration":
+            return ENUM_VALUES[index % len(ENUM_VALUES)]
+        return "%s-%d" % (leaf.name, index)
+
+    def _entry_json(self, entry, index, augmented):
+        data = self._object_json(entry.children, index, MODULE_NAME)
+        for grouping in self._groupings:
+            data.update(self._object_json(grouping, index, MODULE_NAME))
+        if augmented:
+            for augment in self._augments:
+                data.update(self._object_json([augment], index, MODULE_NAME))
+        return data
+
+    def _object_json(self, nodes, index, parent_module):
+        data = {}
+        for node in nodes:
+            name = node.name
+            if node.module != parent_module:
+                name = "%s:%s" % (node.module, node.name)
+            if node.kind == "leaf":
+                data[name] = self._value(node, index)
+            else:
+                data[name] = self._object_json(
+                    node.children, index, node.module
+                )
+        return data
+
+    def json_data(self, entries=None, size=None):
+        """
+        Generate a JSON instance document (RFC 7951) of the model
+        :param entries: Number of entries of each list
+        :param size: Target size in bytes of the serialized document, used
+                     to compute the number of entries when not given
+        :return: The JSON data as dict
+        """
+        entries = self._entries(entries, size)
+        lists = {}
+        for list_index, entry in enumerate(self._lists):
+            lists[entry.name] = [
+                self._entry_json(entry, index, list_index == 0)
+                for index in range(entries)
+            ]
+        return {"%s:root" % MODULE_NAME: lists}
+
+    def xml_data(self, entries=None, size=None, doctype="config"):
+        """
+        Generate the XML instance document of the model matching json_data
+        :param entries: Number of entries of each list
+        :param size: Target size in bytes of the serialized JSON document,
+                     used to compute the number of entries when not given
+        :param doctype: The name of the netconf root element
+        :return: The serialized XML document as bytes
+        """
+        entries = self._entries(entries, size)
+        nsmap = {None: NETCONF_BASE_NS}
+        root = etree.Element(
+            "{%s}%s" % (NETCONF_BASE_NS, doctype), nsmap=nsmap
+        )
+        container = etree.SubElement(
+            root,
+            "{%s}root" % _namespace(MODULE_NAME),
+            nsmap={None: _namespace(MODULE_NAME)},
+        )
+        for list_index, entry in enumerate(self._lists):
+            for index in range(entries):
+                elem = etree.SubElement(
+                    container, "{%s}%s" % (_namespace(MODULE_NAME), entry.name)
+                )
+                nodes = list(entry.children)
+                for grouping in self._groupings:
+                    nodes.extend(grouping)
+                if list_index == 0:
+                    nodes.extend(self._augments)
+                self._xml_children(elem, nodes, index)
+        return etree.tostring(root)
+
+    def _xml_children(self, parent, nodes, index):
+        for node in nodes:
+            elem = etree.SubElement(
+                parent, "{%s}%s" % (_namespace(node.module), node.name)
+            )
+            if node.kind == "leaf":
+                value = self._value(node, index)
+                if isinstance(value, bool):
+                    value = "true" if value else "false"
+                elem.text = str(value)
+            else:
+                self._xml_children(elem, node.children, index)
+
+    def _entries(self, entries, size):
+        if entries is not None:
+            return entries
+        if size is None:
+            return 1
+        # the document grows linearly with the number of entries
+        one = len(json.dumps(self.json_data(entries=1)))
+        two = len(json.dumps(self.json_data(entries=2)))
+        per_entry = max(two - one, 1)
+        return max(1, 1 + (size - one + per_entry - 1) // per_entry)
+
+
+def _namespace(module):
+    return "urn:synthetic:%s" % module